@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Codec benchmark: re-encodes recorded sample chunks with every encoder backend
+
+Reports, per backend: encode CPU time (including the ffmpeg child process),
+output bytes per minute of recording, and the time to decode the result.
+
+Usage:
+    python benchmarks/bench_codecs.py [chunk.mp4 ...] [--samples 5] [--fps 1]
+
+Without explicit paths the most recent chunks in the Dayflow recordings
+directory are used.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import cv2
+
+from core.encoders import ENCODERS, FFmpegEncoder
+
+try:
+    import resource
+except ImportError:  # Windows: child CPU time is not available
+    resource = None
+
+
+def find_samples(count: int):
+    """Most recent recorded chunks"""
+    from core.config import config
+    chunks = sorted(config.recordings_dir.glob('*/chunk_*.*'),
+                    key=lambda p: p.stat().st_mtime, reverse=True)
+    return [p for p in chunks if p.suffix in ('.mp4', '.avi', '.webm')][:count]
+
+
+def load_frames(path: Path):
+    """Decode every frame of a sample chunk"""
+    cap = cv2.VideoCapture(str(path))
+    frames = []
+    while True:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(frame)
+    cap.release()
+    return frames
+
+
+def cpu_time() -> float:
+    """CPU seconds used by this process and its finished children"""
+    total = time.process_time()
+    if resource:
+        usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+        total += usage.ru_utime + usage.ru_stime
+    return total
+
+
+def decode_time(path: Path) -> float:
+    start = time.perf_counter()
+    cap = cv2.VideoCapture(str(path))
+    while cap.grab():
+        cap.retrieve()
+    cap.release()
+    return time.perf_counter() - start
+
+
+def bench_backend(label: str, name: str, settings: dict, samples, fps: float, out_dir: Path):
+    encoder_cpu = 0.0
+    total_bytes = 0
+    total_frames = 0
+    total_decode = 0.0
+
+    for i, frames in enumerate(samples):
+        encoder = ENCODERS[name](settings)
+        path = out_dir / f"{label}_{i}{encoder.extension}"
+        height, width = frames[0].shape[:2]
+
+        start = cpu_time()
+        encoder.open(path, width, height, fps)
+        for frame in frames:
+            encoder.write(frame)
+        encoder.close()
+        encoder_cpu += cpu_time() - start
+
+        total_bytes += path.stat().st_size
+        total_frames += len(frames)
+        total_decode += decode_time(path)
+
+    minutes = total_frames / fps / 60
+    print(f"{label:<12} {encoder_cpu / minutes:10.2f} s CPU/min"
+          f" {total_bytes / minutes / 1024 / 1024:10.2f} MB/min"
+          f" {total_decode / len(samples) * 1000:10.1f} ms decode/chunk")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('paths', nargs='*', type=Path, help='sample chunk files')
+    parser.add_argument('--samples', type=int, default=5, help='recent chunks to use without paths')
+    parser.add_argument('--fps', type=float, default=1.0, help='recording fps of the samples')
+    parser.add_argument('--ffmpeg', default='ffmpeg', help='ffmpeg executable')
+    parser.add_argument('--crf', type=int, default=30)
+    parser.add_argument('--preset', default='veryfast')
+    args = parser.parse_args()
+
+    paths = args.paths or find_samples(args.samples)
+    samples = [frames for frames in (load_frames(p) for p in paths) if frames]
+    if not samples:
+        print("No sample chunks found - record for a while or pass chunk paths")
+        return 1
+
+    settings = {
+        'ffmpeg_path': args.ffmpeg,
+        'ffmpeg_crf': args.crf,
+        'ffmpeg_preset': args.preset,
+    }
+    backends = [('opencv', settings), ('mjpeg', settings)]
+    if FFmpegEncoder.available(settings):
+        backends.append(('ffmpeg', dict(settings, ffmpeg_codec='libx264')))
+        backends.append(('ffmpeg', dict(settings, ffmpeg_codec='libvpx-vp9')))
+    else:
+        print(f"⚠️  {args.ffmpeg} not found, skipping ffmpeg backends")
+
+    frame_count = sum(len(frames) for frames in samples)
+    height, width = samples[0][0].shape[:2]
+    print(f"{len(samples)} chunks, {frame_count} frames, {width}x{height} @ {args.fps} fps\n")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, backend_settings in backends:
+            label = backend_settings['ffmpeg_codec'] if name == 'ffmpeg' else name
+            bench_backend(label, name, backend_settings, samples, args.fps, Path(tmp))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Benchmark: sampling frames from chunks for the frame-based providers
+
+Encodes synthetic screen-like chunks (15 s and 15 min at 1 fps by default)
+with each available encoder backend, then extracts 5 frames from each with:
+
+    seek     - the old per-sample CAP_PROP_POS_FRAMES seek + read
+    forward  - a pure grab()/retrieve() pass with no seeking
+    shared   - ai.frames.extract_frames (forward pass, seeks long gaps)
+
+Checks that all three return identical JPEGs and exits non-zero if the
+shared extractor is more than --tolerance slower than per-sample seeking
+on any chunk. Short chunks should come out well ahead; on long chunks the
+shared extractor seeks too, and should roughly match.
+
+Usage:
+    python benchmarks/bench_frame_extraction.py [--durations 15 900] [--frames 5]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import cv2
+import numpy as np
+
+from ai.frames import extract_frames
+from core.encoders import ENCODERS, FFmpegEncoder
+
+
+def seek_frames(video_path: Path, num_frames: int):
+    """The extraction the providers used before: one seek per sample"""
+    cap = cv2.VideoCapture(str(video_path))
+    total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    frames = []
+    for idx in [int(i * total_frames / num_frames) for i in range(num_frames)]:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, idx)
+        ret, frame = cap.read()
+        if ret:
+            _, buffer = cv2.imencode('.jpg', frame)
+            frames.append(buffer.tobytes())
+    cap.release()
+    return frames
+
+
+def forward_frames(video_path: Path, num_frames: int):
+    return extract_frames(video_path, num_frames, seek_gap=sys.maxsize)
+
+
+def screen_frames(count: int, width: int, height: int):
+    """A desktop-like frame: windows of text, one line changing per second"""
+    rng = np.random.default_rng(0)
+    base = np.full((height, width, 3), 235, np.uint8)
+    for _ in range(6):
+        x, y = rng.integers(0, width // 2), rng.integers(0, height // 2)
+        cv2.rectangle(base, (x, y), (x + width // 2, y + height // 2), rng.integers(0, 255, 3).tolist(), -1)
+    for row in range(40, height, 28):
+        cv2.putText(base, ''.join(rng.choice(list('abcdefgh ijklmnop'), 90)), (20, row),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, (30, 30, 30), 1)
+    for i in range(count):
+        frame = base.copy()
+        row = 40 + (i % ((height - 40) // 28)) * 28
+        cv2.rectangle(frame, (0, row - 20), (width, row + 8), (255, 255, 255), -1)
+        cv2.putText(frame, f"line {i}: " + 'x' * (i % 80), (20, row),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 0, 200), 1)
+        yield frame
+
+
+def encode_chunk(name: str, settings: dict, seconds: int, size, out_dir: Path) -> Path:
+    encoder = ENCODERS[name](settings)
+    label = settings.get('ffmpeg_codec', name) if name == 'ffmpeg' else name
+    path = out_dir / f"{label}_{seconds}s{encoder.extension}"
+    encoder.open(path, size[0], size[1], 1.0)
+    for frame in screen_frames(seconds, *size):
+        encoder.write(frame)
+    encoder.close()
+    return path
+
+
+def time_method(method, path: Path, num_frames: int, repeats: int):
+    """Median wall time (ms) and the frames of the last run"""
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        frames = method(path, num_frames)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings), frames
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--durations', type=int, nargs='+', default=[15, 900], help='chunk lengths in seconds')
+    parser.add_argument('--frames', type=int, default=5, help='frames sampled per chunk')
+    parser.add_argument('--width', type=int, default=1920)
+    parser.add_argument('--height', type=int, default=1080)
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--tolerance', type=float, default=0.15, help='allowed slowdown vs seek')
+    parser.add_argument('--ffmpeg', default='ffmpeg', help='ffmpeg executable')
+    args = parser.parse_args()
+
+    settings = {'ffmpeg_path': args.ffmpeg, 'ffmpeg_preset': 'veryfast'}
+    backends = [('opencv', settings), ('mjpeg', settings)]
+    if FFmpegEncoder.available(settings):
+        backends.append(('ffmpeg', dict(settings, ffmpeg_codec='libx264')))
+    else:
+        print(f"⚠️  {args.ffmpeg} not found, skipping the ffmpeg backend")
+
+    methods = [('seek', seek_frames), ('forward', forward_frames), ('shared', extract_frames)]
+    failures = 0
+
+    print(f"{'chunk':<22} " + ' '.join(f"{label:>10}" for label, _ in methods) + "  speedup")
+    with tempfile.TemporaryDirectory() as tmp:
+        for seconds in args.durations:
+            for name, backend_settings in backends:
+                path = encode_chunk(name, backend_settings, seconds, (args.width, args.height), Path(tmp))
+                results = [time_method(method, path, args.frames, args.repeats) for _, method in methods]
+
+                seek_ms, seek_frames_out = results[0]
+                shared_ms, _ = results[-1]
+                identical = all(frames == seek_frames_out for _, frames in results)
+                slower = shared_ms > seek_ms * (1 + args.tolerance)
+                failures += slower or not identical
+                flag = '' if identical else '  ❌ frames differ'
+                flag += '  ❌ slower than seek' if slower else ''
+                print(f"{path.stem:<22} " + ' '.join(f"{ms:>8.0f}ms" for ms, _ in results)
+                      + f"  {seek_ms / shared_ms:>6.1f}x{flag}")
+                path.unlink()
+
+    if failures:
+        print(f"\n❌ {failures} chunks failed")
+        return 1
+    print("\n✅ Shared extractor matched per-sample seeking, within tolerance on every chunk")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Benchmark: full-text card search latency on a large timeline
+
+Seeds a temporary database with synthetic timeline cards (default 100k,
+about three years of 15-minute batches), then times Storage.search_cards
+for a few representative queries, with and without a date range, and
+compares against the LIKE fallback. Exits non-zero if any FTS query
+exceeds the latency budget.
+
+Usage:
+    python benchmarks/bench_search.py [--cards 100000] [--budget-ms 50]
+"""
+
+import argparse
+import itertools
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from core.storage import Storage
+
+
+WORDS = [
+    'billing', 'migration', 'review', 'email', 'meeting', 'design', 'refactor',
+    'invoice', 'browser', 'slack', 'docs', 'planning', 'debugging', 'deploy',
+    'report', 'spreadsheet', 'research', 'video', 'music', 'shopping',
+]
+CATEGORIES = ['Work', 'Communication', 'Research', 'Entertainment', 'Personal', 'Other']
+
+QUERIES = ['billing migration', 'invoice', 'debug', 'deploy review', 'nonexistentterm']
+
+
+def make_vocabulary(rng: random.Random, size: int):
+    """Real card text draws from thousands of words with a long tail
+
+    WORDS are spread through the head of a Zipf-like distribution so the
+    common ones appear in a few percent of cards, like real activity terms.
+    """
+    letters = 'abcdefghijklmnopqrstuvwxyz'
+    vocabulary = [''.join(rng.choice(letters) for _ in range(rng.randint(4, 10)))
+                  for _ in range(size)]
+    for i, word in enumerate(WORDS):
+        vocabulary[i * 10 + 5] = word
+    cum_weights = list(itertools.accumulate(1.0 / (rank + 1) for rank in range(size)))
+    return vocabulary, cum_weights
+
+
+def seed(storage: Storage, cards: int, now: float):
+    """Bulk-insert synthetic cards going back from now"""
+    rng = random.Random(42)
+    vocabulary, cum_weights = make_vocabulary(rng, 5000)
+    rows = []
+    for i in range(cards):
+        start = now - (i + 1) * 900
+        title = ' '.join(rng.choices(vocabulary, cum_weights=cum_weights, k=3)).capitalize()
+        summary = f"Worked on {' and '.join(rng.choices(vocabulary, cum_weights=cum_weights, k=6))} in several windows."
+        rows.append((f"card-{i}", f"batch-{i}", start, start + 900, title, summary,
+                     rng.choice(CATEGORIES), '#4CAF50', start + 900))
+
+    with storage._get_connection() as conn:
+        conn.cursor().executemany("""
+            INSERT INTO timeline_cards
+            (id, batch_id, start_time, end_time, title, summary, category, color, created_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, rows)
+
+
+def time_query(storage: Storage, query: str, start, end, repeats: int):
+    """Median and max latency (ms) plus the result count of one query"""
+    latencies = []
+    results = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        results = storage.search_cards(query, start, end)
+        latencies.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(latencies), max(latencies), len(results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--cards', type=int, default=100000)
+    parser.add_argument('--repeats', type=int, default=20)
+    parser.add_argument('--budget-ms', type=float, default=50.0)
+    args = parser.parse_args()
+
+    now = time.time()
+    last_month = (datetime.now() - timedelta(days=30), datetime.now())
+    failures = 0
+
+    with tempfile.TemporaryDirectory() as tmp:
+        storage = Storage(Path(tmp) / 'search.db')
+        t0 = time.perf_counter()
+        seed(storage, args.cards, now)
+        print(f"Seeded {args.cards} cards in {time.perf_counter() - t0:.1f}s")
+        with storage._get_connection() as conn:
+            has_fts = storage._has_fts(conn.cursor())
+        print(f"FTS5 index: {'yes' if has_fts else 'no'}\n")
+
+        print(f"{'query':<22} {'range':<8} {'fts p50':>9} {'fts max':>9} {'like p50':>9} {'hits':>6}")
+        for query in QUERIES:
+            for label, (start, end) in (('all', (None, None)), ('30 days', last_month)):
+                p50, worst, hits = time_query(storage, query, start, end, args.repeats)
+
+                storage._fts_available = False
+                like_p50, _, _ = time_query(storage, query, start, end, 3)
+                storage._fts_available = None
+
+                failures += worst > args.budget_ms
+                flag = '❌' if worst > args.budget_ms else '  '
+                print(f"{query:<22} {label:<8} {p50:>7.2f}ms {worst:>7.2f}ms "
+                      f"{like_p50:>7.2f}ms {hits:>6} {flag}")
+        storage.close()
+
+    if failures:
+        print(f"\n❌ {failures} queries exceeded {args.budget_ms:.0f} ms")
+        return 1
+    print(f"\n✅ All queries under {args.budget_ms:.0f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
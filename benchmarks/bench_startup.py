@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Benchmark: cold start up to the point the main window is created
+
+Runs `import app_controller; AppController().start_services()` in fresh
+interpreters with `-X importtime`, against a throwaway config directory
+with `recording_enabled` set, and reports the median wall time plus the
+slowest imports. Fails if the median exceeds the budget or if a heavy
+dependency (cv2, numpy, mss, PIL, requests, a provider SDK) is imported
+before it is needed; recording resumes only after the window exists.
+
+Usage:
+    python benchmarks/bench_startup.py [--runs 5] [--budget-ms 150]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+
+SRC = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+# Only needed once recording or analysis actually runs
+DEFERRED_MODULES = ['cv2', 'numpy', 'mss', 'PIL', 'requests', 'google.generativeai',
+                    'ai.gemini_provider', 'ai.ollama_provider', 'ai.openai_provider']
+
+CHILD = f"""
+import json, os, sys, time
+t0 = time.perf_counter()
+sys.path.insert(0, {SRC!r})
+from app_controller import AppController
+app = AppController()
+app.start_services()
+elapsed = time.perf_counter() - t0
+loaded = [m for m in {DEFERRED_MODULES!r} if m in sys.modules]
+print(json.dumps({{'ms': elapsed * 1000, 'loaded': loaded,
+                  'recording_enabled': app.config.get('recording_enabled', False)}}), flush=True)
+if '--enable-recording' in sys.argv:
+    # Set up the next runs like a restart with recording left on
+    app.config.set('recording_enabled', True)
+    app.config.flush()
+# Skip teardown: stop_services() would also switch recording_enabled off
+os._exit(0)
+"""
+
+
+def parse_importtime(stderr: str):
+    """(cumulative us, self us, module) for each line of -X importtime output"""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_us, cumulative_us, module = line[len('import time:'):].split('|')
+        rows.append((int(cumulative_us), int(self_us), module.rstrip()))
+    return rows
+
+
+def run_once(home: str, *child_args: str):
+    """Start one fresh interpreter, returning (result, importtime rows)"""
+    env = dict(os.environ, HOME=home, LOCALAPPDATA=home)
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', CHILD, *child_args],
+                          env=env, capture_output=True, text=True, check=True)
+    # Background services may still be logging after the result line
+    line = next(line for line in reversed(proc.stdout.splitlines()) if line.startswith('{"ms"'))
+    result = json.loads(line)
+    return result, parse_importtime(proc.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--budget-ms', type=float, default=150.0)
+    parser.add_argument('--top', type=int, default=10)
+    args = parser.parse_args()
+
+    timings = []
+    with tempfile.TemporaryDirectory() as home:
+        # The first run creates the config directory and database, and
+        # leaves recording enabled
+        run_once(home, '--enable-recording')
+        for _ in range(args.runs):
+            result, rows = run_once(home)
+            timings.append(result['ms'])
+
+    median = statistics.median(timings)
+    print(f"Startup (import + AppController() + start_services()): median {median:.1f} ms, "
+          f"min {min(timings):.1f} ms, max {max(timings):.1f} ms over {args.runs} runs\n")
+
+    print("Slowest imports (cumulative, last run):")
+    for cumulative_us, self_us, module in sorted(rows, reverse=True)[:args.top]:
+        print(f"  {cumulative_us / 1000:>8.1f} ms  {self_us / 1000:>7.1f} ms self  {module}")
+
+    failures = 0
+    if not result['recording_enabled']:
+        print("\n❌ recording_enabled was not set for the measured runs")
+        failures += 1
+    if result['loaded']:
+        print(f"\n❌ Imported at startup: {', '.join(result['loaded'])}")
+        failures += 1
+    if median > args.budget_ms:
+        print(f"\n❌ Startup exceeded {args.budget_ms:.0f} ms")
+        failures += 1
+    if failures:
+        return 1
+    print(f"\n✅ Startup under {args.budget_ms:.0f} ms with heavy imports deferred")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Storage benchmark: insert and query latency under concurrent writers
+
+Runs several writer threads inserting chunks and timeline cards while a
+reader thread polls the UI's queries: with a connection opened per call
+(the original behaviour), with Storage's persistent per-thread WAL
+connections, and with write-behind batching on top.
+
+Usage:
+    python benchmarks/bench_storage.py [--writers 3] [--ops 300]
+"""
+
+import argparse
+import os
+import sqlite3
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from core.storage import Storage
+
+
+class PerCallStorage(Storage):
+    """Storage with the original connection-per-call behaviour"""
+
+    @contextmanager
+    def _get_connection(self):
+        conn = sqlite3.connect(str(self.db_path))
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+
+def percentiles(samples):
+    samples = sorted(samples)
+    if not samples:
+        return 0.0, 0.0
+    p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+    return statistics.median(samples) * 1000, p95 * 1000
+
+
+def retry_locked(func):
+    """Per-call connections have no busy timeout, so retry on lock errors"""
+    while True:
+        try:
+            return func()
+        except sqlite3.OperationalError as e:
+            if 'locked' not in str(e):
+                raise
+            time.sleep(0.001)
+
+
+def run(label: str, storage: Storage, writers: int, ops: int):
+    insert_times = []
+    query_times = []
+    lock = threading.Lock()
+    done = threading.Event()
+
+    def writer():
+        local = []
+        for _ in range(ops):
+            now = time.time()
+            start = time.perf_counter()
+            retry_locked(lambda: storage.insert_chunk(
+                str(uuid.uuid4()), now - 15, now, '/tmp/chunk.mp4', 'completed'))
+            retry_locked(lambda: storage.insert_timeline_card(
+                str(uuid.uuid4()), 'batch', now - 15, now, 'Title', 'Summary', 'Work', '#4CAF50'))
+            local.append((time.perf_counter() - start) / 2)
+        with lock:
+            insert_times.extend(local)
+
+    def reader():
+        while not done.is_set():
+            now = time.time()
+            start = time.perf_counter()
+            retry_locked(storage.get_timeline_cards_for_today)
+            retry_locked(lambda: storage.get_chunks_for_batch(now - 900, now))
+            query_times.append((time.perf_counter() - start) / 2)
+
+    threads = [threading.Thread(target=writer) for _ in range(writers)]
+    reader_thread = threading.Thread(target=reader)
+    start = time.perf_counter()
+    reader_thread.start()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    storage.flush()
+    elapsed = time.perf_counter() - start
+    done.set()
+    reader_thread.join()
+
+    insert_p50, insert_p95 = percentiles(insert_times)
+    query_p50, query_p95 = percentiles(query_times)
+    total = writers * ops * 2
+    print(f"{label:<12} insert p50 {insert_p50:7.2f} ms  p95 {insert_p95:7.2f} ms"
+          f"   query p50 {query_p50:7.2f} ms  p95 {query_p95:7.2f} ms"
+          f"   {total / elapsed:8.0f} inserts/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--writers', type=int, default=3)
+    parser.add_argument('--ops', type=int, default=300, help='inserts per writer')
+    args = parser.parse_args()
+
+    print(f"{args.writers} writers x {args.ops} chunk+card inserts, 1 polling reader\n")
+    with tempfile.TemporaryDirectory() as tmp:
+        run('per-call', PerCallStorage(Path(tmp) / 'per_call.db'), args.writers, args.ops)
+        storage = Storage(Path(tmp) / 'persistent.db')
+        run('persistent', storage, args.writers, args.ops)
+        storage.close()
+        storage = Storage(Path(tmp) / 'write_behind.db', write_behind=True)
+        run('write-behind', storage, args.writers, args.ops)
+        storage.close()
+
+
+if __name__ == "__main__":
+    main()
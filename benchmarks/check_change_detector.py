@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Check: screen change detection against text edits
+
+Renders a synthetic code editor at capture resolution and checks that
+core.change_detector.ChangeDetector:
+    - reports typed words and new lines of code as changes
+    - accumulates single characters typed one at a time into a change
+    - ignores an identical frame and a blinking text cursor
+Runs on dark and light themes and exits non-zero on any failed check.
+
+Usage:
+    python benchmarks/check_change_detector.py [--width 1920 --height 1080]
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import cv2
+import numpy as np
+
+from core.change_detector import ChangeDetector
+
+
+CODE = [
+    "def analyze_chunk(self, video_path, keyframes=None):",
+    "    frames = extract_frames(video_path, num_frames=10)",
+    "    descriptions = []",
+    "    for index, frame in enumerate(frames):",
+    "        description = self._analyze_frame(frame, index)",
+    "        if description:",
+    "            descriptions.append(description)",
+    "    return self._synthesize(descriptions)",
+    "",
+] * 4
+
+LINE_HEIGHT = 24
+
+
+def render(lines, size, theme, cursor=None) -> np.ndarray:
+    """BGRA screenshot of an editor showing `lines`, like mss returns"""
+    width, height = size
+    background, text = theme
+    frame = np.full((height, width, 4), background, np.uint8)
+    for row, line in enumerate(lines):
+        cv2.putText(frame, line, (60, 40 + row * LINE_HEIGHT), cv2.FONT_HERSHEY_PLAIN,
+                    1.2, (text, text, text, 255), 1, cv2.LINE_AA)
+    if cursor is not None:
+        x, row = cursor
+        y = 40 + row * LINE_HEIGHT
+        cv2.rectangle(frame, (x, y - 16), (x + 1, y + 4), (text, text, text, 255), -1)
+    return frame
+
+
+def score(detector: ChangeDetector, before: np.ndarray, after: np.ndarray) -> bool:
+    detector.reset()
+    detector.check(before)
+    return detector.check(after)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--width', type=int, default=1920)
+    parser.add_argument('--height', type=int, default=1080)
+    args = parser.parse_args()
+
+    size = (args.width, args.height)
+    detector = ChangeDetector()
+    results = []
+
+    def check(name, ok, detail=''):
+        results.append(ok)
+        print(f"{'✅' if ok else '❌'} {name}{': ' + detail if detail else ''}")
+
+    for theme_name, theme in (('dark', (30, 212)), ('light', (250, 30))):
+        print(f"\n🎨 {theme_name} theme, {args.width}x{args.height}")
+        base = render(CODE, size, theme)
+
+        changed = score(detector, base, base.copy())
+        check("identical frame is unchanged", not changed, f"{detector.last_score} pixels")
+
+        blink = render(CODE, size, theme, cursor=(400, 5))
+        changed = score(detector, base, blink)
+        check("blinking cursor is unchanged", not changed, f"{detector.last_score} pixels")
+
+        for word in ("ok", "self", "return None"):
+            edited = list(CODE)
+            edited[6] = edited[6] + "  # " + word
+            changed = score(detector, base, render(edited, size, theme))
+            check(f"typed {word!r} is a change", changed, f"{detector.last_score} pixels")
+
+        edited = list(CODE)
+        edited[8:8] = ["    total = sum(len(d) for d in descriptions)"] * 5
+        changed = score(detector, base, render(edited, size, theme))
+        check("five new lines are a change", changed, f"{detector.last_score} pixels")
+
+        # Each frame is compared with the last changed one, so characters
+        # typed one per frame still add up to a change
+        detector.reset()
+        detector.check(base)
+        comment = "  # retry later"
+        typed = None
+        for count in range(1, len(comment) + 1):
+            edited = list(CODE)
+            edited[2] = edited[2] + comment[:count]
+            if detector.check(render(edited, size, theme)):
+                typed = count
+                break
+        check("characters typed one per frame add up to a change", typed is not None,
+              f"after {typed} characters" if typed else "never")
+
+    return 0 if all(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
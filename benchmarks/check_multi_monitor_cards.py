@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Check: timeline cards for monitors recorded separately
+
+Seeds a temporary database with chunks from two monitors over the same
+stretch of time (the second monitor starting a few seconds later, as
+separate pipelines do), runs TimelineGenerator's analysis with a stand-in
+provider that returns one card per chunk, and checks that:
+    - only one monitor's chunk is analyzed per time slot
+    - the resulting cards do not overlap
+    - the rollups count the recorded time once, not once per monitor
+    - every recorded chunk is assigned to the batch
+A single-monitor run is checked as well. Exits non-zero on any failed check.
+
+Usage:
+    python benchmarks/check_multi_monitor_cards.py [--minutes 15]
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from analysis.timeline_generator import TimelineGenerator
+from core.storage import Storage
+
+
+CHUNK = 15  # seconds
+
+
+class StandInProvider:
+    """Returns one card per chunk, remembering which files it was given"""
+
+    def __init__(self):
+        self.analyzed = []
+
+    def analyze_batch(self, video_paths, keyframes=None):
+        self.analyzed = [path.name for path in video_paths]
+        return [{'title': path.stem, 'summary': '', 'category': 'Work'} for path in video_paths]
+
+
+class StandInScheduler:
+    def emit(self, event, *args):
+        pass
+
+
+def seed(storage: Storage, directory: Path, start: float, minutes: int, monitors: dict):
+    """Insert chunks (with empty files) for each monitor: {monitor_id: (offset, frames)}"""
+    for monitor_id, (offset, frames) in monitors.items():
+        for i in range(minutes * 60 // CHUNK):
+            chunk_start = start + offset + i * CHUNK
+            path = directory / f"m{monitor_id}_{i:03d}.mp4"
+            path.touch()
+            storage.insert_chunk(
+                chunk_id=f"m{monitor_id}-{i}", start_time=chunk_start, end_time=chunk_start + CHUNK,
+                file_path=str(path), status='completed',
+                frame_times=[j * CHUNK / frames for j in range(frames)], monitor_id=monitor_id
+            )
+
+
+def run(directory: Path, minutes: int, monitors: dict):
+    """Analyze one batch; returns (provider, cards, rollup seconds, unassigned chunks)"""
+    storage = Storage(directory / 'cards.db')
+    now = time.time()
+    start = now - minutes * 60 - 30
+    seed(storage, directory, start, minutes, monitors)
+    storage.set_state('last_analysis_time', start - 1)
+
+    provider = StandInProvider()
+    generator = TimelineGenerator({'analysis_interval': minutes * 60, 'chunk_duration': CHUNK},
+                                  storage, StandInScheduler())
+    generator.set_llm_provider(provider)
+    generator._analyze_recent_chunks()
+
+    cards = sorted(storage.get_timeline_cards(), key=lambda card: card['start_time'])
+    today = date.today()
+    totals = storage.get_category_totals(today - timedelta(days=1), today)
+    rollup_seconds = sum(row['seconds'] for row in totals)
+    with storage._get_connection() as conn:
+        unassigned = conn.execute("SELECT COUNT(*) FROM chunks WHERE batch_id IS NULL").fetchone()[0]
+    storage.close()
+    return provider, cards, rollup_seconds, unassigned
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--minutes', type=int, default=15)
+    args = parser.parse_args()
+    slots = args.minutes * 60 // CHUNK
+    results = []
+
+    def check(name, ok, detail=''):
+        results.append(ok)
+        print(f"{'✅' if ok else '❌'} {name}{': ' + detail if detail else ''}")
+
+    for label, monitors in (
+        ('two monitors', {1: (0, 15), 2: (4, 3)}),
+        ('two monitors, second one busier', {1: (0, 3), 2: (4, 15)}),
+        ('one monitor', {1: (0, 15)}),
+    ):
+        print(f"\n🖥️  {label}, {args.minutes} minutes")
+        with tempfile.TemporaryDirectory() as tmp:
+            provider, cards, rollup_seconds, unassigned = run(Path(tmp), args.minutes, monitors)
+
+        busiest = max(monitors, key=lambda m: monitors[m][1])
+        check("one chunk analyzed per slot", len(provider.analyzed) == slots,
+              f"{len(provider.analyzed)} chunks for {slots} slots")
+        check("the busiest monitor is analyzed",
+              all(name.startswith(f"m{busiest}_") for name in provider.analyzed))
+
+        overlaps = sum(1 for a, b in zip(cards, cards[1:]) if b['start_time'] < a['end_time'] - 1e-6)
+        check("cards do not overlap", overlaps == 0, f"{len(cards)} cards, {overlaps} overlaps")
+
+        covered = cards[-1]['end_time'] - cards[0]['start_time'] if cards else 0
+        card_seconds = sum(card['end_time'] - card['start_time'] for card in cards)
+        check("rollups count the time once", abs(rollup_seconds - covered) < 1
+              and abs(card_seconds - covered) < 1,
+              f"{rollup_seconds:.0f}s in rollups, {covered:.0f}s covered")
+        check("every chunk is assigned to the batch", unassigned == 0,
+              f"{unassigned} unassigned")
+
+    return 0 if all(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Query plan check: every hot Storage query must use an index on a year of data
+
+Seeds a temporary database with a year of chunks, keyframes, batches and
+timeline cards, runs ANALYZE, then calls each hot Storage method with a
+trace callback installed and asserts that EXPLAIN QUERY PLAN for every
+statement it ran searches an index instead of scanning the table. Exits non-zero
+on the first regression, so it can gate schema or query changes.
+
+Usage:
+    python benchmarks/check_query_plans.py [--days 365] [--chunks-per-day 1000]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import date, datetime
+from pathlib import Path
+from typing import Callable, List
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from core import rollups
+from core.storage import Storage
+
+
+DAY = 86400
+
+# Hot Storage calls with representative arguments. The statements each call
+# actually runs are captured with a trace callback, so the check follows any
+# change to the queries in Storage.
+HOT_CALLS = {
+    'get_chunks_for_batch': lambda s, now: s.get_chunks_for_batch(now - 900, now),
+    'delete_old_chunks': lambda s, now: s.delete_old_chunks(now - 364.9 * DAY),
+    'get_keyframes_for_chunks': lambda s, now: s.get_keyframes_for_chunks(['chunk-1-1', 'chunk-1-2']),
+    'get_frame_timestamps': lambda s, now: s.get_frame_timestamps('chunk-1-1'),
+    'assign_chunks_to_batch': lambda s, now: s.assign_chunks_to_batch('batch-1-1', ['chunk-1-1']),
+    'get_timeline_cards (range)': lambda s, now: s.get_timeline_cards(
+        datetime.fromtimestamp(now - DAY), datetime.fromtimestamp(now)),
+    'get_timeline_cards (latest)': lambda s, now: s.get_timeline_cards(),
+    'insert_timeline_card': lambda s, now: s.insert_timeline_card(
+        'card-new', 'batch-1-1', now - 900, now, 'Title', 'Summary', 'Work', '#4CAF50'),
+    'has_timeline_changes': lambda s, now: s.has_timeline_changes(1000),
+    'get_timeline_cards_since': lambda s, now: s.get_timeline_cards_since(1000),
+    'get_timeline_change_cursor': lambda s, now: s.get_timeline_change_cursor(),
+    'get_daily_rollup': lambda s, now: s.get_daily_rollup(date(2025, 1, 1), date(2025, 1, 7)),
+    'get_category_totals': lambda s, now: s.get_category_totals(date(2025, 1, 1), date(2025, 1, 7)),
+    'get_hourly_rollup': lambda s, now: s.get_hourly_rollup(date(2025, 1, 1)),
+    'get_recordings_size': lambda s, now: s.get_recordings_size(),
+    'get_eviction_candidates': lambda s, now: s.get_eviction_candidates(200),
+    'get_chunks_for_downsampling': lambda s, now: s.get_chunks_for_downsampling(now - 300 * DAY),
+    'update_chunk_tier': lambda s, now: s.update_chunk_tier(
+        'chunk-1-1', 'timelapse', '/rec/chunk-1-1.mp4', 1000, [0.0, 7.5],
+        drop_keyframes=True),
+    'find_known_files': lambda s, now: s.find_known_files(['/rec/a.mp4', '/rec/a.jpg']),
+    'get_chunk_files_page': lambda s, now: s.get_chunk_files_page('/rec/chunk-1', 1000),
+    'delete_chunks': lambda s, now: s.delete_chunks(['chunk-1-1', 'chunk-1-2']),
+    'update_batch_status': lambda s, now: s.update_batch_status('batch-1-1', 'completed'),
+    'get_state': lambda s, now: s.get_state('last_analysis_time'),
+}
+
+
+class _Rollback(Exception):
+    """Raised to roll back the writes of a traced call"""
+
+
+def trace_call(storage: Storage, call: Callable, now: float) -> List[str]:
+    """Run a Storage call and return the statements it executed
+
+    The call runs inside an outer transaction that is rolled back, so
+    writes leave the seeded data untouched.
+    """
+    statements = []
+    try:
+        with storage._get_connection() as conn:
+            conn.set_trace_callback(statements.append)
+            try:
+                call(storage, now)
+            finally:
+                conn.set_trace_callback(None)
+            raise _Rollback()
+    except _Rollback:
+        pass
+    # Transaction control and trigger markers have no plan of their own
+    return [sql for sql in statements
+            if not sql.lstrip().startswith('--')
+            and sql.split(None, 1)[0].upper() not in ('BEGIN', 'COMMIT', 'ROLLBACK', 'SAVEPOINT',
+                                                      'RELEASE', 'PRAGMA')]
+
+
+def seed(storage: Storage, days: int, chunks_per_day: int, now: float):
+    """Bulk-insert a year of synthetic history"""
+    chunk_rows = []
+    keyframe_rows = []
+    batch_rows = []
+    card_rows = []
+    step = DAY / chunks_per_day
+    for day in range(days):
+        day_start = now - (day + 1) * DAY
+        for i in range(chunks_per_day):
+            start = day_start + i * step
+            chunk_id = f"chunk-{day}-{i}"
+            status = 'completed' if i % 10 else 'idle'
+            size = 400_000 if status == 'completed' else 0
+            chunk_rows.append((chunk_id, start, start + 15, f"/rec/{chunk_id}.mp4", status, start + 15,
+                               size))
+            keyframe_rows.append((chunk_id, 0, start, f"/rec/{chunk_id}_keyframes/kf_00.jpg"))
+        for b in range(96):
+            batch_id = f"batch-{day}-{b}"
+            start = day_start + b * 900
+            batch_rows.append((batch_id, start, start + 900, 'completed', start + 900))
+            card_rows.append((f"card-{day}-{b}", batch_id, start, start + 900, 'Title', 'Summary',
+                              'Work', '#4CAF50', start + 900))
+
+    with storage._get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.executemany("""
+            INSERT INTO chunks (id, start_time, end_time, file_path, status, created_at, file_size)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, chunk_rows)
+        cursor.executemany("""
+            INSERT INTO chunk_keyframes (chunk_id, frame_index, timestamp, file_path)
+            VALUES (?, ?, ?, ?)
+        """, keyframe_rows)
+        cursor.executemany("""
+            INSERT INTO batches (id, start_time, end_time, status, created_at)
+            VALUES (?, ?, ?, ?, ?)
+        """, batch_rows)
+        cursor.executemany("""
+            INSERT INTO timeline_cards
+            (id, batch_id, start_time, end_time, title, summary, category, color, created_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, card_rows)
+        rollups.rebuild(cursor)
+        cursor.execute("ANALYZE")
+
+
+def uses_index(plan) -> bool:
+    """True if no step of the plan is a full table scan"""
+    for detail in plan:
+        if detail.startswith('SCAN') and 'USING' not in detail:
+            return False
+    return any('USING' in detail for detail in plan)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--days', type=int, default=365)
+    parser.add_argument('--chunks-per-day', type=int, default=1000)
+    args = parser.parse_args()
+
+    now = time.time()
+    failures = 0
+    with tempfile.TemporaryDirectory() as tmp:
+        storage = Storage(Path(tmp) / 'plans.db')
+        start = time.perf_counter()
+        seed(storage, args.days, args.chunks_per_day, now)
+        print(f"Seeded {args.days} days ({args.days * args.chunks_per_day} chunks) "
+              f"in {time.perf_counter() - start:.1f}s\n")
+
+        for name, call in HOT_CALLS.items():
+            statements = trace_call(storage, call, now)
+            if not statements:
+                failures += 1
+                print(f"❌ {name}: no statements captured")
+                continue
+            for sql in statements:
+                # Traced statements have their parameters expanded inline
+                plan = storage.explain_query_plan(sql)
+                if not plan:
+                    continue  # plain INSERT ... VALUES and the like touch no index
+                ok = uses_index(plan)
+                failures += not ok
+                print(f"{'✅' if ok else '❌'} {name}: {' '.join(sql.split())[:90]}")
+                for detail in plan:
+                    print(f"     {detail}")
+        storage.close()
+
+    if failures:
+        print(f"\n❌ {failures} hot queries are not using an index")
+        return 1
+    print("\n✅ All hot queries use an index")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Check: provider HTTP transport against a local stand-in server
+
+Starts a keep-alive http.server on localhost and checks that ai.transport:
+    - reuses pooled connections (vs a new connection per requests.post)
+    - keeps connections within the pool under concurrent use
+    - retries 429 honouring Retry-After, and 503s with backoff
+    - gives up after max_retries, returning the last response
+    - re-raises connection errors once retries run out
+Prints per-call timing from Transport.stats() and exits non-zero on any
+failed check.
+
+Usage:
+    python benchmarks/check_transport.py [--requests 200]
+"""
+
+import argparse
+import json
+import os
+import socket
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import requests
+
+from ai.concurrency import endpoint_slot, ordered_map
+from ai.transport import Transport
+
+
+class StandIn(BaseHTTPRequestHandler):
+    """Answers POST /ok, and fails /fail/<status>/<times> that many times first"""
+
+    protocol_version = 'HTTP/1.1'  # keep-alive
+    # Headers and body go out in separate writes; like real servers, set
+    # TCP_NODELAY so keep-alive responses do not stall on delayed ACKs
+    disable_nagle_algorithm = True
+    connections = 0
+    failures = {}
+    lock = threading.Lock()
+
+    def setup(self):
+        super().setup()
+        with StandIn.lock:
+            StandIn.connections += 1
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        parts = self.path.strip('/').split('/')
+        if parts[0] == 'fail':
+            status, times = int(parts[1]), int(parts[2])
+            with StandIn.lock:
+                seen = StandIn.failures.get(self.path, 0)
+                StandIn.failures[self.path] = seen + 1
+            if seen < times:
+                headers = {'Retry-After': parts[3]} if len(parts) > 3 else {}
+                return self._reply(status, {'error': 'try again'}, headers)
+        self._reply(200, {'response': 'ok'})
+
+    def _reply(self, status, body, headers=None):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def count_connections(fn) -> int:
+    before = StandIn.connections
+    fn()
+    return StandIn.connections - before
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, default=4)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StandIn)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_port}"
+    payload = {'model': 'stand-in', 'prompt': 'x' * 1000}
+    results = []
+
+    def check(name, ok, detail=''):
+        results.append(ok)
+        print(f"{'✅' if ok else '❌'} {name}{': ' + detail if detail else ''}")
+
+    # Connection reuse
+    transport = Transport(base_url, pool_size=args.concurrency, backoff=0.05)
+    start = time.perf_counter()
+    pooled = count_connections(lambda: [transport.post('/ok', json=payload, timeout=5)
+                                        for _ in range(args.requests)])
+    pooled_s = time.perf_counter() - start
+    start = time.perf_counter()
+    plain = count_connections(lambda: [requests.post(f"{base_url}/ok", json=payload, timeout=5)
+                                       for _ in range(args.requests)])
+    plain_s = time.perf_counter() - start
+    check("sequential requests reuse one connection", pooled == 1,
+          f"{pooled} connections in {pooled_s * 1000:.0f} ms vs {plain} in {plain_s * 1000:.0f} ms "
+          f"with requests.post")
+
+    def limited_post(_):
+        with endpoint_slot(base_url, args.concurrency):
+            return transport.post('/ok', json=payload, timeout=5).status_code
+
+    concurrent = count_connections(
+        lambda: ordered_map(limited_post, range(args.requests), args.concurrency * 2))
+    check("concurrent requests stay within the pool", concurrent <= args.concurrency,
+          f"{concurrent} new connections for {args.concurrency} slots")
+
+    # Retries
+    start = time.perf_counter()
+    status = transport.post('/fail/429/1/1', json=payload, timeout=5).status_code
+    waited = time.perf_counter() - start
+    check("429 is retried after Retry-After", status == 200 and waited >= 1.0,
+          f"status {status} after {waited:.2f}s")
+
+    retries = transport.retries
+    status = transport.post('/fail/503/2', json=payload, timeout=5).status_code
+    check("503 is retried with backoff", status == 200 and transport.retries - retries == 2,
+          f"status {status}, {transport.retries - retries} retries")
+
+    attempts_before = StandIn.failures.get('/fail/500/99', 0)
+    status = transport.post('/fail/500/99', json=payload, timeout=5).status_code
+    attempts = StandIn.failures['/fail/500/99'] - attempts_before
+    check("gives up after max_retries", status == 500 and attempts == transport.max_retries + 1,
+          f"status {status} after {attempts} attempts")
+
+    dead = Transport(f"http://127.0.0.1:{free_port()}", backoff=0.01)
+    try:
+        dead.post('/ok', json=payload, timeout=1)
+        check("connection errors are re-raised", False, "no exception")
+    except requests.ConnectionError:
+        check("connection errors are re-raised", dead.calls == dead.max_retries + 1,
+              f"after {dead.calls} attempts")
+
+    stats = transport.stats()
+    print(f"\n🌐 {stats['calls']} attempts, p50 {stats['p50_ms']:.2f} ms, "
+          f"p95 {stats['p95_ms']:.2f} ms, {stats['retries']} retries, {stats['failures']} failed")
+
+    server.shutdown()
+    return 0 if all(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
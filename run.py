@@ -15,8 +15,23 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 from app_controller import AppController
 
 
+def rebuild_rollups():
+    """重建时间统计汇总表"""
+    from core.config import config
+    from core.storage import Storage
+
+    storage = Storage(config.db_path)
+    count = storage.rebuild_rollups()
+    storage.close()
+    print(f"✅ 已根据 {count} 张时间线卡片重建统计")
+
+
 def main():
     """主入口点"""
+    if '--rebuild-rollups' in sys.argv:
+        rebuild_rollups()
+        return
+
     print("=" * 60)
     print("  Dayflow - 自动跟踪您的一天")
     print("=" * 60)
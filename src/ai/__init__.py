@@ -1 +1,32 @@
-"""AI and LLM integration"""
+"""AI and LLM integration
+
+Providers are registered by name and imported on first use, so only the
+configured provider (and its SDK) is ever loaded.
+"""
+
+import importlib
+
+
+# name -> (module, class)
+PROVIDERS = {
+    'gemini': ('gemini_provider', 'GeminiProvider'),
+    'ollama': ('ollama_provider', 'OllamaProvider'),
+    'openai': ('openai_provider', 'OpenAIProvider'),
+}
+
+
+def get_provider_class(name: str):
+    """Import and return the provider class registered as `name`"""
+    if name not in PROVIDERS:
+        raise ValueError(f"Unknown LLM provider: {name}")
+    module_name, class_name = PROVIDERS[name]
+    module = importlib.import_module(f'.{module_name}', __name__)
+    return getattr(module, class_name)
+
+
+def __getattr__(name: str):
+    # `from ai import OllamaProvider` still works, importing on demand
+    for provider, (_, class_name) in PROVIDERS.items():
+        if name == class_name:
+            return get_provider_class(provider)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,48 @@
+"""
+Bounded concurrency for provider requests
+
+Each API endpoint (base URL) gets one semaphore shared by every provider
+instance and thread, so the number of requests in flight to it never
+exceeds its limit, however many chunks or frames are being analyzed at
+once. ordered_map() fans work out over threads while returning results in
+input order; a slow item only delays the results after it, not the other
+requests.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from threading import BoundedSemaphore, Lock
+from typing import Callable, Dict, Iterable, List, Tuple
+
+
+_slots: Dict[str, Tuple[int, BoundedSemaphore]] = {}
+_slots_lock = Lock()
+
+
+def _semaphore(endpoint: str, limit: int) -> BoundedSemaphore:
+    limit = max(1, limit)
+    with _slots_lock:
+        current = _slots.get(endpoint)
+        # A new limit (settings changed) replaces the semaphore; requests
+        # already holding the old one finish normally
+        if current is None or current[0] != limit:
+            current = (limit, BoundedSemaphore(limit))
+            _slots[endpoint] = current
+        return current[1]
+
+
+@contextmanager
+def endpoint_slot(endpoint: str, limit: int):
+    """Hold one of `endpoint`'s `limit` in-flight request slots"""
+    semaphore = _semaphore(endpoint, limit)
+    with semaphore:
+        yield
+
+
+def ordered_map(fn: Callable, items: Iterable, workers: int) -> List:
+    """Apply fn to items on up to `workers` threads, results in input order"""
+    items = list(items)
+    if workers <= 1 or len(items) <= 1:
+        return [fn(item) for item in items]
+    with ThreadPoolExecutor(max_workers=min(workers, len(items))) as pool:
+        return list(pool.map(fn, items))
@@ -0,0 +1,186 @@
+"""
+Perceptual-hash cache for frame descriptions
+
+The same editor window or chat screen gets described by the vision model
+over and over. Each described frame is reduced to a 64-bit difference hash
+(dHash: a 9x8 grayscale thumbnail, one bit per horizontal gradient), and
+the description is stored under it. A later frame whose hash is within
+`max_distance` bits (Hamming distance) reuses that description instead of
+making a vision call. A thumbnail that coarse only sees the layout of a
+screen, so another chat thread or another file in the same editor can
+match; the cache is therefore opt-in.
+
+Entries live in their own SQLite file next to dayflow.db, so the cache can
+be deleted at any time. Hashes are also kept in memory for the
+nearest-neighbour scan. Entries expire `ttl_days` after they were created
+(expired ones never match, even before they are evicted), and the least
+recently used ones are evicted beyond `max_entries`.
+"""
+
+import sqlite3
+import time
+from pathlib import Path
+from threading import Lock
+from typing import Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+
+def dhash(image_bytes: bytes) -> Optional[int]:
+    """64-bit difference hash of an encoded image"""
+    # Decoding at 1/8 scale is much cheaper and plenty for a 9x8 thumbnail
+    gray = cv2.imdecode(np.frombuffer(image_bytes, np.uint8), cv2.IMREAD_REDUCED_GRAYSCALE_8)
+    if gray is None:
+        return None
+    small = cv2.resize(gray, (9, 8), interpolation=cv2.INTER_AREA)
+    bits = (small[:, 1:] > small[:, :-1]).flatten()
+    return int.from_bytes(np.packbits(bits).tobytes(), 'big')
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count('1')
+
+
+def _to_sqlite(value: int) -> int:
+    """Unsigned 64-bit hash -> SQLite's signed INTEGER"""
+    return value - (1 << 64) if value >= 1 << 63 else value
+
+
+class FrameCache:
+    """Maps perceptual hashes of frames to vision-model descriptions"""
+
+    def __init__(self, db_path: Path, max_distance: int = 4, max_entries: int = 20000,
+                 ttl_days: float = 30):
+        self.db_path = db_path
+        self.max_distance = max_distance
+        self.max_entries = max_entries
+        self.ttl = ttl_days * 86400
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = Lock()
+        # One connection shared by the provider's worker threads, under _lock
+        self._conn = sqlite3.connect(str(db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS frame_descriptions (
+                id INTEGER PRIMARY KEY,
+                model TEXT NOT NULL,
+                hash INTEGER NOT NULL,
+                description TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_used REAL NOT NULL,
+                hits INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+        self._conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_frame_descriptions_last_used
+            ON frame_descriptions(last_used)
+        """)
+        self._conn.commit()
+
+        # model -> [(hash, id, description, created_at)]
+        self._entries: Dict[str, List[Tuple[int, int, str, float]]] = {}
+        self._stores = 0
+        with self._lock:
+            self._evict()
+            self._load()
+
+    def _load(self):
+        """Read the surviving entries into memory (lock held)"""
+        self._entries = {}
+        rows = self._conn.execute(
+            "SELECT id, model, hash, description, created_at FROM frame_descriptions")
+        for entry_id, model, value, description, created_at in rows:
+            self._entries.setdefault(model, []).append(
+                (value & ((1 << 64) - 1), entry_id, description, created_at))
+
+    def _evict(self) -> int:
+        """Drop expired and least recently used entries (lock held)"""
+        cursor = self._conn.cursor()
+        cursor.execute("DELETE FROM frame_descriptions WHERE created_at < ?", (time.time() - self.ttl,))
+        deleted = cursor.rowcount
+        cursor.execute("""
+            DELETE FROM frame_descriptions WHERE id IN (
+                SELECT id FROM frame_descriptions ORDER BY last_used DESC LIMIT -1 OFFSET ?
+            )
+        """, (self.max_entries,))
+        deleted += cursor.rowcount
+        self._conn.commit()
+        return deleted
+
+    def get(self, image_bytes: bytes, model: str) -> Optional[str]:
+        """Description of the nearest cached frame, if within max_distance"""
+        value = dhash(image_bytes)
+        if value is None:
+            return None
+
+        with self._lock:
+            best = None
+            expired = time.time() - self.ttl
+            for cached, entry_id, description, created_at in self._entries.get(model, ()):
+                if created_at < expired:
+                    continue
+                distance = hamming(value, cached)
+                if distance <= self.max_distance and (best is None or distance < best[0]):
+                    best = (distance, entry_id, description)
+                    if distance == 0:
+                        break
+
+            if best is None:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            self._conn.execute(
+                "UPDATE frame_descriptions SET last_used = ?, hits = hits + 1 WHERE id = ?",
+                (time.time(), best[1])
+            )
+            self._conn.commit()
+            return best[2]
+
+    def put(self, image_bytes: bytes, model: str, description: str):
+        """Cache the description returned for a frame"""
+        value = dhash(image_bytes)
+        if value is None or not description:
+            return
+
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute("""
+                INSERT INTO frame_descriptions (model, hash, description, created_at, last_used)
+                VALUES (?, ?, ?, ?, ?)
+            """, (model, _to_sqlite(value), description, now, now))
+            self._conn.commit()
+            self._entries.setdefault(model, []).append((value, cursor.lastrowid, description, now))
+
+            self._stores += 1
+            if self._stores % 100 == 0 and self._evict():
+                self._load()
+
+    def stats(self) -> Dict:
+        """Hit rate since startup and the number of cached frames"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'entries': sum(len(entries) for entries in self._entries.values()),
+            }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def print_cache_stats(cache: Optional[FrameCache]):
+    """Log a one-line hit-rate summary for a frame cache"""
+    if cache is None:
+        return
+    stats = cache.stats()
+    if stats['hits'] + stats['misses']:
+        print(f"🧠 Frame cache: {stats['hits']}/{stats['hits'] + stats['misses']} hits "
+              f"({stats['hit_rate']:.0%}), {stats['entries']} entries")
@@ -0,0 +1,95 @@
+"""
+Frame sampling shared by the frame-based providers (Ollama, OpenAI)
+
+Frames are pulled from a chunk in one forward pass: grab() advances the
+decoder and only the sampled frames are retrieve()d (converted to BGR).
+Seeking with CAP_PROP_POS_FRAMES to every sample instead restarts decoding
+from the previous keyframe each time. grab() still decodes, though, so
+long chunks seek forward across gaps of more than SEEK_GAP frames; short
+chunks never seek. Resizing and JPEG encoding of the sampled frames run in
+a thread pool while the pass continues; OpenCV releases the GIL for both.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import List, Optional
+
+import cv2
+import numpy as np
+
+
+# Gaps between samples longer than this many frames are seeked over rather
+# than decoded; well above the GOP of short chunks, so those never seek
+SEEK_GAP = 120
+
+
+def sample_indices(total_frames: int, num_frames: int) -> List[int]:
+    """Evenly spaced frame indices, starting at the first frame"""
+    if total_frames <= 0 or num_frames <= 0:
+        return []
+    return sorted({int(i * total_frames / num_frames) for i in range(num_frames)})
+
+
+def encode_frame(frame, max_height: Optional[int] = None, quality: int = 95) -> Optional[bytes]:
+    """Scale a frame down to max_height (never up) and encode it as JPEG"""
+    height, width = frame.shape[:2]
+    if max_height and height > max_height:
+        size = (round(width * max_height / height), max_height)
+        frame = cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+    ok, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, quality])
+    return buffer.tobytes() if ok else None
+
+
+def resize_jpeg(data: bytes, max_height: Optional[int], quality: int = 95) -> bytes:
+    """Scale an encoded JPEG down to max_height; smaller ones are returned as-is"""
+    frame = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR)
+    if frame is None or not max_height or frame.shape[0] <= max_height:
+        return data
+    return encode_frame(frame, max_height, quality) or data
+
+
+def extract_frames(video_path: Path, num_frames: int = 10, max_height: Optional[int] = None,
+                   quality: int = 95, workers: int = 2, seek_gap: int = SEEK_GAP) -> List[bytes]:
+    """Extract evenly spaced frames from a video as JPEG bytes, in order"""
+    cap = cv2.VideoCapture(str(video_path))
+    try:
+        wanted = sample_indices(int(cap.get(cv2.CAP_PROP_FRAME_COUNT)), num_frames)
+        if not wanted:
+            return []
+
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            futures = []
+            next_wanted = iter(wanted)
+            target = next(next_wanted)
+            index = 0
+            # Stop as soon as the last sampled frame has been read
+            while target is not None:
+                if target - index > seek_gap:
+                    # A forward seek decodes at most from the keyframe
+                    # before the target
+                    cap.set(cv2.CAP_PROP_POS_FRAMES, target)
+                    index = target
+                if not cap.grab():
+                    break
+                if index == target:
+                    ret, frame = cap.retrieve()
+                    if ret:
+                        futures.append(pool.submit(encode_frame, frame, max_height, quality))
+                    target = next(next_wanted, None)
+                index += 1
+            frames = [future.result() for future in futures]
+    finally:
+        cap.release()
+
+    return [frame for frame in frames if frame]
+
+
+def load_keyframes(keyframe_paths: List[Path]) -> List[bytes]:
+    """Read pre-encoded JPEG keyframes written by the recorder"""
+    frames = []
+    for path in keyframe_paths:
+        try:
+            frames.append(path.read_bytes())
+        except OSError:
+            continue
+    return frames
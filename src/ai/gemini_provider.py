@@ -77,11 +77,16 @@ Format your response as JSON:
             print(f"❌ Gemini analysis error: {e}")
             return None
 
-    def analyze_batch(self, video_paths: List[Path]) -> List[Dict]:
-        """Analyze multiple videos (as individual chunks)"""
+    def analyze_batch(self, video_paths: List[Path],
+                      keyframes: Optional[List[List[Path]]] = None) -> List[Dict]:
+        """Analyze multiple videos (as individual chunks)
+
+        Gemini takes the video itself, so recorder keyframes are not used.
+        """
         results = []
-        for video_path in video_paths:
+        for i, video_path in enumerate(video_paths):
             result = self.analyze_video(video_path)
             if result:
+                result['chunk_range'] = (i, i)
                 results.append(result)
         return results
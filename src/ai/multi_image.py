@@ -0,0 +1,102 @@
+"""
+Multi-image vision requests shared by the frame-based providers
+
+Instead of one vision call per frame plus a synthesis call per chunk, the
+frames of several consecutive chunks are packed into one request that asks
+for the timeline card JSON directly. A request holds at most
+`images_per_request` images, each scaled to at most `image_height` pixels
+high; together they bound the image tokens spent per request.
+
+Each result carries `chunk_range` (first, last chunk index in the batch),
+which TimelineGenerator turns into the card's start and end times.
+"""
+
+import json
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from .concurrency import ordered_map
+from .frames import extract_frames, load_keyframes, resize_jpeg, sample_indices
+
+
+CARD_PROMPT = """These {count} screenshots were taken in order during one stretch of screen activity.
+
+Provide a JSON response with:
+1. title: A concise title (max 5 words)
+2. summary: Brief summary of activities (1-2 sentences)
+3. category: Choose from (Work, Communication, Development, Design, Entertainment, Productivity, Research, Social Media, Video, Music, Gaming, Other)
+
+Format as JSON only:
+{{"title": "...", "summary": "...", "category": "..."}}"""
+
+
+def card_prompt(image_count: int) -> str:
+    return CARD_PROMPT.format(count=image_count)
+
+
+def chunk_frames(video_path: Path, keyframe_paths: Optional[List[Path]],
+                 count: int, image_height: int) -> List[bytes]:
+    """Up to `count` evenly spaced JPEG frames of a chunk, scaled for upload"""
+    if keyframe_paths:
+        keyframe_paths = [keyframe_paths[i] for i in sample_indices(len(keyframe_paths), count)]
+        frames = [resize_jpeg(frame, image_height) for frame in load_keyframes(keyframe_paths)]
+        if frames:
+            return frames
+    return extract_frames(video_path, num_frames=count, max_height=image_height)
+
+
+def pack_chunks(chunk_frames: List[List[bytes]],
+                images_per_request: int) -> List[Tuple[int, int, List[bytes]]]:
+    """Group consecutive chunks into requests of at most images_per_request
+
+    Returns (first chunk index, last chunk index, images) per request.
+    Chunks without frames are absorbed into the neighbouring request.
+    """
+    requests = []
+    first, images = 0, []
+    for index, frames in enumerate(chunk_frames):
+        if images and len(images) + len(frames) > images_per_request:
+            requests.append((first, index - 1, images))
+            first, images = index, []
+        images.extend(frames[:images_per_request])
+    if images:
+        requests.append((first, len(chunk_frames) - 1, images))
+    return requests
+
+
+def parse_card(response_text: str) -> Optional[Dict]:
+    """Extract the JSON card from a model response"""
+    if '{' in response_text and '}' in response_text:
+        json_start = response_text.index('{')
+        json_end = response_text.rindex('}') + 1
+        return json.loads(response_text[json_start:json_end])
+    return None
+
+
+def analyze_packed(provider, video_paths: List[Path],
+                   keyframes: Optional[List[List[Path]]] = None) -> List[Optional[Dict]]:
+    """Analyze a batch in multi-image requests
+
+    Uses the provider's frames_per_chunk, images_per_request, image_height
+    and concurrency settings, and its _analyze_images(images) request.
+    Returns one card (or None) per request, in order.
+    """
+    def load(i):
+        keyframe_paths = keyframes[i] if keyframes and i < len(keyframes) else None
+        return chunk_frames(video_paths[i], keyframe_paths,
+                            provider.frames_per_chunk, provider.image_height)
+
+    frames = ordered_map(load, range(len(video_paths)), provider.concurrency)
+    packed = pack_chunks(frames, provider.images_per_request)
+    print(f"🖼️  Packed {sum(len(images) for _, _, images in packed)} frames from "
+          f"{len(video_paths)} chunks into {len(packed)} requests")
+
+    def analyze(request):
+        first, last, images = request
+        card = provider._analyze_images(images)
+        if card:
+            card['chunk_range'] = (first, last)
+            print(f"✅ Chunks {first + 1}-{last + 1}: {card.get('title', 'Unknown')}")
+        return card
+
+    return ordered_map(analyze, packed, provider.concurrency)
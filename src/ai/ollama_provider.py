@@ -3,67 +3,71 @@ Ollama local LLM provider for video analysis
 Uses frame extraction + vision model
 """
 
-import requests
 import base64
-import cv2
 from pathlib import Path
 from typing import List, Dict, Optional
 import json
 
+from .concurrency import endpoint_slot, ordered_map
+from .frames import extract_frames, load_keyframes
+from .frame_cache import print_cache_stats
+from .multi_image import analyze_packed, card_prompt, parse_card
+from .transport import get_transport, print_transport_stats
+
 
 class OllamaProvider:
     """Ollama provider for local video analysis"""
 
-    def __init__(self, base_url: str = "http://localhost:11434", model: str = "llava"):
+    def __init__(self, base_url: str = "http://localhost:11434", model: str = "llava",
+                 concurrency: int = 4, max_retries: int = 3, vision_mode: str = 'per_frame',
+                 images_per_request: int = 10, frames_per_chunk: int = 2, image_height: int = 768,
+                 frame_cache=None):
         self.base_url = base_url.rstrip('/')
         self.model = model
-
-    def _extract_frames(self, video_path: Path, num_frames: int = 10) -> List[bytes]:
-        """Extract evenly-spaced frames from video"""
-        cap = cv2.VideoCapture(str(video_path))
-        total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-
-        if total_frames == 0:
-            cap.release()
-            return []
-
-        # Calculate frame indices to extract
-        frame_indices = [int(i * total_frames / num_frames) for i in range(num_frames)]
-
-        frames = []
-        for idx in frame_indices:
-            cap.set(cv2.CAP_PROP_POS_FRAMES, idx)
-            ret, frame = cap.read()
-            if ret:
-                # Convert to JPEG bytes
-                _, buffer = cv2.imencode('.jpg', frame)
-                frames.append(buffer.tobytes())
-
-        cap.release()
-        return frames
+        # Max requests in flight to this server (1 = one at a time)
+        self.concurrency = max(1, concurrency)
+        self.transport = get_transport(self.base_url, self.concurrency, max_retries)
+        # 'per_frame': describe each frame, then synthesize a card per chunk.
+        # 'multi_image': pack frames of several chunks into one card request.
+        self.vision_mode = vision_mode
+        self.images_per_request = max(1, images_per_request)
+        self.frames_per_chunk = max(1, frames_per_chunk)
+        self.image_height = image_height
+        # Optional FrameCache of descriptions keyed by perceptual hash
+        self.frame_cache = frame_cache
 
     def _analyze_frame(self, frame_bytes: bytes) -> Optional[str]:
         """Analyze a single frame using Ollama vision model"""
+        # Near-identical frames reuse an earlier description, skipping the call
+        if self.frame_cache:
+            cached = self.frame_cache.get(frame_bytes, self.model)
+            if cached:
+                return cached
+
         try:
             # Encode frame as base64
             frame_b64 = base64.b64encode(frame_bytes).decode('utf-8')
 
             # Send to Ollama
-            response = requests.post(
-                f"{self.base_url}/api/generate",
-                json={
-                    "model": self.model,
-                    "prompt": "Describe what application or activity is shown in this screenshot. "
-                              "Be concise and specific. Just describe what you see.",
-                    "images": [frame_b64],
-                    "stream": False
-                },
-                timeout=30
-            )
+            with endpoint_slot(self.base_url, self.concurrency):
+                response = self.transport.post(
+                    "/api/generate",
+                    json={
+                        "model": self.model,
+                        "prompt": "Describe what application or activity is shown in this screenshot. "
+                                  "Be concise and specific. Just describe what you see.",
+                        "images": [frame_b64],
+                        "stream": False
+                    },
+                    timeout=30
+                )
 
             if response.status_code == 200:
                 result = response.json()
-                return result.get('response', '').strip()
+                description = result.get('response', '').strip()
+                if self.frame_cache:
+                    self.frame_cache.put(frame_bytes, self.model, description)
+                return description
             else:
                 print(f"❌ Ollama API error: {response.status_code}")
                 return None
@@ -72,6 +76,31 @@ class OllamaProvider:
             print(f"❌ Frame analysis error: {e}")
             return None
 
+    def _analyze_images(self, images: List[bytes]) -> Optional[Dict]:
+        """Ask for a timeline card from several frames in one request"""
+        try:
+            with endpoint_slot(self.base_url, self.concurrency):
+                response = self.transport.post(
+                    "/api/generate",
+                    json={
+                        "model": self.model,
+                        "prompt": card_prompt(len(images)),
+                        "images": [base64.b64encode(image).decode('utf-8') for image in images],
+                        "format": "json",
+                        "stream": False
+                    },
+                    timeout=120
+                )
+
+            if response.status_code == 200:
+                return parse_card(response.json().get('response', '').strip())
+            print(f"❌ Ollama API error: {response.status_code}")
+            return None
+
+        except Exception as e:
+            print(f"❌ Multi-image analysis error: {e}")
+            return None
+
     def _synthesize_descriptions(self, descriptions: List[str]) -> Optional[Dict]:
         """Synthesize frame descriptions into timeline card"""
         try:
@@ -92,15 +121,16 @@ Format as JSON only:
 {{"title": "...", "summary": "...", "category": "..."}}
 """
 
-            response = requests.post(
-                f"{self.base_url}/api/generate",
-                json={
-                    "model": self.model,
-                    "prompt": prompt,
-                    "stream": False
-                },
-                timeout=30
-            )
+            with endpoint_slot(self.base_url, self.concurrency):
+                response = self.transport.post(
+                    "/api/generate",
+                    json={
+                        "model": self.model,
+                        "prompt": prompt,
+                        "stream": False
+                    },
+                    timeout=30
+                )
 
             if response.status_code == 200:
                 result = response.json()
@@ -119,16 +149,24 @@ Format as JSON only:
             print(f"❌ Synthesis error: {e}")
             return None
 
-    def analyze_video(self, video_path: Path) -> Optional[Dict]:
+    def analyze_video(self, video_path: Path,
+                      keyframe_paths: Optional[List[Path]] = None) -> Optional[Dict]:
         """
         Analyze a video file using frame extraction + description
 
+        Keyframes from the recorder's sidecar are used when available; the
+        video is only decoded for chunks recorded without them.
+
         Returns:
             Dict with 'title', 'summary', 'category'
         """
         try:
-            print(f"🎬 Extracting frames from: {video_path.name}")
-            frames = self._extract_frames(video_path, num_frames=5)
+            frames = load_keyframes(keyframe_paths) if keyframe_paths else []
+            if frames:
+                print(f"🖼️  Using {len(frames)} keyframes for: {video_path.name}")
+            else:
+                print(f"🎬 Extracting frames from: {video_path.name}")
+                frames = extract_frames(video_path, num_frames=5)
 
             if not frames:
                 print(f"❌ No frames extracted")
@@ -136,8 +174,7 @@ Format as JSON only:
 
             print(f"🔍 Analyzing {len(frames)} frames...")
             descriptions = []
-            for i, frame_bytes in enumerate(frames):
-                desc = self._analyze_frame(frame_bytes)
+            for i, desc in enumerate(ordered_map(self._analyze_frame, frames, self.concurrency)):
                 if desc:
                     descriptions.append(desc)
                     print(f"  Frame {i+1}/{len(frames)}: {desc[:60]}...")
@@ -164,11 +201,25 @@ Format as JSON only:
             print(f"❌ Ollama analysis error: {e}")
             return None
 
-    def analyze_batch(self, video_paths: List[Path]) -> List[Dict]:
-        """Analyze multiple videos"""
-        results = []
-        for video_path in video_paths:
-            result = self.analyze_video(video_path)
-            if result:
-                results.append(result)
-        return results
+    def analyze_batch(self, video_paths: List[Path],
+                      keyframes: Optional[List[List[Path]]] = None) -> List[Dict]:
+        """Analyze multiple videos, optionally with each video's keyframe paths
+
+        Videos are analyzed concurrently; requests to each endpoint are
+        still capped at `concurrency` in flight. Results keep input order
+        and carry the `chunk_range` of the videos they cover.
+        """
+        if self.vision_mode == 'multi_image':
+            results = analyze_packed(self, video_paths, keyframes)
+        else:
+            def analyze(i):
+                keyframe_paths = keyframes[i] if keyframes and i < len(keyframes) else None
+                result = self.analyze_video(video_paths[i], keyframe_paths)
+                if result:
+                    result['chunk_range'] = (i, i)
+                return result
+
+            results = ordered_map(analyze, range(len(video_paths)), self.concurrency)
+        print_transport_stats(self.transport)
+        print_cache_stats(self.frame_cache)
+        return [result for result in results if result]
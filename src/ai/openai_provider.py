@@ -3,13 +3,17 @@ OpenAI-compatible API provider for video analysis
 Supports any OpenAI-compatible API endpoint with custom URL and API key
 """
 
-import requests
 import base64
-import cv2
 from pathlib import Path
 from typing import List, Dict, Optional
 import json
 
+from .concurrency import endpoint_slot, ordered_map
+from .frames import extract_frames, load_keyframes
+from .frame_cache import print_cache_stats
+from .multi_image import analyze_packed, card_prompt, parse_card
+from .transport import get_transport, print_transport_stats
+
 
 class OpenAIProvider:
     """OpenAI-compatible provider for video analysis"""
@@ -17,7 +21,10 @@ class OpenAIProvider:
     def __init__(self, api_key: str, base_url: str = "https://api.openai.com/v1",
                  vision_model: str = "gpt-4o", text_model: str = "gpt-4o",
                  vision_api_key: str = None, vision_base_url: str = None,
-                 text_api_key: str = None, text_base_url: str = None):
+                 text_api_key: str = None, text_base_url: str = None,
+                 concurrency: int = 4, max_retries: int = 3, vision_mode: str = 'per_frame',
+                 images_per_request: int = 10, frames_per_chunk: int = 2, image_height: int = 768,
+                 frame_cache=None):
         """
         Initialize OpenAI-compatible provider with separate configs for vision and text
 
@@ -30,6 +37,13 @@ class OpenAIProvider:
             vision_base_url: Base URL specifically for vision model (optional)
             text_api_key: API key specifically for text model (optional)
             text_base_url: Base URL specifically for text model (optional)
+            concurrency: Max requests in flight per endpoint (1 = one at a time)
+            max_retries: Retries for rate limits and transient errors
+            vision_mode: 'per_frame' or 'multi_image' (several chunks' frames per request)
+            images_per_request: Max images in one multi-image request
+            frames_per_chunk: Frames taken from each chunk in multi-image mode
+            image_height: Multi-image frames are scaled down to this height
+            frame_cache: Optional FrameCache of descriptions keyed by perceptual hash
         """
         # Vision model configuration
         self.vision_api_key = vision_api_key or api_key
@@ -44,33 +58,27 @@ class OpenAIProvider:
         # Default configuration (for backward compatibility)
         self.api_key = api_key
         self.base_url = base_url.rstrip('/')
-
-    def _extract_frames(self, video_path: Path, num_frames: int = 10) -> List[bytes]:
-        """Extract evenly-spaced frames from video"""
-        cap = cv2.VideoCapture(str(video_path))
-        total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-
-        if total_frames == 0:
-            cap.release()
-            return []
-
-        # Calculate frame indices to extract
-        frame_indices = [int(i * total_frames / num_frames) for i in range(num_frames)]
-
-        frames = []
-        for idx in frame_indices:
-            cap.set(cv2.CAP_PROP_POS_FRAMES, idx)
-            ret, frame = cap.read()
-            if ret:
-                # Convert to JPEG bytes
-                _, buffer = cv2.imencode('.jpg', frame)
-                frames.append(buffer.tobytes())
-
-        cap.release()
-        return frames
+        self.concurrency = max(1, concurrency)
+        # 'per_frame': describe each frame, then synthesize a card per chunk.
+        # 'multi_image': pack frames of several chunks into one card request.
+        self.vision_mode = vision_mode
+        self.images_per_request = max(1, images_per_request)
+        self.frames_per_chunk = max(1, frames_per_chunk)
+        self.image_height = image_height
+        self.frame_cache = frame_cache
+
+        # Pooled connections, shared when vision and text use the same URL
+        self.vision_transport = get_transport(self.vision_base_url, self.concurrency, max_retries)
+        self.text_transport = get_transport(self.text_base_url, self.concurrency, max_retries)
 
     def _analyze_frame(self, frame_bytes: bytes) -> Optional[str]:
         """Analyze a single frame using vision model"""
+        # Near-identical frames reuse an earlier description, skipping the call
+        if self.frame_cache:
+            cached = self.frame_cache.get(frame_bytes, self.vision_model)
+            if cached:
+                return cached
+
         try:
             # Encode frame as base64
             frame_b64 = base64.b64encode(frame_bytes).decode('utf-8')
@@ -101,21 +109,25 @@ class OpenAIProvider:
             }
 
             # Send to vision-specific OpenAI-compatible API
-            response = requests.post(
-                f"{self.vision_base_url}/chat/completions",
-                json={
-                    "model": self.vision_model,
-                    "messages": messages,
-                    "max_tokens": 100,
-                    "temperature": 0.7
-                },
-                headers=vision_headers,
-                timeout=30
-            )
+            with endpoint_slot(self.vision_base_url, self.concurrency):
+                response = self.vision_transport.post(
+                    "/chat/completions",
+                    json={
+                        "model": self.vision_model,
+                        "messages": messages,
+                        "max_tokens": 100,
+                        "temperature": 0.7
+                    },
+                    headers=vision_headers,
+                    timeout=30
+                )
 
             if response.status_code == 200:
                 result = response.json()
-                return result['choices'][0]['message']['content'].strip()
+                description = result['choices'][0]['message']['content'].strip()
+                if self.frame_cache:
+                    self.frame_cache.put(frame_bytes, self.vision_model, description)
+                return description
             else:
                 print(f"❌ API error: {response.status_code} - {response.text}")
                 return None
@@ -124,6 +136,45 @@ class OpenAIProvider:
             print(f"❌ Frame analysis error: {e}")
             return None
 
+    def _analyze_images(self, images: List[bytes]) -> Optional[Dict]:
+        """Ask for a timeline card from several frames in one request"""
+        try:
+            content = [{"type": "text", "text": card_prompt(len(images))}]
+            for image in images:
+                image_b64 = base64.b64encode(image).decode('utf-8')
+                content.append({
+                    "type": "image_url",
+                    "image_url": {"url": f"data:image/jpeg;base64,{image_b64}"}
+                })
+
+            vision_headers = {
+                "Authorization": f"Bearer {self.vision_api_key}",
+                "Content-Type": "application/json"
+            }
+
+            with endpoint_slot(self.vision_base_url, self.concurrency):
+                response = self.vision_transport.post(
+                    "/chat/completions",
+                    json={
+                        "model": self.vision_model,
+                        "messages": [{"role": "user", "content": content}],
+                        "max_tokens": 200,
+                        "temperature": 0.7
+                    },
+                    headers=vision_headers,
+                    timeout=60
+                )
+
+            if response.status_code == 200:
+                result = response.json()
+                return parse_card(result['choices'][0]['message']['content'].strip())
+            print(f"❌ API error: {response.status_code} - {response.text}")
+            return None
+
+        except Exception as e:
+            print(f"❌ Multi-image analysis error: {e}")
+            return None
+
     def _synthesize_descriptions(self, descriptions: List[str]) -> Optional[Dict]:
         """Synthesize frame descriptions into timeline card"""
         try:
@@ -153,17 +204,18 @@ Format as JSON only:
                 "Content-Type": "application/json"
             }
 
-            response = requests.post(
-                f"{self.text_base_url}/chat/completions",
-                json={
-                    "model": self.text_model,
-                    "messages": messages,
-                    "max_tokens": 200,
-                    "temperature": 0.7
-                },
-                headers=text_headers,
-                timeout=30
-            )
+            with endpoint_slot(self.text_base_url, self.concurrency):
+                response = self.text_transport.post(
+                    "/chat/completions",
+                    json={
+                        "model": self.text_model,
+                        "messages": messages,
+                        "max_tokens": 200,
+                        "temperature": 0.7
+                    },
+                    headers=text_headers,
+                    timeout=30
+                )
 
             if response.status_code == 200:
                 result = response.json()
@@ -182,16 +234,24 @@ Format as JSON only:
             print(f"❌ Synthesis error: {e}")
             return None
 
-    def analyze_video(self, video_path: Path) -> Optional[Dict]:
+    def analyze_video(self, video_path: Path,
+                      keyframe_paths: Optional[List[Path]] = None) -> Optional[Dict]:
         """
         Analyze a video file using frame extraction + description
 
+        Keyframes from the recorder's sidecar are used when available; the
+        video is only decoded for chunks recorded without them.
+
         Returns:
             Dict with 'title', 'summary', 'category'
         """
         try:
-            print(f"🎬 Extracting frames from: {video_path.name}")
-            frames = self._extract_frames(video_path, num_frames=5)
+            frames = load_keyframes(keyframe_paths) if keyframe_paths else []
+            if frames:
+                print(f"🖼️  Using {len(frames)} keyframes for: {video_path.name}")
+            else:
+                print(f"🎬 Extracting frames from: {video_path.name}")
+                frames = extract_frames(video_path, num_frames=5)
 
             if not frames:
                 print(f"❌ No frames extracted")
@@ -199,8 +259,7 @@ Format as JSON only:
 
             print(f"🔍 Analyzing {len(frames)} frames...")
             descriptions = []
-            for i, frame_bytes in enumerate(frames):
-                desc = self._analyze_frame(frame_bytes)
+            for i, desc in enumerate(ordered_map(self._analyze_frame, frames, self.concurrency)):
                 if desc:
                     descriptions.append(desc)
                     print(f"  Frame {i+1}/{len(frames)}: {desc[:60]}...")
@@ -227,11 +286,27 @@ Format as JSON only:
             print(f"❌ Video analysis error: {e}")
             return None
 
-    def analyze_batch(self, video_paths: List[Path]) -> List[Dict]:
-        """Analyze multiple videos"""
-        results = []
-        for video_path in video_paths:
-            result = self.analyze_video(video_path)
-            if result:
-                results.append(result)
-        return results
\ No newline at end of file
+    def analyze_batch(self, video_paths: List[Path],
+                      keyframes: Optional[List[List[Path]]] = None) -> List[Dict]:
+        """Analyze multiple videos, optionally with each video's keyframe paths
+
+        Videos are analyzed concurrently; requests to each endpoint are
+        still capped at `concurrency` in flight. Results keep input order
+        and carry the `chunk_range` of the videos they cover.
+        """
+        if self.vision_mode == 'multi_image':
+            results = analyze_packed(self, video_paths, keyframes)
+        else:
+            def analyze(i):
+                keyframe_paths = keyframes[i] if keyframes and i < len(keyframes) else None
+                result = self.analyze_video(video_paths[i], keyframe_paths)
+                if result:
+                    result['chunk_range'] = (i, i)
+                return result
+
+            results = ordered_map(analyze, range(len(video_paths)), self.concurrency)
+        print_transport_stats(self.vision_transport)
+        if self.text_transport is not self.vision_transport:
+            print_transport_stats(self.text_transport)
+        print_cache_stats(self.frame_cache)
+        return [result for result in results if result]
\ No newline at end of file
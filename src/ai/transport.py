@@ -0,0 +1,152 @@
+"""
+HTTP transport shared by the HTTP-based providers (Ollama, OpenAI)
+
+One pooled requests.Session per base URL keeps connections alive across
+frames, chunks and provider instances instead of paying a TCP/TLS
+handshake per request. Rate limits (429) and transient server errors
+(5xx, connection errors, timeouts) are retried with jittered exponential
+backoff, honouring Retry-After when the server sends one. Every attempt
+is timed, and stats() summarizes recent latencies for logging.
+"""
+
+import random
+import time
+from collections import deque
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from threading import Lock
+from typing import Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class Transport:
+    """Pooled session for one base URL, with retries and timing"""
+
+    def __init__(self, base_url: str, pool_size: int = 4, max_retries: int = 3,
+                 backoff: float = 0.5, max_backoff: float = 30.0):
+        self.base_url = base_url.rstrip('/')
+        self.pool_size = max(1, pool_size)
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+
+        self.session = requests.Session()
+        # Retries are handled here, so they can honour Retry-After and be timed
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size, max_retries=0)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+        self._lock = Lock()
+        self._latencies = deque(maxlen=500)  # seconds, recent attempts
+        self.calls = 0
+        self.retries = 0
+        self.failures = 0
+
+    def post(self, path: str, **kwargs) -> requests.Response:
+        """POST to base_url + path, retrying rate limits and transient errors
+
+        Returns the last response once retries run out (the caller checks
+        the status as before); re-raises the last connection error or
+        timeout if no response was ever received.
+        """
+        url = f"{self.base_url}{path}"
+        for attempt in range(self.max_retries + 1):
+            start = time.perf_counter()
+            response, error = None, None
+            try:
+                response = self.session.post(url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                error = e
+            self._record(time.perf_counter() - start, attempt)
+
+            if error is None and response.status_code not in RETRY_STATUSES:
+                return response
+            if attempt == self.max_retries:
+                with self._lock:
+                    self.failures += 1
+                if error is not None:
+                    raise error
+                return response
+
+            delay = self._retry_delay(attempt, response)
+            reason = response.status_code if response is not None else type(error).__name__
+            print(f"⚠️  {reason} from {url}, retrying in {delay:.1f}s "
+                  f"({attempt + 1}/{self.max_retries})")
+            time.sleep(delay)
+
+    def _retry_delay(self, attempt: int, response: Optional[requests.Response]) -> float:
+        """Retry-After if given, else full-jitter exponential backoff"""
+        retry_after = response.headers.get('Retry-After') if response is not None else None
+        if retry_after:
+            delay = _parse_retry_after(retry_after)
+            if delay is not None:
+                return min(delay, self.max_backoff)
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+    def _record(self, seconds: float, attempt: int):
+        with self._lock:
+            self._latencies.append(seconds)
+            self.calls += 1
+            self.retries += attempt > 0
+
+    def stats(self) -> Dict:
+        """Call counts and latency percentiles (ms) over recent attempts"""
+        with self._lock:
+            latencies = sorted(self._latencies)
+            stats = {'calls': self.calls, 'retries': self.retries, 'failures': self.failures}
+        if latencies:
+            stats['p50_ms'] = latencies[len(latencies) // 2] * 1000
+            stats['p95_ms'] = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000
+        return stats
+
+    def close(self):
+        self.session.close()
+
+
+def _parse_retry_after(value: str) -> Optional[float]:
+    """Retry-After as seconds: either delta-seconds or an HTTP date"""
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+def print_transport_stats(transport: Transport):
+    """Log a one-line latency summary for a transport"""
+    stats = transport.stats()
+    if 'p50_ms' in stats:
+        print(f"🌐 {transport.base_url}: {stats['calls']} requests, "
+              f"p50 {stats['p50_ms']:.0f} ms, p95 {stats['p95_ms']:.0f} ms, "
+              f"{stats['retries']} retries, {stats['failures']} failed")
+
+
+_transports: Dict[str, Transport] = {}
+_transports_lock = Lock()
+
+
+def get_transport(base_url: str, pool_size: int = 4, max_retries: int = 3) -> Transport:
+    """The shared transport for a base URL, created on first use
+
+    A later call with a different pool size or retry count (settings were
+    changed) replaces it.
+    """
+    base_url = base_url.rstrip('/')
+    with _transports_lock:
+        transport = _transports.get(base_url)
+        if (transport is None or transport.pool_size != max(1, pool_size)
+                or transport.max_retries != max_retries):
+            transport = Transport(base_url, pool_size, max_retries)
+            _transports[base_url] = transport
+        return transport
@@ -3,12 +3,13 @@ Timeline generation from recorded chunks
 Manages batch analysis every 15 minutes
 """
 
+import json
 import time
 import uuid
 from datetime import datetime, timedelta
 from pathlib import Path
-from threading import Thread, Event
-from typing import Optional, Callable
+from threading import Thread
+from typing import Dict, List, Optional, Callable
 
 
 # Category color mapping
@@ -31,12 +32,11 @@ CATEGORY_COLORS = {
 class TimelineGenerator:
     """Manages analysis and timeline card generation"""
 
-    def __init__(self, config, storage):
+    def __init__(self, config, storage, scheduler):
         self.config = config
         self.storage = storage
+        self.scheduler = scheduler
         self.is_running = False
-        self._stop_event = Event()
-        self._analysis_thread: Optional[Thread] = None
         self.llm_provider = None
         self.on_card_generated: Optional[Callable] = None
 
@@ -50,9 +50,8 @@ class TimelineGenerator:
             return
 
         self.is_running = True
-        self._stop_event.clear()
-        self._analysis_thread = Thread(target=self._analysis_loop, daemon=True)
-        self._analysis_thread.start()
+        self._schedule_analysis()
+        self.config.add_listener(self._on_interval_changed, 'analysis_interval')
         print("📊 Timeline generator started")
 
     def stop(self):
@@ -61,41 +60,59 @@ class TimelineGenerator:
             return
 
         self.is_running = False
-        self._stop_event.set()
-        if self._analysis_thread:
-            self._analysis_thread.join(timeout=5)
+        self.config.remove_listener(self._on_interval_changed, 'analysis_interval')
+        self.scheduler.cancel('analysis')
         print("⏹️  Timeline generator stopped")
 
-    def _analysis_loop(self):
-        """Background loop to analyze batches periodically"""
-        analysis_interval = self.config.get('analysis_interval', 900)  # 15 minutes
-
-        while not self._stop_event.wait(timeout=60):  # Check every minute
-            try:
-                # Check if it's time to analyze
-                now = datetime.now()
-                last_analysis_time = self.config.get('last_analysis_time', 0)
-
-                if now.timestamp() - last_analysis_time >= analysis_interval:
-                    self._analyze_recent_chunks()
-                    self.config.set('last_analysis_time', now.timestamp())
+    def _schedule_analysis(self):
+        """Register the periodic analysis job"""
+        # A run missed while the app was closed or asleep happens right away
+        self.scheduler.every(
+            'analysis',
+            self.config.get('analysis_interval', 900),  # 15 minutes
+            self._run_scheduled_analysis,
+            jitter=30,
+            last_run=self._last_analysis_time()
+        )
+
+    def _on_interval_changed(self, key, value):
+        """Reschedule when analysis_interval is changed"""
+        self._schedule_analysis()
+
+    def _last_analysis_time(self) -> float:
+        """When the last analysis ran (older versions kept it in config.json)"""
+        return self.storage.get_state('last_analysis_time',
+                                      self.config.get('last_analysis_time', 0))
+
+    def _run_scheduled_analysis(self):
+        """Scheduled job: analyze everything since the last analysis"""
+        now = datetime.now()
+        try:
+            analyzed = self._analyze_recent_chunks()
+        except Exception as e:
+            print(f"❌ Analysis error: {e}")
+            analyzed = False
+        # After a failed run (provider or network error) the next run starts
+        # from the same point, so those chunks are retried rather than skipped
+        if analyzed:
+            self.storage.set_state('last_analysis_time', now.timestamp())
 
-            except Exception as e:
-                print(f"❌ Analysis loop error: {e}")
+    def _analyze_recent_chunks(self) -> bool:
+        """Analyze chunks from the last analysis period
 
-    def _analyze_recent_chunks(self):
-        """Analyze chunks from the last analysis period"""
+        Returns False if the analysis failed and should be retried.
+        """
         if not self.llm_provider:
             print("⚠️  No LLM provider configured, skipping analysis")
             print("   Please configure your AI provider in Settings:")
             print("   • Google Gemini: Requires API key")
             print("   • Ollama: Local LLM, no API key needed")
             print("   • OpenAI Compatible: Custom URL + API key")
-            return
+            return True
 
         analysis_interval = self.config.get('analysis_interval', 900)
         now = datetime.now()
-        last_analysis_time = self.config.get('last_analysis_time', 0)
+        last_analysis_time = self._last_analysis_time()
 
         # Get time range for analysis
         if last_analysis_time == 0:
@@ -106,13 +123,16 @@ class TimelineGenerator:
 
         end_time = now.timestamp()
 
-        # Get chunks in this range
+        # Get chunks in this range, including any still queued for write
+        self.storage.flush()
         chunks = self.storage.get_chunks_for_batch(start_time, end_time)
 
         if not chunks:
             print("📭 No chunks to analyze")
-            return
+            return True
 
+        recorded = chunks
+        chunks = self._one_monitor_per_slot(chunks)
         print(f"📊 Analyzing {len(chunks)} chunks from last {analysis_interval//60} minutes...")
 
         # Create batch record
@@ -120,26 +140,44 @@ class TimelineGenerator:
         self.storage.insert_batch(batch_id, start_time, end_time)
 
         try:
-            # Get video file paths
-            video_paths = [Path(chunk['file_path']) for chunk in chunks
-                          if Path(chunk['file_path']).exists()]
+            # Get video file paths, keeping chunks aligned with them
+            chunks = [chunk for chunk in chunks if Path(chunk['file_path']).exists()]
+            video_paths = [Path(chunk['file_path']) for chunk in chunks]
 
             if not video_paths:
                 print("❌ No valid video files found")
                 self.storage.update_batch_status(batch_id, 'failed')
-                return
+                return True
+
+            # Keyframes written at record time spare the providers a video decode
+            keyframes = self.storage.get_keyframes_for_chunks([chunk['id'] for chunk in chunks])
+            keyframe_paths = [[Path(kf['file_path']) for kf in keyframes[chunk['id']]]
+                              for chunk in chunks]
 
             # Analyze videos
-            results = self.llm_provider.analyze_batch(video_paths)
+            results = self.llm_provider.analyze_batch(video_paths, keyframe_paths)
 
             if not results:
                 print("❌ Analysis returned no results")
                 self.storage.update_batch_status(batch_id, 'failed')
-                return
+                return False
 
             # Create timeline cards from results
+            card_ids = []
+            previous_end = None
             for i, result in enumerate(results):
-                chunk = chunks[min(i, len(chunks)-1)]  # Match to chunk (or use last if fewer results)
+                # Providers report the chunks each card covers; fall back to
+                # matching by position (or the last chunk if fewer results)
+                first, last = result.get('chunk_range', (min(i, len(chunks)-1),) * 2)
+                first, last = max(0, first), min(last, len(chunks)-1)
+
+                # Monitors start their chunks a few seconds apart, so a card
+                # may begin before the previous one ended; trim the overlap
+                start = chunks[first]['start_time']
+                end = chunks[last]['end_time']
+                if previous_end is not None:
+                    start = min(max(start, previous_end), end)
+                previous_end = max(end, previous_end or end)
 
                 card_id = str(uuid.uuid4())
                 title = result.get('title', 'Screen Activity')
@@ -150,8 +188,8 @@ class TimelineGenerator:
                 self.storage.insert_timeline_card(
                     card_id=card_id,
                     batch_id=batch_id,
-                    start_time=chunk['start_time'],
-                    end_time=chunk['end_time'],
+                    start_time=start,
+                    end_time=end,
                     title=title,
                     summary=summary,
                     category=category,
@@ -159,18 +197,58 @@ class TimelineGenerator:
                 )
 
                 print(f"✅ Created card: {title}")
+                card_ids.append(card_id)
 
                 # Notify callback
                 if self.on_card_generated:
                     self.on_card_generated(card_id)
 
+            # Analyzed chunks are the first to go under the disk quota; the
+            # other monitors' chunks of the same slots are covered by the cards
+            self.storage.assign_chunks_to_batch(batch_id, [chunk['id'] for chunk in recorded])
             self.storage.update_batch_status(batch_id, 'completed')
+            # Make the new cards visible to readers right away
+            self.storage.flush()
+            for card_id in card_ids:
+                self.scheduler.emit('card_generated', card_id)
             print(f"🎉 Analysis complete: {len(results)} cards generated")
+            return True
 
         except Exception as e:
             print(f"❌ Analysis error: {e}")
             self.storage.update_batch_status(batch_id, 'failed')
+            return False
+
+    def _one_monitor_per_slot(self, chunks: List[Dict]) -> List[Dict]:
+        """Keep one monitor's chunks per `chunk_duration` time slot
+
+        With each monitor recorded separately, every monitor has a chunk
+        for the same stretch of time; analyzing them all would give
+        overlapping cards and count that time once per monitor. Per slot
+        the monitor that captured the most frames (the one with the most
+        activity) is kept. Single-monitor batches are returned unchanged.
+        """
+        if len({chunk.get('monitor_id') for chunk in chunks}) <= 1:
+            return chunks
+
+        slot_seconds = self.config.get('chunk_duration', 15)
+        slots: Dict[int, Dict] = {}
+        for chunk in chunks:
+            slot = slots.setdefault(int(chunk['start_time'] // slot_seconds), {})
+            slot.setdefault(chunk.get('monitor_id'), []).append(chunk)
+
+        def frame_count(chunk):
+            return len(json.loads(chunk['frame_times'])) if chunk.get('frame_times') else 0
+
+        kept = []
+        for slot in slots.values():
+            monitor_id = max(slot, key=lambda m: (sum(frame_count(c) for c in slot[m]),
+                                                  -(m or 0)))
+            kept.extend(slot[monitor_id])
+        return sorted(kept, key=lambda chunk: chunk['start_time'])
 
     def analyze_now(self):
         """Trigger immediate analysis of recent chunks"""
-        Thread(target=self._analyze_recent_chunks, daemon=True).start()
+        # Through the scheduler, so the next regular run starts from here
+        if not self.scheduler.run_now('analysis'):
+            Thread(target=self._analyze_recent_chunks, daemon=True).start()
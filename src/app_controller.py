@@ -4,13 +4,13 @@
 """
 
 from pathlib import Path
-from core.config import config
+from threading import Thread
+from core.config import get_config
 from core.storage import Storage
 from core.recorder import ScreenRecorder
 from core.cleanup import CleanupService
-from ai.gemini_provider import GeminiProvider
-from ai.ollama_provider import OllamaProvider
-from ai.openai_provider import OpenAIProvider
+from core.scheduler import Scheduler
+from ai import get_provider_class
 from analysis.timeline_generator import TimelineGenerator
 
 
@@ -19,26 +19,60 @@ class AppController:
 
     def __init__(self):
         # Core components
+        config = get_config()
         self.config = config
-        self.storage = Storage(config.db_path)
+        self.storage = Storage(
+            config.db_path,
+            write_behind=config.get('storage_write_behind', False),
+            write_behind_batch_size=config.get('write_behind_batch_size', 100),
+            write_behind_interval=config.get('write_behind_interval', 2.0)
+        )
+
+        # Shared scheduler for all timed and event-driven background work
+        self.scheduler = Scheduler()
 
         # Recording
         self.recorder = ScreenRecorder(config, self.storage)
+        self.recorder.on_chunk_completed = lambda chunk_id: self.scheduler.emit('chunk_completed', chunk_id)
         self.is_recording = False
 
         # Analysis
-        self.timeline_generator = TimelineGenerator(config, self.storage)
+        self.timeline_generator = TimelineGenerator(config, self.storage, self.scheduler)
         self.llm_provider = None
+        self.frame_cache = None
 
         # Cleanup
-        self.cleanup_service = CleanupService(config, self.storage)
+        self.cleanup_service = CleanupService(config, self.storage, self.scheduler)
 
         # UI (set later)
         self.window = None
         self.tray_icon = None
 
-        # Initialize LLM provider
-        self.init_llm_provider()
+    def _request_options(self) -> dict:
+        """Ollama 与 OpenAI 提供商共用的请求设置"""
+        return {
+            'concurrency': self.config.get('llm_concurrency', 4),
+            'max_retries': self.config.get('llm_max_retries', 3),
+            'vision_mode': self.config.get('vision_mode', 'per_frame'),
+            'images_per_request': self.config.get('images_per_request', 10),
+            'frames_per_chunk': self.config.get('multi_image_frames_per_chunk', 2),
+            'image_height': self.config.get('multi_image_height', 768),
+            'frame_cache': self._get_frame_cache(),
+        }
+
+    def _get_frame_cache(self):
+        """帧描述缓存（与 dayflow.db 同目录的独立数据库），首次使用时打开"""
+        if not self.config.get('frame_cache_enabled', False):
+            return None
+        if self.frame_cache is None:
+            from ai.frame_cache import FrameCache
+            self.frame_cache = FrameCache(
+                self.config.db_path.with_name('frame_cache.db'),
+                max_distance=self.config.get('frame_cache_max_distance', 4),
+                max_entries=self.config.get('frame_cache_max_entries', 20000),
+                ttl_days=self.config.get('frame_cache_ttl_days', 30)
+            )
+        return self.frame_cache
 
     def init_llm_provider(self):
         """根据配置初始化 LLM 提供商"""
@@ -51,12 +85,14 @@ class AppController:
                     print("⚠️  未配置 Gemini API 密钥")
                     self.llm_provider = None
                 else:
-                    self.llm_provider = GeminiProvider(api_key)
+                    self.llm_provider = get_provider_class('gemini')(api_key)
                     print("✅ Gemini 提供商已初始化")
             elif provider_type == 'ollama':
                 base_url = self.config.get('ollama_base_url', 'http://localhost:11434')
                 model = self.config.get('ollama_model', 'llava')
-                self.llm_provider = OllamaProvider(base_url, model)
+                self.llm_provider = get_provider_class('ollama')(
+                    base_url, model, **self._request_options()
+                )
                 print("✅ Ollama 提供商已初始化")
             elif provider_type == 'openai':
                 # Get configuration for vision and text models separately
@@ -75,9 +111,10 @@ class AppController:
                     print("⚠️  未配置 OpenAI API 密钥")
                     self.llm_provider = None
                 else:
-                    self.llm_provider = OpenAIProvider(
+                    self.llm_provider = get_provider_class('openai')(
                         default_api_key, default_base_url, vision_model, text_model,
-                        vision_api_key, vision_base_url, text_api_key, text_base_url
+                        vision_api_key, vision_base_url, text_api_key, text_base_url,
+                        **self._request_options()
                     )
                     print(f"✅ OpenAI 提供商已初始化")
                     print(f"   视觉模型：{vision_model} (URL: {vision_base_url})")
@@ -111,21 +148,43 @@ class AppController:
 
     def start_services(self):
         """启动后台服务"""
-        # Start timeline generator
-        self.timeline_generator.start()
+        self.scheduler.start()
+
+        # Loading the provider SDK is slow, so it happens in the background
+        # instead of holding up the window
+        Thread(target=self._start_analysis, daemon=True).start()
 
         # Start cleanup service
         self.cleanup_service.start()
 
-        # Auto-start recording if enabled
+    def resume_recording(self):
+        """如果上次退出时正在录制，则在后台恢复录制"""
+        # Starting the recorder imports mss, cv2 and numpy, so it runs once
+        # the window exists rather than before it
         if self.config.get('recording_enabled', False):
-            self.start_recording()
+            Thread(target=self._resume_recording, daemon=True).start()
+
+    def _resume_recording(self):
+        """恢复录制并刷新窗口状态"""
+        self.start_recording()
+        if self.window:
+            self.window.after(0, self.window._update_status)
+
+    def _start_analysis(self):
+        """初始化 LLM 提供商并启动时间线生成器"""
+        self.init_llm_provider()
+        self.timeline_generator.start()
 
     def stop_services(self):
         """停止所有后台服务"""
         self.stop_recording()
         self.timeline_generator.stop()
         self.cleanup_service.stop()
+        self.scheduler.stop()
+        self.storage.close()
+        if self.frame_cache:
+            self.frame_cache.close()
+        self.config.flush()
 
     def run(self):
         """运行应用程序"""
@@ -138,6 +197,7 @@ class AppController:
 
         # Create and show main window
         self.window = MainWindow(self)
+        self.resume_recording()
 
         # Create tray icon
         self.tray_icon = TrayIcon(self)
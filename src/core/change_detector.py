@@ -0,0 +1,60 @@
+"""
+Cheap screen change detection on downscaled frames
+"""
+
+from typing import Optional
+import cv2
+import numpy as np
+
+
+class ChangeDetector:
+    """Detects visual change between frames by counting changed thumbnail pixels
+
+    Frames are reduced to a small grayscale thumbnail before comparison, so a
+    check costs a fraction of a full-frame conversion. A frame counts as
+    changed when at least `min_pixels` thumbnail pixels differ by more than
+    `pixel_threshold`. Counting local differences rather than averaging over
+    the whole frame keeps small edits (typing a word, a new line of code)
+    from being lost in an otherwise static screen, while a blinking text
+    cursor stays below the pixel count.
+
+    Each frame is compared against the last frame reported as changed, which
+    means slow drift still accumulates into a change eventually.
+    """
+
+    def __init__(self, min_pixels: int = 3, pixel_threshold: int = 16, size=(160, 90)):
+        self.min_pixels = min_pixels
+        self.pixel_threshold = pixel_threshold
+        self.size = size
+        self.last_score = 0
+        self._reference: Optional[np.ndarray] = None
+
+    def thumbnail(self, frame: np.ndarray) -> np.ndarray:
+        """Downscale a BGR/BGRA frame to a grayscale thumbnail"""
+        small = cv2.resize(frame, self.size, interpolation=cv2.INTER_AREA)
+        if small.ndim == 3:
+            code = cv2.COLOR_BGRA2GRAY if small.shape[2] == 4 else cv2.COLOR_BGR2GRAY
+            small = cv2.cvtColor(small, code)
+        return small
+
+    def check(self, frame: np.ndarray) -> bool:
+        """Return True if the frame differs from the last changed frame"""
+        thumb = self.thumbnail(frame)
+
+        if self._reference is None or self._reference.shape != thumb.shape:
+            self._reference = thumb
+            self.last_score = thumb.size
+            return True
+
+        # Number of thumbnail pixels that changed noticeably
+        diff = cv2.absdiff(thumb, self._reference)
+        self.last_score = int(np.count_nonzero(diff > self.pixel_threshold))
+        if self.last_score >= self.min_pixels:
+            self._reference = thumb
+            return True
+        return False
+
+    def reset(self):
+        """Forget the reference frame so the next frame counts as changed"""
+        self._reference = None
+        self.last_score = 0
@@ -5,19 +5,38 @@ Storage cleanup service - removes old recordings
 import os
 from datetime import datetime, timedelta
 from pathlib import Path
-from threading import Thread, Event
+from threading import Thread, Event, Lock
 import time
 
+# reconcile, retention (cv2) and the process pool (multiprocessing) are
+# imported when first used
+
 
 class CleanupService:
-    """Manages automatic cleanup of old recordings"""
+    """Manages automatic cleanup of old recordings
+
+    Besides the daily age-based cleanup, an optional disk budget
+    (`max_recordings_mb`) is enforced: once the recorded chunk sizes cross
+    the high-water mark, the oldest chunks are evicted, analyzed ones first,
+    until usage is back under the low-water mark.
+
+    With `downsample_after_days` set, chunks older than that are re-encoded
+    into a smaller tier (see core/retention.py) before they reach
+    `retention_days` and are deleted.
+
+    All runs are driven by the shared Scheduler: the cleanup daily at 3 AM
+    (caught up on start if missed), the quota check hourly and after every
+    completed chunk.
+    """
 
-    def __init__(self, config, storage):
+    def __init__(self, config, storage, scheduler):
         self.config = config
         self.storage = storage
+        self.scheduler = scheduler
         self.is_running = False
+        # Lets long-running work (downsampling) stop early on shutdown
         self._stop_event = Event()
-        self._cleanup_thread = None
+        self._eviction_lock = Lock()
 
     def start(self):
         """Start cleanup service"""
@@ -26,8 +45,12 @@ class CleanupService:
 
         self.is_running = True
         self._stop_event.clear()
-        self._cleanup_thread = Thread(target=self._cleanup_loop, daemon=True)
-        self._cleanup_thread.start()
+        # Older versions kept last_cleanup_time in config.json
+        last_cleanup = self.storage.get_state('last_cleanup_time',
+                                              self.config.get('last_cleanup_time', 0))
+        self.scheduler.daily('cleanup', 3, self._run_cleanup, jitter=900, last_run=last_cleanup)
+        self.scheduler.every('quota_check', 3600, self.check_quota)
+        self.scheduler.on('chunk_completed', self._on_chunk_completed)
         print("🧹 Cleanup service started")
 
     def stop(self):
@@ -37,31 +60,14 @@ class CleanupService:
 
         self.is_running = False
         self._stop_event.set()
-        if self._cleanup_thread:
-            self._cleanup_thread.join(timeout=5)
+        self.scheduler.cancel('cleanup')
+        self.scheduler.cancel('quota_check')
+        self.scheduler.off('chunk_completed', self._on_chunk_completed)
         print("⏹️  Cleanup service stopped")
 
-    def _cleanup_loop(self):
-        """Background loop to clean up old recordings"""
-        # Run cleanup daily at 3 AM, or immediately if first run
-        last_cleanup = self.config.get('last_cleanup_time', 0)
-        now = time.time()
-
-        # If never run or more than 24 hours ago, run immediately
-        if now - last_cleanup > 24 * 3600:
-            self._run_cleanup()
-
-        while not self._stop_event.is_set():
-            # Check every hour
-            if self._stop_event.wait(timeout=3600):
-                break
-
-            # Run cleanup at 3 AM
-            current_hour = datetime.now().hour
-            if current_hour == 3:
-                last_cleanup = self.config.get('last_cleanup_time', 0)
-                if now - last_cleanup > 12 * 3600:  # Don't run twice in 12 hours
-                    self._run_cleanup()
+    def _on_chunk_completed(self, chunk_id: str):
+        """A new chunk may have pushed recordings over the disk budget"""
+        self.check_quota()
 
     def _run_cleanup(self):
         """Execute cleanup of old recordings"""
@@ -72,8 +78,11 @@ class CleanupService:
 
         try:
             # Get old chunks from database
+            self.storage.flush()
             chunks = self.storage.get_chunks_for_batch(0, cutoff_time)
 
+            keyframes = self.storage.get_keyframes_for_chunks([chunk['id'] for chunk in chunks])
+
             deleted_count = 0
             freed_bytes = 0
 
@@ -88,6 +97,8 @@ class CleanupService:
                     except Exception as e:
                         print(f"❌ Error deleting {file_path}: {e}")
 
+                freed_bytes += self._delete_keyframes(keyframes.get(chunk['id'], []))
+
             # Delete from database
             deleted_db_count = self.storage.delete_old_chunks(cutoff_time)
 
@@ -96,11 +107,204 @@ class CleanupService:
                   f"({freed_mb:.1f} MB), {deleted_db_count} database records")
 
             # Update last cleanup time
-            self.config.set('last_cleanup_time', time.time())
+            self.storage.set_state('last_cleanup_time', time.time())
+
+            self.reconcile()
+            self._downsample_old_chunks()
 
         except Exception as e:
             print(f"❌ Cleanup error: {e}")
 
+    def reconcile(self):
+        """Remove or reimport orphaned files and drop rows whose file is gone"""
+        from .reconcile import Reconciler
+        try:
+            report = Reconciler(
+                self.storage,
+                self.config.recordings_dir,
+                action=self.config.get('orphan_action', 'reimport'),
+                grace_seconds=self.config.get('orphan_grace_seconds', 3600),
+                workers=self.config.get('reconcile_workers', 4)
+            ).run()
+        except Exception as e:
+            print(f"❌ Reconciliation error: {e}")
+            return
+
+        freed_mb = report['bytes_reclaimed'] / (1024 * 1024)
+        print(f"🔍 Reconciliation: scanned {report['scanned_files']} files, "
+              f"deleted {report['deleted_files']} orphans ({freed_mb:.1f} MB), "
+              f"reimported {report['reimported_files']}, "
+              f"removed {report['deleted_rows']} dangling rows")
+        return report
+
+    def _downsample_old_chunks(self):
+        """Re-encode chunks past `downsample_after_days` into a smaller tier"""
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor, as_completed
+        from .retention import (TIER_REDUCED, TIER_TIMELAPSE, encoder_settings,
+                                lower_priority, reencode_chunk)
+        after_days = self.config.get('downsample_after_days', 0)
+        if after_days <= 0 or after_days >= self.config.get('retention_days', 3):
+            return
+
+        tier = self.config.get('downsample_mode', TIER_REDUCED)
+        if tier not in (TIER_REDUCED, TIER_TIMELAPSE):
+            print(f"⚠️  Unknown downsample mode '{tier}', using {TIER_REDUCED}")
+            tier = TIER_REDUCED
+
+        cutoff_time = (datetime.now() - timedelta(days=after_days)).timestamp()
+        chunks = self.storage.get_chunks_for_downsampling(cutoff_time)
+        if not chunks:
+            return
+
+        workers = max(1, min(self.config.get('downsample_workers', 1), os.cpu_count() or 1))
+        height = self.config.get('downsample_height', 480)
+        fps = self.config.get('downsample_fps', 0.2)
+        settings = encoder_settings(self.config)
+        keyframes = self.storage.get_keyframes_for_chunks([chunk['id'] for chunk in chunks])
+        print(f"🗜️  Downsampling {len(chunks)} chunks to '{tier}' on {workers} core(s)...")
+
+        done = 0
+        freed_bytes = 0
+        # Spawn rather than fork: forking a process full of capture, database
+        # and UI threads can copy a held lock into the worker and deadlock it
+        with ProcessPoolExecutor(max_workers=workers, initializer=lower_priority,
+                                 mp_context=multiprocessing.get_context('spawn')) as pool:
+            futures = {
+                pool.submit(reencode_chunk, chunk['file_path'], tier, height, fps,
+                            [(kf['timestamp'] - chunk['start_time'], kf['file_path'])
+                             for kf in keyframes[chunk['id']]],
+                            settings, chunk['frame_times']): chunk
+                for chunk in chunks
+            }
+            for future in as_completed(futures):
+                if self._stop_event.is_set():
+                    # shutdown(cancel_futures=True) needs Python 3.9
+                    for pending in futures:
+                        pending.cancel()
+                    pool.shutdown(wait=False)
+                    break
+
+                chunk = futures[future]
+                try:
+                    file_path, file_size, frame_times = future.result()
+                except Exception as e:
+                    print(f"❌ Error downsampling {chunk['file_path']}: {e}")
+                    continue
+
+                # Timelapses are built from the keyframes, so the sidecar goes too
+                drop_keyframes = tier == TIER_TIMELAPSE
+                if not drop_keyframes:
+                    file_size += self._keyframes_size(keyframes[chunk['id']])
+                self.storage.update_chunk_tier(chunk['id'], tier, file_path, file_size,
+                                               frame_times, drop_keyframes)
+                if file_path != chunk['file_path']:
+                    Path(chunk['file_path']).unlink(missing_ok=True)
+                if drop_keyframes:
+                    self._delete_keyframes(keyframes[chunk['id']])
+
+                freed_bytes += chunk['file_size'] - file_size
+                done += 1
+
+        print(f"✅ Downsampling complete: {done}/{len(chunks)} chunks, "
+              f"{freed_bytes / (1024 * 1024):.1f} MB freed")
+
+    def check_quota(self):
+        """Run an eviction pass if recordings exceed the high-water mark
+
+        Cheap enough to call after every chunk: a single indexed SUM over
+        the sizes recorded at write time.
+        """
+        max_bytes = self.config.get('max_recordings_mb', 0) * 1024 * 1024
+        if max_bytes <= 0 or self._eviction_lock.locked():
+            return
+
+        try:
+            usage = self.storage.get_recordings_size()
+        except Exception as e:
+            print(f"❌ Quota check error: {e}")
+            return
+
+        if usage > max_bytes * self.config.get('quota_high_water', 0.95):
+            self._evict_to_quota()
+
+    def _evict_to_quota(self):
+        """Delete oldest chunks (analyzed first) down to the low-water mark"""
+        if not self._eviction_lock.acquire(blocking=False):
+            return
+
+        try:
+            self.storage.flush()
+            max_bytes = self.config.get('max_recordings_mb', 0) * 1024 * 1024
+            target = max_bytes * self.config.get('quota_low_water', 0.85)
+            usage = self.storage.get_recordings_size()
+            start_usage = usage
+
+            deleted_count = 0
+            while usage > target:
+                candidates = self.storage.get_eviction_candidates()
+                if not candidates:
+                    break
+
+                evicted = []
+                for chunk in candidates:
+                    if usage <= target:
+                        break
+                    evicted.append(chunk)
+                    usage -= chunk['file_size']
+
+                keyframes = self.storage.get_keyframes_for_chunks([chunk['id'] for chunk in evicted])
+                for chunk in evicted:
+                    try:
+                        Path(chunk['file_path']).unlink(missing_ok=True)
+                    except Exception as e:
+                        print(f"❌ Error deleting {chunk['file_path']}: {e}")
+                    self._delete_keyframes(keyframes.get(chunk['id'], []))
+
+                deleted_count += self.storage.delete_chunks([chunk['id'] for chunk in evicted])
+
+            freed_mb = (start_usage - usage) / (1024 * 1024)
+            print(f"🧹 Quota eviction: Deleted {deleted_count} chunks ({freed_mb:.1f} MB), "
+                  f"{usage / (1024 * 1024):.1f} / {max_bytes / (1024 * 1024):.0f} MB used")
+
+        except Exception as e:
+            print(f"❌ Quota eviction error: {e}")
+        finally:
+            self._eviction_lock.release()
+
+    @staticmethod
+    def _keyframes_size(keyframes) -> int:
+        """Bytes on disk of a chunk's keyframe sidecar"""
+        size = 0
+        for keyframe in keyframes:
+            try:
+                size += Path(keyframe['file_path']).stat().st_size
+            except OSError:
+                pass
+        return size
+
+    def _delete_keyframes(self, keyframes) -> int:
+        """Delete a chunk's keyframe sidecar, returning the bytes freed"""
+        freed_bytes = 0
+        sidecar_dirs = set()
+        for keyframe in keyframes:
+            path = Path(keyframe['file_path'])
+            sidecar_dirs.add(path.parent)
+            try:
+                if path.exists():
+                    freed_bytes += path.stat().st_size
+                    path.unlink()
+            except Exception as e:
+                print(f"❌ Error deleting {path}: {e}")
+
+        for sidecar_dir in sidecar_dirs:
+            try:
+                sidecar_dir.rmdir()
+            except OSError:
+                pass
+        return freed_bytes
+
     def run_now(self):
         """Trigger immediate cleanup"""
-        Thread(target=self._run_cleanup, daemon=True).start()
+        if not self.scheduler.run_now('cleanup'):
+            Thread(target=self._run_cleanup, daemon=True).start()
@@ -5,12 +5,24 @@ Handles settings storage and retrieval
 
 import os
 import json
+import atexit
+import tempfile
+import threading
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, Callable, Dict, List, Optional
 
 
 class Config:
-    """Manage application configuration"""
+    """Manage application configuration
+
+    Settings live in memory; set() notifies listeners and schedules a save,
+    so a burst of changes is written once, `save_delay` seconds after the
+    first. Saves go to a temp file that replaces config.json atomically, so
+    a crash never leaves a truncated file. flush() writes pending changes
+    immediately (also run at exit).
+    """
+
+    save_delay = 1.0  # seconds
 
     def __init__(self):
         # Determine config directory based on platform
@@ -27,8 +39,15 @@ class Config:
 
         self.recordings_dir.mkdir(exist_ok=True)
 
+        self._lock = threading.RLock()
+        self._write_lock = threading.Lock()
+        self._listeners: Dict[Optional[str], List[Callable]] = {}
+        self._save_timer: Optional[threading.Timer] = None
+        self._dirty = False
+
         # Load or create config
         self._config = self._load_config()
+        atexit.register(self.flush)
 
     def _load_config(self) -> dict:
         """Load configuration from file"""
@@ -47,9 +66,34 @@ class Config:
             'first_launch': True,
             'recording_enabled': False,
             'fps': 1,
+            'adaptive_fps': False,  # follow on-screen activity instead of a fixed fps
+            'min_fps': 0.2,
+            'max_fps': 4,
+            'capture_cpu_budget': 0.1,  # fraction of one core for capture + encode
             'chunk_duration': 15,  # seconds
+            'video_encoder': 'opencv',  # 'opencv', 'ffmpeg' or 'mjpeg'
+            'ffmpeg_codec': 'libx264',  # 'libx264' or 'libvpx-vp9'
+            'ffmpeg_crf': 30,
+            'ffmpeg_preset': 'veryfast',
+            'keyframes_per_chunk': 5,  # JPEG keyframes saved alongside each chunk
+            'keyframe_jpeg_quality': 85,
             'target_height': 1080,
+            'capture_monitors': 'primary',  # 'primary', 'all', or a list of monitor numbers
+            'monitor_mode': 'separate',  # 'separate' pipelines or one 'composite' frame
+            'frame_queue_size': 8,  # frames buffered between capture and encode
+            'queue_policy': 'drop_oldest',  # 'drop_oldest' or 'block'
             'retention_days': 3,
+            'max_recordings_mb': 0,  # disk budget for recordings, 0 = age-based cleanup only
+            'quota_high_water': 0.95,  # evict once usage exceeds this fraction of the budget
+            'quota_low_water': 0.85,  # ...down to this fraction
+            'downsample_after_days': 0,  # shrink chunks older than this, 0 = off
+            'downsample_mode': 'reduced',  # 'reduced' (lower res/fps) or 'timelapse' (keyframes only)
+            'downsample_height': 480,
+            'downsample_fps': 0.2,
+            'downsample_workers': 1,  # cores used by the background re-encode pool
+            'orphan_action': 'reimport',  # files without a db row: 'reimport' or 'delete'
+            'orphan_grace_seconds': 3600,  # leave files this recent alone
+            'reconcile_workers': 4,  # threads scanning date directories
             'llm_provider': 'gemini',  # 'gemini', 'ollama', or 'openai'
             'gemini_api_key': '',
             'ollama_base_url': 'http://localhost:11434',
@@ -58,28 +102,92 @@ class Config:
             'openai_base_url': 'https://api.openai.com/v1',
             'openai_vision_model': 'gpt-4o',  # For analyzing images
             'openai_text_model': 'gpt-4o',    # For synthesis and summarization
+            'llm_concurrency': 4,  # requests in flight (and pooled connections) per API endpoint
+            'llm_max_retries': 3,  # retries on 429/5xx/connection errors, with backoff
+            'vision_mode': 'per_frame',  # 'per_frame' or 'multi_image' (one card request per group of chunks)
+            'images_per_request': 10,  # multi_image: max images per request
+            'multi_image_frames_per_chunk': 2,
+            'multi_image_height': 768,  # multi_image: frames scaled down to this height
+            'frame_cache_enabled': False,  # reuse descriptions of near-identical frames (may mix up same-layout screens)
+            'frame_cache_max_distance': 4,  # max differing bits of the 64-bit perceptual hash
+            'frame_cache_max_entries': 20000,
+            'frame_cache_ttl_days': 30,
+            'storage_write_behind': False,  # group chunk/card inserts into batched commits
+            'write_behind_batch_size': 100,
+            'write_behind_interval': 2.0,  # seconds
             'analysis_interval': 900,  # 15 minutes in seconds
             'idle_timeout': 300,  # 5 minutes
+            'dedupe_frames': True,  # skip frames identical to the previous one
+            'change_min_pixels': 3,  # changed pixels of the 160x90 thumbnail that count as a change
+            'change_pixel_threshold': 16,  # grayscale difference (0-255) that marks a pixel as changed
             'window_width': 1200,
             'window_height': 800,
         }
 
     def save(self):
-        """Save configuration to file"""
-        try:
-            with open(self.config_file, 'w') as f:
-                json.dump(self._config, f, indent=2)
-        except Exception as e:
-            print(f"Error saving config: {e}")
+        """Save configuration to file now (atomically)"""
+        # Writes are serialized so an older snapshot never replaces a newer one
+        with self._write_lock:
+            with self._lock:
+                if self._save_timer:
+                    self._save_timer.cancel()
+                    self._save_timer = None
+                data = json.dumps(self._config, indent=2)
+                self._dirty = False
+
+            try:
+                fd, tmp_path = tempfile.mkstemp(dir=self.config_dir, prefix='.config-', suffix='.tmp')
+                try:
+                    with os.fdopen(fd, 'w') as f:
+                        f.write(data)
+                        f.flush()
+                        os.fsync(f.fileno())
+                    os.replace(tmp_path, self.config_file)
+                except BaseException:
+                    os.unlink(tmp_path)
+                    raise
+            except Exception as e:
+                print(f"Error saving config: {e}")
+
+    def flush(self):
+        """Write any pending changes now (call on shutdown)"""
+        if self._dirty:
+            self.save()
 
     def get(self, key: str, default: Any = None) -> Any:
         """Get configuration value"""
         return self._config.get(key, default)
 
     def set(self, key: str, value: Any):
-        """Set configuration value and save"""
-        self._config[key] = value
-        self.save()
+        """Set configuration value; it is saved shortly after"""
+        with self._lock:
+            if key in self._config and self._config[key] == value:
+                return
+            self._config[key] = value
+            self._dirty = True
+            if self._save_timer is None:
+                self._save_timer = threading.Timer(self.save_delay, self.save)
+                self._save_timer.daemon = True
+                self._save_timer.start()
+            listeners = self._listeners.get(key, []) + self._listeners.get(None, [])
+
+        for callback in listeners:
+            try:
+                callback(key, value)
+            except Exception as e:
+                print(f"Error in config listener for {key}: {e}")
+
+    def add_listener(self, callback: Callable, key: Optional[str] = None):
+        """Call callback(key, value) when `key` (or, with None, any key) changes"""
+        with self._lock:
+            self._listeners.setdefault(key, []).append(callback)
+
+    def remove_listener(self, callback: Callable, key: Optional[str] = None):
+        """Stop notifying a listener"""
+        with self._lock:
+            listeners = self._listeners.get(key, [])
+            if callback in listeners:
+                listeners.remove(callback)
 
     def get_recordings_path(self, date_str: Optional[str] = None) -> Path:
         """Get path for recordings, optionally for specific date"""
@@ -90,5 +198,22 @@ class Config:
         return self.recordings_dir
 
 
-# Global config instance
-config = Config()
+# Global config instance, created on first use rather than at import
+_config: Optional[Config] = None
+_config_lock = threading.Lock()
+
+
+def get_config() -> Config:
+    """Get the global config instance"""
+    global _config
+    with _config_lock:
+        if _config is None:
+            _config = Config()
+        return _config
+
+
+def __getattr__(name: str):
+    # Keeps `from core.config import config` working
+    if name == 'config':
+        return get_config()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,212 @@
+"""
+SQLite connection management - one long-lived, tuned connection per thread,
+plus an optional write-behind queue for grouped commits
+"""
+
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+
+# Applied to every new connection. journal_mode=WAL is persistent in the
+# database file; the rest are per-connection settings.
+PRAGMAS = (
+    "PRAGMA journal_mode=WAL",       # readers never block the writer and vice versa
+    "PRAGMA synchronous=NORMAL",     # safe with WAL; fsync at checkpoints only
+    "PRAGMA cache_size=-16000",      # 16 MB page cache
+    "PRAGMA mmap_size=67108864",     # 64 MB memory-mapped reads
+    "PRAGMA temp_store=MEMORY",
+)
+
+
+class ConnectionManager:
+    """Hands each thread its own persistent SQLite connection
+
+    The recorder, analysis, cleanup and UI threads all use the same database
+    file. Instead of opening a connection per call, each thread keeps one
+    connection for its lifetime, so the statement cache (prepared statements)
+    and page cache survive between calls. Connections of threads that have
+    exited are closed the next time a connection is created.
+    """
+
+    def __init__(self, db_path: Path, busy_timeout: float = 10.0, cached_statements: int = 256):
+        self.db_path = db_path
+        self.busy_timeout = busy_timeout
+        self.cached_statements = cached_statements
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections: Dict[int, sqlite3.Connection] = {}
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open and tune a connection for the calling thread"""
+        conn = sqlite3.connect(
+            str(self.db_path),
+            timeout=self.busy_timeout,
+            cached_statements=self.cached_statements,
+            # Each connection is only ever used by the thread that opened it;
+            # this just allows close_all() to close it from elsewhere
+            check_same_thread=False
+        )
+        conn.row_factory = sqlite3.Row  # Return rows as dictionaries
+        conn.execute(f"PRAGMA busy_timeout={int(self.busy_timeout * 1000)}")
+        for pragma in PRAGMAS:
+            conn.execute(pragma)
+
+        with self._lock:
+            self._close_dead_threads()
+            self._connections[threading.get_ident()] = conn
+        return conn
+
+    def _close_dead_threads(self):
+        """Close connections whose owning thread has exited (lock held)"""
+        alive = {thread.ident for thread in threading.enumerate()}
+        for ident in [i for i in self._connections if i not in alive]:
+            try:
+                self._connections.pop(ident).close()
+            except sqlite3.Error:
+                pass
+
+    @contextmanager
+    def connection(self):
+        """Yield this thread's connection inside a transaction
+
+        Nested use joins the outer transaction; only the outermost block
+        commits or rolls back.
+        """
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+            self._local.depth = 0
+
+        self._local.depth += 1
+        try:
+            yield conn
+            if self._local.depth == 1:
+                conn.commit()
+        except Exception:
+            if self._local.depth == 1:
+                conn.rollback()
+            raise
+        finally:
+            self._local.depth -= 1
+
+    def close_all(self):
+        """Close every connection (call on shutdown)"""
+        with self._lock:
+            for conn in self._connections.values():
+                try:
+                    conn.close()
+                except sqlite3.Error:
+                    pass
+            self._connections.clear()
+        self._local = threading.local()
+
+
+class WriteBehindQueue:
+    """Queues database writes and commits them in grouped transactions
+
+    Each queued write is a callable taking a cursor. A background thread
+    flushes the queue in a single transaction once `batch_size` writes are
+    pending or the oldest has waited `interval` seconds, and again on
+    close(). If a grouped transaction fails, its writes are retried one by
+    one so a single bad row does not take the rest of the batch with it.
+    """
+
+    def __init__(self, get_connection: Callable, batch_size: int = 100, interval: float = 2.0):
+        self._get_connection = get_connection
+        self.batch_size = max(1, batch_size)
+        self.interval = interval
+        self.flushed_batches = 0
+        self.failed_writes = 0
+        self._pending: List[Callable] = []
+        self._oldest: Optional[float] = None
+        self._queued = 0      # writes ever queued
+        self._committed = 0   # writes ever flushed (committed or failed)
+        self._flush_requested = False
+        self._closed = False
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._flush_loop, daemon=True)
+        self._thread.start()
+
+    @property
+    def depth(self) -> int:
+        """Number of writes waiting to be flushed"""
+        return len(self._pending)
+
+    def put(self, write: Callable):
+        """Queue a write for the next grouped transaction"""
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Write-behind queue is closed")
+            if not self._pending:
+                self._oldest = time.monotonic()
+            self._pending.append(write)
+            self._queued += 1
+            if len(self._pending) >= self.batch_size:
+                self._cond.notify_all()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Block until every write queued so far has been flushed
+
+        Returns False if the timeout expired first.
+        """
+        with self._cond:
+            target = self._queued
+            if self._committed >= target:
+                return True
+            self._flush_requested = True
+            self._cond.notify_all()
+            return self._cond.wait_for(lambda: self._committed >= target, timeout)
+
+    def close(self):
+        """Flush remaining writes and stop the flusher thread"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join()
+
+    def _flush_loop(self):
+        while True:
+            with self._cond:
+                while True:
+                    if self._pending and (self._closed or self._flush_requested
+                                          or len(self._pending) >= self.batch_size
+                                          or time.monotonic() - self._oldest >= self.interval):
+                        break
+                    if self._closed:
+                        return
+                    timeout = None
+                    if self._pending:
+                        timeout = max(0.0, self._oldest + self.interval - time.monotonic())
+                    self._cond.wait(timeout)
+
+                batch, self._pending = self._pending, []
+                self._flush_requested = False
+
+            self._write_batch(batch)
+
+            with self._cond:
+                self._committed += len(batch)
+                self._cond.notify_all()
+
+    def _write_batch(self, batch: List[Callable]):
+        try:
+            with self._get_connection() as conn:
+                cursor = conn.cursor()
+                for write in batch:
+                    write(cursor)
+            self.flushed_batches += 1
+            return
+        except Exception as e:
+            print(f"⚠️  Grouped write of {len(batch)} rows failed ({e}), retrying individually")
+
+        for write in batch:
+            try:
+                with self._get_connection() as conn:
+                    write(conn.cursor())
+            except Exception as e:
+                self.failed_writes += 1
+                print(f"❌ Write-behind error: {e}")
@@ -0,0 +1,200 @@
+"""
+Pluggable video encoders for recorded chunks
+
+Backends:
+    opencv - cv2.VideoWriter with the mp4v codec (default, no extra dependencies)
+    ffmpeg - an ffmpeg subprocess fed raw frames over a pipe (libx264 or libvpx-vp9)
+    mjpeg  - cv2.VideoWriter writing Motion JPEG into an .avi container
+"""
+
+import shutil
+import subprocess
+import tempfile
+from pathlib import Path
+from typing import Dict, Optional, Type
+import cv2
+
+
+class VideoEncoder:
+    """Base class for chunk encoders
+
+    Encoders are opened lazily with the size of the first frame, receive BGR
+    frames through write() and must produce a complete file on close().
+    """
+
+    name = ''
+    extension = '.mp4'
+
+    def __init__(self, config):
+        self.config = config
+
+    def open(self, path: Path, width: int, height: int, fps: float):
+        raise NotImplementedError
+
+    def write(self, frame):
+        raise NotImplementedError
+
+    def close(self):
+        raise NotImplementedError
+
+
+class OpenCVEncoder(VideoEncoder):
+    """Encodes through cv2.VideoWriter"""
+
+    name = 'opencv'
+    extension = '.mp4'
+    fourcc = 'mp4v'  # or 'avc1' for H.264
+
+    def __init__(self, config):
+        super().__init__(config)
+        self._writer = None
+
+    def open(self, path: Path, width: int, height: int, fps: float):
+        fourcc = cv2.VideoWriter_fourcc(*self.fourcc)
+        self._writer = cv2.VideoWriter(str(path), fourcc, fps, (width, height))
+        if not self._writer.isOpened():
+            self._writer = None
+            raise RuntimeError(f"Could not open video writer for {path}")
+
+    def write(self, frame):
+        self._writer.write(frame)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.release()
+            self._writer = None
+
+
+class MJPEGEncoder(OpenCVEncoder):
+    """Motion JPEG in an .avi - cheap to encode and every frame is seekable"""
+
+    name = 'mjpeg'
+    extension = '.avi'
+    fourcc = 'MJPG'
+
+    def open(self, path: Path, width: int, height: int, fps: float):
+        super().open(path, width, height, fps)
+        self._writer.set(cv2.VIDEOWRITER_PROP_QUALITY, self.config.get('mjpeg_quality', 80))
+
+
+class FFmpegEncoder(VideoEncoder):
+    """Pipes raw BGR frames into an ffmpeg subprocess
+
+    Screen content compresses far better with x264/VP9 tuned for still
+    images than with mp4v. Relevant settings:
+        ffmpeg_path   - ffmpeg executable (default: 'ffmpeg' on PATH)
+        ffmpeg_codec  - 'libx264' (default) or 'libvpx-vp9'
+        ffmpeg_crf    - constant rate factor (default 30)
+        ffmpeg_preset - x264 preset (default 'veryfast')
+        ffmpeg_tune   - x264 tune (default 'stillimage')
+        ffmpeg_threads - encoder threads (default: ffmpeg decides)
+    """
+
+    name = 'ffmpeg'
+
+    def __init__(self, config):
+        super().__init__(config)
+        self.codec = config.get('ffmpeg_codec', 'libx264')
+        self.extension = '.webm' if self.codec.startswith('libvpx') else '.mp4'
+        self._process: Optional[subprocess.Popen] = None
+        self._path: Optional[Path] = None
+        # stderr goes to a temp file rather than a pipe nobody reads while
+        # encoding, which would block ffmpeg (and write()) once it filled up
+        self._log = None
+
+    @staticmethod
+    def available(config) -> bool:
+        """Whether the configured ffmpeg executable can be found"""
+        return shutil.which(config.get('ffmpeg_path', 'ffmpeg')) is not None
+
+    def _codec_args(self):
+        crf = str(self.config.get('ffmpeg_crf', 30))
+        threads = self.config.get('ffmpeg_threads')
+        thread_args = ['-threads', str(threads)] if threads else []
+        if self.codec.startswith('libvpx'):
+            # Constant quality mode; realtime deadline keeps CPU use bounded
+            return ['-c:v', self.codec, '-crf', crf, '-b:v', '0',
+                    '-deadline', 'realtime', '-cpu-used', '8', *thread_args]
+        return ['-c:v', self.codec, '-crf', crf,
+                '-preset', self.config.get('ffmpeg_preset', 'veryfast'),
+                '-tune', self.config.get('ffmpeg_tune', 'stillimage'),
+                '-pix_fmt', 'yuv420p', '-movflags', '+faststart', *thread_args]
+
+    def open(self, path: Path, width: int, height: int, fps: float):
+        self._path = path
+        command = [
+            self.config.get('ffmpeg_path', 'ffmpeg'), '-hide_banner', '-loglevel', 'error', '-y',
+            '-f', 'rawvideo', '-pix_fmt', 'bgr24', '-s', f'{width}x{height}', '-r', str(fps),
+            '-i', '-',
+            *self._codec_args(),
+            str(path)
+        ]
+        self._log = tempfile.TemporaryFile()
+        self._process = subprocess.Popen(
+            command, stdin=subprocess.PIPE,
+            stdout=subprocess.DEVNULL, stderr=self._log
+        )
+
+    def write(self, frame):
+        data = frame.data if frame.flags['C_CONTIGUOUS'] else frame.tobytes()
+        try:
+            self._process.stdin.write(data)
+        except BrokenPipeError:
+            raise RuntimeError(f"ffmpeg exited while encoding {self._path}: {self._read_log()}")
+
+    def close(self):
+        if self._process is None:
+            return
+
+        process, self._process = self._process, None
+        try:
+            process.stdin.close()
+        except BrokenPipeError:
+            pass
+        log, self._log = self._log, None
+        try:
+            try:
+                process.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                raise RuntimeError(f"ffmpeg timed out finishing {self._path}")
+            if process.returncode != 0:
+                raise RuntimeError(f"ffmpeg failed ({process.returncode}) for {self._path}: "
+                                   f"{self._read_log(log)}")
+        finally:
+            log.close()
+
+    def _read_log(self, log=None) -> str:
+        """What ffmpeg has written to stderr so far"""
+        log = log or self._log
+        try:
+            log.seek(0)
+            return log.read().decode(errors='replace').strip()
+        except Exception:
+            return ''
+
+
+ENCODERS: Dict[str, Type[VideoEncoder]] = {
+    OpenCVEncoder.name: OpenCVEncoder,
+    FFmpegEncoder.name: FFmpegEncoder,
+    MJPEGEncoder.name: MJPEGEncoder,
+}
+
+
+def resolve_encoder_name(config) -> str:
+    """Validate the `video_encoder` setting, falling back to OpenCV"""
+    name = config.get('video_encoder', OpenCVEncoder.name)
+    encoder_class = ENCODERS.get(name)
+
+    if encoder_class is None:
+        print(f"⚠️  Unknown video encoder '{name}', using {OpenCVEncoder.name}")
+        return OpenCVEncoder.name
+    if encoder_class is FFmpegEncoder and not FFmpegEncoder.available(config):
+        print(f"⚠️  ffmpeg not found, using {OpenCVEncoder.name} encoder")
+        return OpenCVEncoder.name
+    return name
+
+
+def create_encoder(config, name: Optional[str] = None) -> VideoEncoder:
+    """Create an encoder by name (default: the `video_encoder` setting)"""
+    return ENCODERS[name or resolve_encoder_name(config)](config)
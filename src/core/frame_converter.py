@@ -0,0 +1,101 @@
+"""
+Allocation-free conversion of raw screenshots into encoder-ready frames
+"""
+
+from typing import List, Optional, Tuple
+import cv2
+import numpy as np
+
+
+class FrameConverter:
+    """Converts BGRA screenshots to resized BGR frames using reusable buffers
+
+    The source pixels are viewed in place over the screenshot's raw bytes and
+    every OpenCV call writes into a preallocated `dst=` buffer. The output
+    size and interpolation are worked out once per source resolution rather
+    than on every frame.
+
+    Output frames come from a small pool: whoever consumes a frame (the
+    encoder, or the queue when it drops one) hands it back with release(),
+    so a buffer is never overwritten while it is still queued.
+    """
+
+    def __init__(self, target_height: int):
+        self.target_height = target_height
+        self.allocations = 0
+        self._source_shape: Optional[Tuple[int, int]] = None
+        self._output_shape: Optional[Tuple[int, int, int]] = None
+        self._interpolation = cv2.INTER_AREA
+        self._resized_bgra: Optional[np.ndarray] = None
+        self._free: List[np.ndarray] = []
+
+    @staticmethod
+    def view(screenshot) -> np.ndarray:
+        """Zero-copy (height, width, 4) BGRA view over an mss screenshot"""
+        return np.frombuffer(screenshot.raw, dtype=np.uint8).reshape(
+            screenshot.height, screenshot.width, 4)
+
+    def convert(self, bgra: np.ndarray) -> np.ndarray:
+        """Convert a BGRA frame into a pooled BGR frame at the target size
+
+        The returned buffer must be handed back with release() once used.
+        """
+        height, width = bgra.shape[:2]
+        if self._source_shape != (height, width):
+            self._configure(height, width)
+
+        out = self._acquire()
+        if self._resized_bgra is None:
+            cv2.cvtColor(bgra, cv2.COLOR_BGRA2BGR, dst=out)
+        else:
+            # Resize first so the color conversion runs on the smaller image
+            cv2.resize(bgra, (out.shape[1], out.shape[0]), dst=self._resized_bgra,
+                       interpolation=self._interpolation)
+            cv2.cvtColor(self._resized_bgra, cv2.COLOR_BGRA2BGR, dst=out)
+        return out
+
+    def release(self, frame: np.ndarray):
+        """Return a frame obtained from convert() to the pool"""
+        if frame is not None and frame.shape == self._output_shape:
+            self._free.append(frame)
+
+    def _configure(self, height: int, width: int):
+        """Work out output size and buffers for a new source resolution"""
+        self._source_shape = (height, width)
+
+        target_height = self.target_height
+        if height == target_height:
+            target_width = width
+        else:
+            # Even dimensions keep every codec happy
+            target_width = max(2, int(target_height * width / height) // 2 * 2)
+        self._output_shape = (target_height, target_width, 3)
+
+        if (target_height, target_width) == (height, width):
+            self._resized_bgra = None
+        else:
+            self._interpolation = self._pick_interpolation(height / target_height)
+            self._resized_bgra = np.empty((target_height, target_width, 4), dtype=np.uint8)
+            self.allocations += 1
+
+        # Buffers of the old size can no longer be reused
+        self._free = []
+
+    @staticmethod
+    def _pick_interpolation(ratio: float) -> int:
+        """Choose interpolation for a source/target height ratio
+
+        INTER_AREA avoids aliasing on text for large reductions and has a fast
+        path for integer ratios, but is several times slower than bilinear
+        for fractional ratios under 2x, where bilinear does not alias yet.
+        """
+        if ratio >= 2 or (ratio > 1 and ratio.is_integer()):
+            return cv2.INTER_AREA
+        return cv2.INTER_LINEAR
+
+    def _acquire(self) -> np.ndarray:
+        """Take a free output buffer, allocating only when the pool is empty"""
+        if self._free:
+            return self._free.pop()
+        self.allocations += 1
+        return np.empty(self._output_shape, dtype=np.uint8)
@@ -0,0 +1,347 @@
+"""
+Versioned schema migrations for the Dayflow database
+
+Each migration is a (version, description, function) entry in MIGRATIONS,
+applied in order inside its own transaction, and recorded in the
+schema_version table. Migrations must be safe on databases created before
+versioning existed, which already have the version 1 tables (and possibly
+some later columns), so they use IF NOT EXISTS / column checks throughout.
+Append new migrations to the end; never edit or reorder released ones.
+"""
+
+import sqlite3
+import time
+from pathlib import Path
+from typing import Callable, List, Tuple
+
+from . import rollups
+
+
+def _ensure_column(cursor, table: str, column: str, definition: str):
+    """Add a column to an existing table if it is missing"""
+    cursor.execute(f"PRAGMA table_info({table})")
+    if column not in [row['name'] for row in cursor.fetchall()]:
+        cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+
+
+def _initial_schema(cursor):
+    # Chunks table - individual 15-second recordings
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS chunks (
+            id TEXT PRIMARY KEY,
+            start_time REAL NOT NULL,
+            end_time REAL NOT NULL,
+            file_path TEXT NOT NULL,
+            status TEXT NOT NULL,
+            created_at REAL NOT NULL,
+            batch_id TEXT
+        )
+    """)
+
+    # Batches table - groups of chunks for analysis
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS batches (
+            id TEXT PRIMARY KEY,
+            start_time REAL NOT NULL,
+            end_time REAL NOT NULL,
+            status TEXT NOT NULL,
+            created_at REAL NOT NULL,
+            analyzed_at REAL
+        )
+    """)
+
+    # Timeline cards table - generated timeline entries
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS timeline_cards (
+            id TEXT PRIMARY KEY,
+            batch_id TEXT NOT NULL,
+            start_time REAL NOT NULL,
+            end_time REAL NOT NULL,
+            title TEXT NOT NULL,
+            summary TEXT,
+            category TEXT,
+            color TEXT,
+            created_at REAL NOT NULL,
+            FOREIGN KEY (batch_id) REFERENCES batches(id)
+        )
+    """)
+
+    # Create indexes
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_chunks_start_time
+        ON chunks(start_time)
+    """)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_chunks_batch_id
+        ON chunks(batch_id)
+    """)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_timeline_cards_start_time
+        ON timeline_cards(start_time)
+    """)
+
+
+def _chunk_frame_times(cursor):
+    _ensure_column(cursor, 'chunks', 'frame_times', 'TEXT')
+
+
+def _chunk_monitor_id(cursor):
+    _ensure_column(cursor, 'chunks', 'monitor_id', 'INTEGER NOT NULL DEFAULT 1')
+
+
+def _chunk_keyframes(cursor):
+    # Chunk keyframes table - JPEG sidecar frames written at record time
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS chunk_keyframes (
+            chunk_id TEXT NOT NULL,
+            frame_index INTEGER NOT NULL,
+            timestamp REAL NOT NULL,
+            file_path TEXT NOT NULL,
+            PRIMARY KEY (chunk_id, frame_index)
+        )
+    """)
+
+
+def _query_shaped_indexes(cursor):
+    # get_chunks_for_batch: status = ? AND start_time >= ? AND end_time <= ?
+    # ORDER BY start_time - equality column first, then the range
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_chunks_status_time
+        ON chunks(status, start_time, end_time)
+    """)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_timeline_cards_batch_id
+        ON timeline_cards(batch_id)
+    """)
+    # Refresh planner statistics so the new indexes are picked up
+    cursor.execute("ANALYZE")
+
+
+def _timeline_change_cursor(cursor):
+    # change_seq is a monotonically increasing change counter: every insert,
+    # and every update of a visible field, stamps the row with MAX + 1, so
+    # pollers can ask for "everything after the last seq I saw"
+    _ensure_column(cursor, 'timeline_cards', 'change_seq', 'INTEGER')
+    cursor.execute("UPDATE timeline_cards SET change_seq = rowid WHERE change_seq IS NULL")
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_timeline_cards_change_seq
+        ON timeline_cards(change_seq)
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_timeline_cards_insert_seq
+        AFTER INSERT ON timeline_cards
+        BEGIN
+            UPDATE timeline_cards
+            SET change_seq = (SELECT COALESCE(MAX(change_seq), 0) + 1 FROM timeline_cards)
+            WHERE rowid = NEW.rowid;
+        END
+    """)
+    # Listing the columns keeps the trigger from firing on its own update
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_timeline_cards_update_seq
+        AFTER UPDATE OF batch_id, start_time, end_time, title, summary, category, color
+        ON timeline_cards
+        BEGIN
+            UPDATE timeline_cards
+            SET change_seq = (SELECT COALESCE(MAX(change_seq), 0) + 1 FROM timeline_cards)
+            WHERE rowid = NEW.rowid;
+        END
+    """)
+
+
+def _timeline_cards_fts(cursor):
+    # External-content FTS5 index over the card text, keyed by the
+    # timeline_cards rowid. Builds without FTS5 skip it; Storage.search_cards
+    # then falls back to LIKE.
+    try:
+        cursor.execute("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS timeline_cards_fts USING fts5(
+                title, summary, category,
+                content='timeline_cards', content_rowid='rowid',
+                tokenize='unicode61 remove_diacritics 2'
+            )
+        """)
+    except sqlite3.OperationalError as e:
+        print(f"⚠️  Full-text search unavailable ({e}), search will use LIKE")
+        return
+
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_timeline_cards_fts_insert
+        AFTER INSERT ON timeline_cards
+        BEGIN
+            INSERT INTO timeline_cards_fts (rowid, title, summary, category)
+            VALUES (NEW.rowid, NEW.title, NEW.summary, NEW.category);
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_timeline_cards_fts_delete
+        AFTER DELETE ON timeline_cards
+        BEGIN
+            INSERT INTO timeline_cards_fts (timeline_cards_fts, rowid, title, summary, category)
+            VALUES ('delete', OLD.rowid, OLD.title, OLD.summary, OLD.category);
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_timeline_cards_fts_update
+        AFTER UPDATE OF title, summary, category ON timeline_cards
+        BEGIN
+            INSERT INTO timeline_cards_fts (timeline_cards_fts, rowid, title, summary, category)
+            VALUES ('delete', OLD.rowid, OLD.title, OLD.summary, OLD.category);
+            INSERT INTO timeline_cards_fts (rowid, title, summary, category)
+            VALUES (NEW.rowid, NEW.title, NEW.summary, NEW.category);
+        END
+    """)
+    # Index the cards that already exist
+    cursor.execute("INSERT INTO timeline_cards_fts (timeline_cards_fts) VALUES ('rebuild')")
+
+
+def _category_rollups(cursor):
+    # Time spent per local day x category and per local hour x category,
+    # maintained by Storage.insert_timeline_card (see core/rollups.py)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS category_daily_rollup (
+            day TEXT NOT NULL,
+            category TEXT NOT NULL,
+            seconds REAL NOT NULL DEFAULT 0,
+            card_count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (day, category)
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS category_hourly_rollup (
+            day TEXT NOT NULL,
+            hour INTEGER NOT NULL,
+            category TEXT NOT NULL,
+            seconds REAL NOT NULL DEFAULT 0,
+            PRIMARY KEY (day, hour, category)
+        )
+    """)
+    rollups.rebuild(cursor)
+
+
+def _chunk_file_size(cursor):
+    # Bytes on disk per chunk (video plus keyframe sidecar), recorded at
+    # write time so quota checks are a single indexed SUM instead of a stat
+    # of every file. Existing chunks are stat'ed once here.
+    _ensure_column(cursor, 'chunks', 'file_size', 'INTEGER NOT NULL DEFAULT 0')
+
+    cursor.execute("SELECT id, file_path FROM chunks WHERE file_path != ''")
+    chunks = cursor.fetchall()
+    cursor.execute("SELECT chunk_id, file_path FROM chunk_keyframes")
+    keyframes = cursor.fetchall()
+
+    sizes = {}
+    for chunk_id, file_path in list(chunks) + list(keyframes):
+        try:
+            sizes[chunk_id] = sizes.get(chunk_id, 0) + Path(file_path).stat().st_size
+        except OSError:
+            pass
+    cursor.executemany("UPDATE chunks SET file_size = ? WHERE id = ?",
+                       [(size, chunk_id) for chunk_id, size in sizes.items()])
+
+    # Eviction order: analyzed chunks (batch_id set) first, oldest first.
+    # file_size is included so the usage SUM is answered from the index.
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_chunks_eviction
+        ON chunks((batch_id IS NULL), start_time, file_size)
+        WHERE file_size > 0
+    """)
+
+
+def _chunk_tier(cursor):
+    # Retention tier of each chunk: 'full', 'reduced' or 'timelapse'
+    _ensure_column(cursor, 'chunks', 'tier', "TEXT NOT NULL DEFAULT 'full'")
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_chunks_tier_time
+        ON chunks(tier, start_time)
+    """)
+
+
+def _file_path_indexes(cursor):
+    # Lets reconciliation set-diff directory listings against the database
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_chunks_file_path
+        ON chunks(file_path)
+    """)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_chunk_keyframes_file_path
+        ON chunk_keyframes(file_path)
+    """)
+
+
+def _runtime_state(cursor):
+    # Volatile runtime values (last run times, ...) that used to be
+    # rewritten into config.json on every change
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS runtime_state (
+            key TEXT PRIMARY KEY,
+            value TEXT NOT NULL,
+            updated_at REAL NOT NULL
+        )
+    """)
+
+
+MIGRATIONS: List[Tuple[int, str, Callable]] = [
+    (1, 'initial schema', _initial_schema),
+    (2, 'chunks.frame_times', _chunk_frame_times),
+    (3, 'chunks.monitor_id', _chunk_monitor_id),
+    (4, 'chunk_keyframes table', _chunk_keyframes),
+    (5, 'query-shaped composite indexes', _query_shaped_indexes),
+    (6, 'timeline_cards change cursor', _timeline_change_cursor),
+    (7, 'timeline_cards full-text index', _timeline_cards_fts),
+    (8, 'daily and hourly category rollups', _category_rollups),
+    (9, 'chunks.file_size and eviction index', _chunk_file_size),
+    (10, 'chunks.tier', _chunk_tier),
+    (11, 'file_path indexes for reconciliation', _file_path_indexes),
+    (12, 'runtime_state table', _runtime_state),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+def get_schema_version(cursor) -> int:
+    """Current schema version (0 for an empty or pre-versioning database)"""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            description TEXT NOT NULL,
+            applied_at REAL NOT NULL
+        )
+    """)
+    cursor.execute("SELECT MAX(version) FROM schema_version")
+    return cursor.fetchone()[0] or 0
+
+
+def apply_migrations(get_connection: Callable) -> int:
+    """Bring the database up to SCHEMA_VERSION, returning the final version
+
+    get_connection is a context manager factory that commits on success and
+    rolls back on error (Storage._get_connection).
+    """
+    with get_connection() as conn:
+        version = start_version = get_schema_version(conn.cursor())
+
+    for target, description, migrate in MIGRATIONS:
+        if target <= version:
+            continue
+
+        with get_connection() as conn:
+            cursor = conn.cursor()
+            # Take the write lock up front so DDL runs inside the transaction
+            # and a second Dayflow process cannot migrate concurrently
+            cursor.execute("BEGIN IMMEDIATE")
+            if get_schema_version(cursor) >= target:
+                version = target
+                continue
+
+            migrate(cursor)
+            cursor.execute("""
+                INSERT INTO schema_version (version, description, applied_at)
+                VALUES (?, ?, ?)
+            """, (target, description, time.time()))
+
+        version = target
+
+    if version != start_version:
+        print(f"🗄️  Database schema migrated: v{start_version} → v{version}")
+    return version
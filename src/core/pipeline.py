@@ -0,0 +1,115 @@
+"""
+Bounded frame queue joining the capture and encode stages of the recorder
+"""
+
+import time
+from collections import deque
+from threading import Condition
+from typing import Any, Callable, Optional
+
+
+# Backpressure policies
+DROP_OLDEST = 'drop_oldest'
+BLOCK = 'block'
+
+
+class FrameQueue:
+    """Bounded FIFO with an explicit backpressure policy
+
+    With 'drop_oldest' a full queue discards its oldest item so capture never
+    waits on the encoder; with 'block' the producer waits for free space.
+    """
+
+    def __init__(self, maxsize: int = 8, policy: str = DROP_OLDEST,
+                 on_drop: Optional[Callable[[Any], None]] = None):
+        if policy not in (DROP_OLDEST, BLOCK):
+            raise ValueError(f"Unknown backpressure policy: {policy}")
+
+        self.maxsize = max(1, int(maxsize))
+        self.policy = policy
+        self.on_drop = on_drop
+        self.dropped = 0
+        self.high_water = 0
+        self._items = deque()
+        self._closed = False
+        self._cond = Condition()
+
+    @property
+    def depth(self) -> int:
+        """Number of items currently waiting"""
+        return len(self._items)
+
+    def put(self, item, timeout: Optional[float] = None, force: bool = False) -> bool:
+        """Add an item, applying the backpressure policy when full
+
+        Forced items (control markers) are always queued and are never
+        dropped. Returns False if the item was not queued (queue closed or
+        block timed out).
+        """
+        dropped = None
+        with self._cond:
+            if self._closed:
+                return False
+
+            if len(self._items) >= self.maxsize and not force:
+                if self.policy == DROP_OLDEST:
+                    dropped = self._pop_droppable()
+                    if dropped is not None:
+                        self.dropped += 1
+                else:
+                    deadline = None if timeout is None else time.monotonic() + timeout
+                    while len(self._items) >= self.maxsize and not self._closed:
+                        remaining = None if deadline is None else deadline - time.monotonic()
+                        if remaining is not None and remaining <= 0:
+                            self.dropped += 1
+                            return False
+                        self._cond.wait(remaining)
+                    if self._closed:
+                        return False
+
+            self._items.append((item, not force))
+            self.high_water = max(self.high_water, len(self._items))
+            self._cond.notify_all()
+
+        if dropped is not None and self.on_drop:
+            self.on_drop(dropped)
+        return True
+
+    def _pop_droppable(self):
+        """Remove the oldest item that is not a forced marker"""
+        for index, (item, droppable) in enumerate(self._items):
+            if droppable:
+                del self._items[index]
+                return item
+        return None
+
+    def get(self, timeout: Optional[float] = None):
+        """Remove and return the oldest item
+
+        Returns None on timeout, or once the queue is closed and drained.
+        """
+        with self._cond:
+            deadline = None if timeout is None else time.monotonic() + timeout
+            while not self._items and not self._closed:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return None
+                self._cond.wait(remaining)
+
+            if not self._items:
+                return None
+
+            item, _ = self._items.popleft()
+            self._cond.notify_all()
+            return item
+
+    def close(self):
+        """Stop accepting items; consumers drain what is left"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    @property
+    def closed(self) -> bool:
+        """Whether close() has been called"""
+        return self._closed
@@ -0,0 +1,61 @@
+"""
+Adaptive capture frame rate driven by on-screen activity
+"""
+
+
+class FrameRateController:
+    """Raises the capture rate during bursts of change and backs off when quiet
+
+    The rate jumps to the maximum on a changed frame and decays slowly while
+    the screen is static, always staying within [min_fps, max_fps]. It is further capped
+    so that the measured CPU cost per frame (capture + encode) times the rate
+    stays within `cpu_budget`, expressed as a fraction of one core.
+    """
+
+    def __init__(self, min_fps: float = 0.2, max_fps: float = 4.0,
+                 cpu_budget: float = 0.1, decay: float = 0.85):
+        self.min_fps = max(0.01, min_fps)
+        self.max_fps = max(self.min_fps, max_fps)
+        self.cpu_budget = cpu_budget
+        self.decay = decay
+        self.fps = self.min_fps
+        self._capture_cost = 0.0
+        self._encode_cost = 0.0
+
+    @property
+    def interval(self) -> float:
+        """Seconds until the next capture at the current rate"""
+        return 1.0 / self.fps
+
+    @property
+    def cpu_ceiling(self) -> float:
+        """Highest rate the CPU budget allows, given recent per-frame costs"""
+        cost = self._capture_cost + self._encode_cost
+        if cost <= 0 or self.cpu_budget <= 0:
+            return self.max_fps
+        return self.cpu_budget / cost
+
+    def record_capture_cost(self, cpu_seconds: float):
+        """Feed the CPU time spent capturing and checking one frame"""
+        self._capture_cost = self._ema(self._capture_cost, cpu_seconds)
+
+    def record_encode_cost(self, cpu_seconds: float):
+        """Feed the CPU time spent converting and encoding one frame"""
+        self._encode_cost = self._ema(self._encode_cost, cpu_seconds)
+
+    def update(self, changed: bool) -> float:
+        """Adjust the rate after a capture and return the new fps"""
+        if changed:
+            fps = self.max_fps
+        else:
+            fps = self.fps * self.decay
+
+        fps = min(fps, self.max_fps, self.cpu_ceiling)
+        self.fps = max(self.min_fps, fps)
+        return self.fps
+
+    @staticmethod
+    def _ema(current: float, sample: float, alpha: float = 0.2) -> float:
+        if current == 0:
+            return sample
+        return current + alpha * (sample - current)
@@ -0,0 +1,187 @@
+"""
+Reconciliation between the recordings directory and the chunks table
+
+Two passes, both in bounded memory:
+    files -> rows  Each per-date directory is walked with os.scandir in a
+                   thread pool. Names are checked against the indexed
+                   file_path columns in batches; files without a row are
+                   reimported (recognisable, playable chunk videos) or
+                   deleted.
+    rows -> files  chunks rows are paged in file_path order and rows whose
+                   file is gone are deleted, with their keyframes.
+
+Files modified within the grace period are left alone, since they may
+belong to a chunk that is still being written or queued for insert.
+"""
+
+import os
+import re
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import cv2
+
+
+BATCH_SIZE = 1000
+
+DATE_DIR = re.compile(r'^\d{4}-\d{2}-\d{2}$')
+# Matches ChunkWriter file names; re-encoded tiers (_reduced, ...) do not
+CHUNK_FILE = re.compile(r'^chunk_(\d{2}-\d{2}-\d{2})_[0-9a-f]{8}\.(mp4|avi|webm)$')
+
+
+class Reconciler:
+    """Finds and fixes orphaned recordings and dangling chunk rows"""
+
+    def __init__(self, storage, recordings_dir: Path, action: str = 'reimport',
+                 grace_seconds: float = 3600, workers: int = 4):
+        self.storage = storage
+        self.recordings_dir = Path(recordings_dir)
+        self.action = action
+        self.grace_seconds = grace_seconds
+        self.workers = max(1, workers)
+
+    def run(self) -> Dict[str, int]:
+        """Reconcile everything, returning counters for the report"""
+        self.storage.flush()
+        cutoff = time.time() - self.grace_seconds
+        totals = {'scanned_files': 0, 'deleted_files': 0, 'reimported_files': 0,
+                  'deleted_rows': 0, 'bytes_reclaimed': 0}
+
+        date_dirs = [entry.path for entry in os.scandir(self.recordings_dir)
+                     if entry.is_dir() and DATE_DIR.match(entry.name)]
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            for counts in pool.map(lambda path: self._reconcile_dir(Path(path), cutoff), date_dirs):
+                for key, value in counts.items():
+                    totals[key] += value
+
+            totals['deleted_rows'] = self._delete_dangling_rows(pool)
+
+        return totals
+
+    # files -> rows
+    def _reconcile_dir(self, date_dir: Path, cutoff: float) -> Dict[str, int]:
+        """Check one date directory's files against the database"""
+        counts = {'scanned_files': 0, 'deleted_files': 0, 'reimported_files': 0,
+                  'bytes_reclaimed': 0}
+
+        for batch in self._batches(self._entries(date_dir, cutoff)):
+            counts['scanned_files'] += len(batch)
+            known = self.storage.find_known_files([path for path, _, _ in batch])
+            for path, size, is_keyframe in batch:
+                if path in known:
+                    continue
+                if not is_keyframe and self.action == 'reimport' and self._reimport(Path(path), size):
+                    counts['reimported_files'] += 1
+                    continue
+                try:
+                    os.unlink(path)
+                    counts['deleted_files'] += 1
+                    counts['bytes_reclaimed'] += size
+                except OSError as e:
+                    print(f"❌ Error deleting {path}: {e}")
+
+        # Drop keyframe directories emptied above
+        with os.scandir(date_dir) as entries:
+            for entry in entries:
+                if entry.is_dir() and entry.name.endswith('_keyframes'):
+                    try:
+                        os.rmdir(entry.path)
+                    except OSError:
+                        pass
+        return counts
+
+    def _entries(self, date_dir: Path, cutoff: float) -> Iterator[Tuple[str, int, bool]]:
+        """Stream (path, size, is_keyframe) for files older than the cutoff"""
+        with os.scandir(date_dir) as entries:
+            for entry in entries:
+                if entry.is_dir():
+                    if entry.name.endswith('_keyframes'):
+                        with os.scandir(entry.path) as keyframes:
+                            for keyframe in keyframes:
+                                item = self._stat_entry(keyframe, cutoff)
+                                if item:
+                                    yield item[0], item[1], True
+                    continue
+                item = self._stat_entry(entry, cutoff)
+                if item:
+                    yield item[0], item[1], False
+
+    @staticmethod
+    def _stat_entry(entry, cutoff: float) -> Optional[Tuple[str, int]]:
+        try:
+            stat = entry.stat()
+        except OSError:
+            return None
+        if not entry.is_file() or stat.st_mtime > cutoff:
+            return None
+        return entry.path, stat.st_size
+
+    @staticmethod
+    def _batches(items: Iterator, size: int = BATCH_SIZE) -> Iterator[List]:
+        batch = []
+        for item in items:
+            batch.append(item)
+            if len(batch) >= size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def _reimport(self, path: Path, size: int) -> bool:
+        """Insert a row for an orphaned chunk video that is still playable"""
+        match = CHUNK_FILE.match(path.name)
+        if not match:
+            return False
+
+        try:
+            start_dt = datetime.strptime(f"{path.parent.name} {match.group(1)}", '%Y-%m-%d %H-%M-%S')
+        except ValueError:
+            return False
+
+        # Chunks cut off by a crash usually have no index and will not open
+        capture = cv2.VideoCapture(str(path))
+        try:
+            frames = capture.get(cv2.CAP_PROP_FRAME_COUNT)
+            fps = capture.get(cv2.CAP_PROP_FPS)
+            ok = capture.isOpened() and frames > 0 and fps > 0 and capture.grab()
+        finally:
+            capture.release()
+        if not ok:
+            return False
+
+        start_time = start_dt.timestamp()
+        self.storage.insert_chunk(
+            chunk_id=str(uuid.uuid4()),
+            start_time=start_time,
+            end_time=start_time + frames / fps,
+            file_path=str(path),
+            status='completed',
+            file_size=size
+        )
+        return True
+
+    # rows -> files
+    def _delete_dangling_rows(self, pool: ThreadPoolExecutor) -> int:
+        """Delete chunk rows whose file no longer exists"""
+        deleted = 0
+        after = ''
+        while True:
+            rows = self.storage.get_chunk_files_page(after, BATCH_SIZE)
+            if not rows:
+                break
+            after = rows[-1]['file_path']
+
+            exists = pool.map(os.path.exists, [row['file_path'] for row in rows])
+            missing = [(row['id'], row['file_path']) for row, found in zip(rows, exists) if not found]
+            if missing:
+                keyframes = self.storage.get_keyframes_for_chunks([chunk_id for chunk_id, _ in missing])
+                deleted += self.storage.delete_missing_chunks(missing)
+                for chunk_keyframes in keyframes.values():
+                    for keyframe in chunk_keyframes:
+                        Path(keyframe['file_path']).unlink(missing_ok=True)
+        return deleted
@@ -1,6 +1,7 @@
 """
 Screen recording functionality using mss (fast cross-platform screen capture)
-Records at 1 FPS into 15-second chunks
+Records each monitor into `chunk_duration` chunks (15 s by default) at a
+fixed or activity-driven frame rate
 """
 
 import time
@@ -8,23 +9,420 @@ import uuid
 from datetime import datetime
 from pathlib import Path
 from threading import Thread, Event
-from typing import Optional, Callable
-import mss
-import cv2
-import numpy as np
-from PIL import Image
+from typing import Optional, Callable, Dict, List, Tuple
+from queue import Queue
+
+from .pipeline import FrameQueue, DROP_OLDEST
+from .rate_controller import FrameRateController
+
+# Width-to-height ratio of a standard widescreen monitor; _scaled_height
+# uses it to turn target_height into the pixel budget of one capture
+ASPECT_16_9 = 16 / 9
+
+# mss, cv2 and the modules built on them are imported when recording
+# starts, not at import, so the window comes up without paying for them
+
+
+class ChunkWriter:
+    """Streams frames of a single chunk straight into an open video encoder
+
+    Alongside the video it writes a sidecar directory of JPEG keyframes,
+    one per evenly spaced slot of the chunk, so analysis can use them
+    without decoding the video again.
+    """
+
+    def __init__(self, config, start_dt: datetime, monitor_id: int = 1,
+                 encoder_name: Optional[str] = None):
+        self.config = config
+        self.start_dt = start_dt
+        self.monitor_id = monitor_id
+        self.chunk_id = str(uuid.uuid4())
+        self.frame_count = 0
+        # Capture time of each frame as an offset from start_dt, so frames
+        # can be mapped to wall-clock time even at a variable rate
+        self.frame_times = []
+        # (timestamp, path) of every keyframe written to the sidecar
+        self.keyframes: List[Tuple[float, Path]] = []
+        self._keyframe_count = self.config.get('keyframes_per_chunk', 5)
+        self._keyframe_quality = self.config.get('keyframe_jpeg_quality', 85)
+        self._chunk_duration = self.config.get('chunk_duration', 15)
+        self._next_keyframe_slot = 0
+
+        date_str = start_dt.strftime('%Y-%m-%d')
+        recordings_path = self.config.get_recordings_path(date_str)
+
+        from .encoders import create_encoder
+        self._encoder = create_encoder(config, encoder_name)
+        self._encoder_open = False
+
+        # Generate filename
+        timestamp_str = start_dt.strftime('%H-%M-%S')
+        self.filename = f"chunk_{timestamp_str}_{self.chunk_id[:8]}{self._encoder.extension}"
+        self.filepath = recordings_path / self.filename
+        self.keyframes_dir = recordings_path / f"{self.filepath.stem}_keyframes"
+
+    def write(self, frame, timestamp: Optional[float] = None):
+        """Encode a frame into the chunk file"""
+        if not self._encoder_open:
+            # Video dimensions come from the first frame
+            height, width, _ = frame.shape
+            self._encoder.open(self.filepath, width, height, self.config.get('fps', 1))
+            self._encoder_open = True
+
+        self._encoder.write(frame)
+        self.frame_count += 1
+
+        if timestamp is None:
+            timestamp = time.time()
+        offset = max(0.0, round(timestamp - self.start_dt.timestamp(), 3))
+        self.frame_times.append(offset)
+
+        # The first frame landing in each keyframe slot is saved as a JPEG
+        if self._next_keyframe_slot < self._keyframe_count:
+            slot = int(offset * self._keyframe_count / self._chunk_duration)
+            if slot >= self._next_keyframe_slot:
+                self._write_keyframe(frame, timestamp)
+                self._next_keyframe_slot = slot + 1
+
+    def _write_keyframe(self, frame, timestamp: float):
+        """Save a frame to the keyframe sidecar"""
+        import cv2
+        try:
+            self.keyframes_dir.mkdir(exist_ok=True)
+            path = self.keyframes_dir / f"kf_{len(self.keyframes):02d}.jpg"
+            if cv2.imwrite(str(path), frame, [cv2.IMWRITE_JPEG_QUALITY, self._keyframe_quality]):
+                self.keyframes.append((timestamp, path))
+        except Exception as e:
+            print(f"⚠️  Could not write keyframe: {e}")
+
+    def discard(self):
+        """Delete the chunk file and its keyframes"""
+        try:
+            self.close()
+        except Exception:
+            pass
+        self.filepath.unlink(missing_ok=True)
+        for _, path in self.keyframes:
+            path.unlink(missing_ok=True)
+        if self.keyframes_dir.exists():
+            try:
+                self.keyframes_dir.rmdir()
+            except OSError:
+                pass
+        self.keyframes = []
+
+    def close(self):
+        """Close the encoder, finalizing the file"""
+        if self._encoder_open:
+            self._encoder_open = False
+            self._encoder.close()
+
+    def disk_size(self) -> int:
+        """Bytes on disk for the finished chunk file and its keyframes"""
+        size = 0
+        for path in [self.filepath] + [path for _, path in self.keyframes]:
+            try:
+                size += path.stat().st_size
+            except OSError:
+                pass
+        return size
+
+
+class CapturePipeline:
+    """Capture and encode stages for one monitor, or the composited desktop
+
+    The capture thread only grabs and converts frames and hands them to the
+    encoder over a bounded queue, so slow encodes never delay capture.
+    Finished chunks are passed on to the recorder's shared persist stage.
+
+    Unchanged frames are skipped before conversion, but at least one frame
+    is kept per `chunk_duration` so a briefly static screen is still
+    recorded. Once the screen has not changed for `idle_timeout` seconds the
+    pipeline stops emitting chunks and records the idle gap in the chunks
+    table instead.
+
+    With `adaptive_fps` enabled the capture rate follows on-screen activity
+    between `min_fps` and `max_fps`, bounded by the pipeline's CPU budget.
+    """
+
+    def __init__(self, recorder: 'ScreenRecorder', monitor_id: int, monitor: Dict,
+                 target_height: int, cpu_budget: float):
+        self.recorder = recorder
+        self.config = recorder.config
+        self.monitor_id = monitor_id
+        self.monitor = monitor
+        self.target_height = target_height
+        self._stop_event = recorder._stop_event
+        self._persist_queue = recorder._persist_queue
+        self._current_chunk_id: Optional[str] = None
+
+        # Pipeline counters
+        self.captured_frames = 0
+        self.encoded_frames = 0
+        self.late_frames = 0
+        self.skipped_frames = 0
+        self.is_idle = False
+
+        self._rate_controller: Optional[FrameRateController] = None
+        if self.config.get('adaptive_fps', False):
+            self._rate_controller = FrameRateController(
+                min_fps=self.config.get('min_fps', 0.2),
+                max_fps=self.config.get('max_fps', 4),
+                cpu_budget=cpu_budget
+            )
+
+        from .encoders import resolve_encoder_name
+        from .frame_converter import FrameConverter
+
+        # Frames dropped by the queue go straight back to the converter's pool
+        self._converter = FrameConverter(target_height)
+        self._frame_queue = FrameQueue(
+            maxsize=self.config.get('frame_queue_size', 8),
+            policy=self.config.get('queue_policy', DROP_OLDEST),
+            on_drop=lambda item: self._converter.release(item[0])
+        )
+        self._encoder_name = resolve_encoder_name(self.config)
+        self._capture_thread = Thread(target=self._recording_loop, daemon=True)
+        self._encode_thread = Thread(target=self._encode_loop, daemon=True)
+
+    def start(self):
+        """Start the capture and encode threads"""
+        self._encode_thread.start()
+        self._capture_thread.start()
+
+    def is_alive(self) -> bool:
+        """Whether the capture or encode thread is still running"""
+        return self._capture_thread.is_alive() or self._encode_thread.is_alive()
+
+    def get_stats(self) -> Dict:
+        """Get pipeline counters (frames captured/encoded/dropped, queue depth)"""
+        return {
+            'monitor_id': self.monitor_id,
+            'captured_frames': self.captured_frames,
+            'encoded_frames': self.encoded_frames,
+            'dropped_frames': self._frame_queue.dropped,
+            'late_frames': self.late_frames,
+            'skipped_frames': self.skipped_frames,
+            'is_idle': self.is_idle,
+            'fps': self._rate_controller.fps if self._rate_controller else self.config.get('fps', 1),
+            'queue_depth': self._frame_queue.depth,
+            'queue_high_water': self._frame_queue.high_water,
+            'frame_allocations': self._converter.allocations,
+        }
+
+    def _recording_loop(self):
+        """Capture stage - grabs frames on a fixed schedule and queues them
+
+        Queue items are (frame, timestamp) tuples; a None frame is an idle
+        marker telling the encoder to close the current chunk.
+        """
+        import mss
+        from .change_detector import ChangeDetector
+        from .frame_converter import FrameConverter
+
+        fps = self.config.get('fps', 1)
+        interval = 1.0 / fps
+        frame_queue = self._frame_queue
+        rate = self._rate_controller
+        if rate:
+            interval = rate.interval
+
+        dedupe = self.config.get('dedupe_frames', True)
+        idle_timeout = self.config.get('idle_timeout', 300)
+        chunk_duration = self.config.get('chunk_duration', 15)
+        detector = ChangeDetector(self.config.get('change_min_pixels', 3),
+                                  self.config.get('change_pixel_threshold', 16))
+        last_change_time = last_emit_time = time.time()
+
+        try:
+            # mss handles are not shareable between threads, so each
+            # pipeline opens its own
+            with mss.mss() as sct:
+                next_frame_time = time.monotonic()
+                while not self._stop_event.is_set():
+                    try:
+                        timestamp = time.time()
+                        cpu_start = time.thread_time()
+
+                        # Capture screenshot as a BGRA view over its raw bytes
+                        screenshot = sct.grab(self.monitor)
+                        frame = FrameConverter.view(screenshot)
+
+                        changed = detector.check(frame) if (dedupe or rate) else True
+                        emit = changed or not dedupe
+                        heartbeat = False
+
+                        if not emit and not self.is_idle:
+                            if timestamp - last_change_time >= idle_timeout:
+                                self.is_idle = True
+                                frame_queue.put((None, last_change_time), force=True)
+                                print(f"💤 Monitor {self.monitor_id} idle, pausing recording")
+                            elif timestamp - last_emit_time >= chunk_duration:
+                                # A static screen still gets one frame per chunk
+                                # until it goes idle, so short pauses are recorded
+                                # as chunks instead of leaving gaps
+                                emit = heartbeat = True
+
+                        # Skip unchanged frames before paying for full conversion
+                        if not emit:
+                            self.skipped_frames += 1
+                        else:
+                            last_emit_time = timestamp
+                            if not heartbeat:
+                                last_change_time = timestamp
+                                if self.is_idle:
+                                    self.is_idle = False
+                                    print(f"▶️  Monitor {self.monitor_id} activity resumed")
+
+                            # Convert to BGR at target height, keeping aspect ratio
+                            frame = self._converter.convert(frame)
+
+                            self.captured_frames += 1
+                            if not frame_queue.put((frame, timestamp), timeout=interval):
+                                self._converter.release(frame)
+
+                        if rate:
+                            rate.record_capture_cost(time.thread_time() - cpu_start)
+                            interval = 1.0 / rate.update(changed)
+
+                    except Exception as e:
+                        print(f"Error capturing frame: {e}")
+
+                    # Sleep until the next deadline; deadlines advance on a fixed
+                    # grid so one slow frame does not shift every later one
+                    next_frame_time += interval
+                    now = time.monotonic()
+                    if next_frame_time < now:
+                        missed = int((now - next_frame_time) / interval) + 1
+                        self.late_frames += missed
+                        next_frame_time += missed * interval
+                    self._stop_event.wait(next_frame_time - now)
+        finally:
+            frame_queue.close()
+
+    def _encode_loop(self):
+        """Encode stage - streams queued frames into chunk files"""
+        try:
+            self._encode_chunks()
+        finally:
+            # Lets the persist stage know this pipeline's last chunk is queued
+            self._persist_queue.put(('finished', self.monitor_id))
+
+    def _encode_chunks(self):
+        chunk_duration = self.config.get('chunk_duration', 15)
+        frame_queue = self._frame_queue
+
+        # Frames are streamed into the open chunk as they arrive, so memory
+        # stays flat regardless of chunk length
+        writer: Optional[ChunkWriter] = None
+        idle_since: Optional[float] = None
+        last_chunk_end = 0.0
+
+        while True:
+            item = frame_queue.get(timeout=1.0)
+            if item is None:
+                if frame_queue.closed and frame_queue.depth == 0:
+                    break
+
+                # Unchanged frames are skipped, so close chunks on time
+                # even when no new frame arrives
+                if writer is not None and time.time() - writer.start_dt.timestamp() >= chunk_duration:
+                    last_chunk_end = time.time()
+                    self._finish_chunk(writer, datetime.fromtimestamp(last_chunk_end))
+                    writer = None
+                continue
+
+            frame, timestamp = item
+
+            if frame is None:
+                # Idle marker - the screen has been static since `timestamp`
+                if writer is not None:
+                    last_chunk_end = time.time()
+                    self._finish_chunk(writer, datetime.fromtimestamp(last_chunk_end))
+                    writer = None
+                idle_since = max(timestamp, last_chunk_end)
+                continue
+
+            if idle_since is not None:
+                self._persist_queue.put(('idle', idle_since, timestamp, self.monitor_id))
+                idle_since = None
+
+            # Roll over to a new chunk once the duration is reached
+            if writer is not None and timestamp - writer.start_dt.timestamp() >= chunk_duration:
+                last_chunk_end = timestamp
+                self._finish_chunk(writer, datetime.fromtimestamp(timestamp))
+                writer = None
+
+            try:
+                if writer is None:
+                    writer = ChunkWriter(self.config, datetime.fromtimestamp(timestamp),
+                                         self.monitor_id, self._encoder_name)
+                    self._current_chunk_id = writer.chunk_id
+
+                cpu_start = time.thread_time()
+                writer.write(frame, timestamp)
+                self.encoded_frames += 1
+                if self._rate_controller:
+                    self._rate_controller.record_encode_cost(time.thread_time() - cpu_start)
+
+            except Exception as e:
+                print(f"Error encoding frame: {e}")
+                if writer is not None and writer.frame_count == 0:
+                    # The writer could not be opened, start over on the next frame
+                    writer.discard()
+                    writer = None
+
+            finally:
+                # The frame buffer goes back to the pool for the next capture
+                self._converter.release(frame)
+
+        # Finalize the chunk in progress
+        if writer is not None:
+            self._finish_chunk(writer, datetime.now())
+        if idle_since is not None:
+            self._persist_queue.put(('idle', idle_since, time.time(), self.monitor_id))
+
+    def _finish_chunk(self, writer: ChunkWriter, end_dt: datetime):
+        """Close a streamed chunk and hand it to the persist stage"""
+        self._current_chunk_id = None
+
+        try:
+            writer.close()
+        except Exception as e:
+            print(f"❌ Error closing chunk: {e}")
+            self._persist_queue.put(('chunk', writer, end_dt, 'failed'))
+            return
+
+        if writer.frame_count == 0:
+            writer.discard()
+            return
+
+        self._persist_queue.put(('chunk', writer, end_dt, 'completed'))
 
 
 class ScreenRecorder:
-    """Records screen at 1 FPS in 15-second chunks"""
+    """Records the screen into chunk files through per-monitor capture pipelines
+
+    Chunks are `chunk_duration` seconds long and captured at `fps`, or
+    between `min_fps` and `max_fps` with `adaptive_fps`. Each captured
+    monitor gets its own CapturePipeline; with `monitor_mode = 'composite'`
+    all monitors are grabbed as one tiled frame instead. Either way the
+    combined frame area is held to the pixel budget of a single
+    `target_height` capture, and one shared persist stage writes finished
+    chunks to the database.
+    """
+
+    # Seconds stop_recording() waits for encoders to finish their last chunk
+    stop_timeout = 10.0
 
     def __init__(self, config, storage):
         self.config = config
         self.storage = storage
         self.is_recording = False
         self._stop_event = Event()
-        self._record_thread: Optional[Thread] = None
-        self._current_chunk_id: Optional[str] = None
+        self._pipelines: List[CapturePipeline] = []
+        self._persist_thread: Optional[Thread] = None
+        self._persist_queue: Optional[Queue] = None
         self.on_chunk_completed: Optional[Callable] = None
 
     def start_recording(self):
@@ -33,11 +431,24 @@ class ScreenRecorder:
             print("Already recording")
             return
 
+        # A fresh event per session, so threads of a previous session that
+        # did not stop in time never see it cleared
+        self._stop_event = Event()
+        self._persist_queue = Queue()
+
+        try:
+            self._pipelines = self._create_pipelines()
+        except Exception as e:
+            print(f"❌ Could not start recording: {e}")
+            return
+
         self.is_recording = True
-        self._stop_event.clear()
-        self._record_thread = Thread(target=self._recording_loop, daemon=True)
-        self._record_thread.start()
-        print("🎥 Recording started")
+        self._persist_thread = Thread(target=self._persist_loop, args=(len(self._pipelines),),
+                                      daemon=True)
+        self._persist_thread.start()
+        for pipeline in self._pipelines:
+            pipeline.start()
+        print(f"🎥 Recording started ({len(self._pipelines)} pipeline(s))")
 
     def stop_recording(self):
         """Stop screen recording"""
@@ -46,121 +457,127 @@ class ScreenRecorder:
 
         self.is_recording = False
         self._stop_event.set()
-        if self._record_thread:
-            self._record_thread.join(timeout=5)
+        # Capture stages close their queues on exit and every encode stage
+        # reports once its last chunk is queued; the persist stage only exits
+        # after all of them have. This runs on the UI thread, so a hung
+        # capture or encoder is logged and left behind rather than waited on.
+        if self._persist_thread:
+            self._persist_thread.join(timeout=self.stop_timeout)
+            if self._persist_thread.is_alive():
+                stuck = [pipeline.monitor_id for pipeline in self._pipelines if pipeline.is_alive()]
+                print(f"⚠️  Recording threads still running after {self.stop_timeout:g}s "
+                      f"(monitors {stuck or 'none'}), their last chunks may not be saved")
         print("⏹️  Recording stopped")
 
-    def _recording_loop(self):
-        """Main recording loop - runs in separate thread"""
-        fps = self.config.get('fps', 1)
-        chunk_duration = self.config.get('chunk_duration', 15)
-        interval = 1.0 / fps
-
-        frames = []
-        chunk_start_time = time.time()
-        chunk_start_dt = datetime.now()
+    def get_stats(self) -> Dict:
+        """Get pipeline counters, totalled over all monitors and per monitor"""
+        per_monitor = [pipeline.get_stats() for pipeline in self._pipelines]
+        totals = {}
+        for key in ('captured_frames', 'encoded_frames', 'dropped_frames',
+                    'late_frames', 'skipped_frames', 'queue_depth'):
+            totals[key] = sum(stats[key] for stats in per_monitor)
+        totals['monitors'] = per_monitor
+        return totals
 
+    def _create_pipelines(self) -> List[CapturePipeline]:
+        """Build one pipeline per captured monitor (or one composite pipeline)"""
+        import mss
         with mss.mss() as sct:
-            # Get primary monitor
-            monitor = sct.monitors[1]  # Monitor 1 is primary (0 is all monitors combined)
-
-            while not self._stop_event.is_set():
-                frame_start = time.time()
-
-                try:
-                    # Capture screenshot
-                    screenshot = sct.grab(monitor)
-
-                    # Convert to numpy array (BGR for OpenCV)
-                    frame = np.array(screenshot)
-                    frame = cv2.cvtColor(frame, cv2.COLOR_BGRA2BGR)
-
-                    # Resize to target height while maintaining aspect ratio
-                    target_height = self.config.get('target_height', 1080)
-                    if frame.shape[0] != target_height:
-                        aspect_ratio = frame.shape[1] / frame.shape[0]
-                        target_width = int(target_height * aspect_ratio)
-                        frame = cv2.resize(frame, (target_width, target_height))
-
-                    frames.append(frame)
-
-                    # Check if chunk duration reached
-                    elapsed = time.time() - chunk_start_time
-                    if elapsed >= chunk_duration:
-                        # Save chunk
-                        self._save_chunk(frames, chunk_start_dt, datetime.now())
-
-                        # Reset for next chunk
-                        frames = []
-                        chunk_start_time = time.time()
-                        chunk_start_dt = datetime.now()
-
-                except Exception as e:
-                    print(f"Error capturing frame: {e}")
-
-                # Sleep to maintain FPS
-                frame_time = time.time() - frame_start
-                sleep_time = max(0, interval - frame_time)
-                time.sleep(sleep_time)
-
-        # Save any remaining frames
-        if frames:
-            self._save_chunk(frames, chunk_start_dt, datetime.now())
-
-    def _save_chunk(self, frames, start_dt: datetime, end_dt: datetime):
-        """Save frames as video chunk"""
-        if not frames:
-            return
+            monitors = list(sct.monitors)
 
-        chunk_id = str(uuid.uuid4())
-        date_str = start_dt.strftime('%Y-%m-%d')
-        recordings_path = self.config.get_recordings_path(date_str)
+        target_height = self.config.get('target_height', 1080)
+        cpu_budget = self.config.get('capture_cpu_budget', 0.1)
 
-        # Generate filename
-        timestamp_str = start_dt.strftime('%H-%M-%S')
-        filename = f"chunk_{timestamp_str}_{chunk_id[:8]}.mp4"
-        filepath = recordings_path / filename
+        # Monitor 0 is the bounding box of all monitors combined
+        if self.config.get('monitor_mode', 'separate') == 'composite':
+            return [CapturePipeline(self, 0, monitors[0],
+                                    self._scaled_height([monitors[0]], monitors[0], target_height),
+                                    cpu_budget)]
 
-        out = None
-        try:
-            # Get video dimensions from first frame
-            height, width, _ = frames[0].shape
-
-            # Create video writer (H.264 codec)
-            fourcc = cv2.VideoWriter_fourcc(*'mp4v')  # or 'avc1' for H.264
-            fps = self.config.get('fps', 1)
-            out = cv2.VideoWriter(str(filepath), fourcc, fps, (width, height))
-
-            # Write frames
-            for frame in frames:
-                out.write(frame)
-
-            # Store in database
-            self.storage.insert_chunk(
-                chunk_id=chunk_id,
-                start_time=start_dt.timestamp(),
-                end_time=end_dt.timestamp(),
-                file_path=str(filepath),
-                status='completed'
-            )
+        selected = self._select_monitors(len(monitors) - 1)
+        captured = [monitors[i] for i in selected]
+        if len(captured) == 1:
+            # Single monitor keeps the plain target_height behaviour
+            return [CapturePipeline(self, selected[0], captured[0], target_height, cpu_budget)]
 
-            print(f"✅ Saved chunk: {filename} ({len(frames)} frames)")
+        return [
+            CapturePipeline(self, monitor_id, monitors[monitor_id],
+                            self._scaled_height(captured, monitors[monitor_id], target_height),
+                            cpu_budget / len(captured))
+            for monitor_id in selected
+        ]
 
-            # Notify callback
-            if self.on_chunk_completed:
-                self.on_chunk_completed(chunk_id)
+    def _select_monitors(self, count: int) -> List[int]:
+        """Resolve the `capture_monitors` setting to mss monitor indices"""
+        setting = self.config.get('capture_monitors', 'primary')
+        if setting == 'all':
+            return list(range(1, count + 1))
+        if isinstance(setting, list):
+            selected = [i for i in setting if isinstance(i, int) and 1 <= i <= count]
+            if selected:
+                return selected
+            print(f"⚠️  No valid monitors in {setting}, using primary")
+        return [1]
 
-        except Exception as e:
-            print(f"❌ Error saving chunk: {e}")
-            # Mark as failed in database
-            self.storage.insert_chunk(
-                chunk_id=chunk_id,
-                start_time=start_dt.timestamp(),
-                end_time=end_dt.timestamp(),
-                file_path=str(filepath),
-                status='failed'
-            )
-        finally:
-            # Ensure video writer is released
-            if out is not None:
-                out.release()
+    @staticmethod
+    def _scaled_height(captured: List[Dict], monitor: Dict, target_height: int) -> int:
+        """Output height for a monitor so all captures share one frame budget"""
+        budget = target_height * target_height * ASPECT_16_9
+        total_area = sum(m['width'] * m['height'] for m in captured)
+        scale = min(1.0, (budget / total_area) ** 0.5)
+        # Even dimensions keep every codec happy
+        return max(2, int(monitor['height'] * scale) // 2 * 2)
+
+    def _persist_loop(self, pipelines: int):
+        """Persist stage - records finished chunks and idle gaps in the database
+
+        Runs until each of the `pipelines` encode stages has reported that
+        it finished.
+        """
+        while pipelines > 0:
+            item = self._persist_queue.get()
+            if item[0] == 'finished':
+                pipelines -= 1
+                continue
+
+            try:
+                if item[0] == 'idle':
+                    _, start_time, end_time, monitor_id = item
+                    # Idle gaps are stored as chunks without a file
+                    self.storage.insert_chunk(
+                        chunk_id=str(uuid.uuid4()),
+                        start_time=start_time,
+                        end_time=end_time,
+                        file_path='',
+                        status='idle',
+                        monitor_id=monitor_id
+                    )
+                    print(f"💤 Recorded idle gap ({(end_time - start_time) / 60:.1f} min)")
+                    continue
+
+                _, writer, end_dt, status = item
+
+                # Store in database
+                self.storage.insert_chunk(
+                    chunk_id=writer.chunk_id,
+                    start_time=writer.start_dt.timestamp(),
+                    end_time=end_dt.timestamp(),
+                    file_path=str(writer.filepath),
+                    status=status,
+                    frame_times=writer.frame_times,
+                    monitor_id=writer.monitor_id,
+                    keyframes=[(ts, str(path)) for ts, path in writer.keyframes],
+                    file_size=writer.disk_size()
+                )
+
+                if status != 'completed':
+                    continue
+
+                print(f"✅ Saved chunk: {writer.filename} ({writer.frame_count} frames)")
+
+                # Notify callback
+                if self.on_chunk_completed:
+                    self.on_chunk_completed(writer.chunk_id)
+
+            except Exception as e:
+                print(f"❌ Error saving chunk: {e}")
@@ -0,0 +1,170 @@
+"""
+Tiered retention - shrinks old chunks instead of keeping them at full quality
+
+Tiers:
+    full      - as recorded
+    reduced   - re-encoded at a lower resolution and frame rate
+    timelapse - collapsed to a handful of frames (the keyframes, if any)
+
+Re-encodes run in a spawned process pool so they never compete with
+capture for the GIL. Workers drop to low priority and use one thread each,
+so the pool size caps the cores used. The functions here run inside the
+workers, so they stay top-level and only take picklable arguments.
+"""
+
+import os
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import cv2
+
+from .encoders import create_encoder, resolve_encoder_name
+
+
+TIER_FULL = 'full'
+TIER_REDUCED = 'reduced'
+TIER_TIMELAPSE = 'timelapse'
+
+# Settings the encoders read, copied into the workers
+ENCODER_SETTINGS = (
+    'video_encoder', 'ffmpeg_path', 'ffmpeg_codec', 'ffmpeg_crf',
+    'ffmpeg_preset', 'ffmpeg_tune', 'mjpeg_quality',
+)
+
+
+def encoder_settings(config) -> Dict:
+    """Snapshot the encoder settings for a worker process"""
+    settings = {key: config.get(key) for key in ENCODER_SETTINGS if config.get(key) is not None}
+    # Resolve (and warn about) the encoder once, not in every worker
+    settings['video_encoder'] = resolve_encoder_name(config)
+    # One encoder thread per worker keeps the pool size an honest core cap
+    settings['ffmpeg_threads'] = 1
+    return settings
+
+
+def lower_priority():
+    """Process pool initializer: idle priority, single-threaded OpenCV"""
+    try:
+        if hasattr(os, 'nice'):
+            os.nice(10)
+        elif os.name == 'nt':
+            import ctypes
+            BELOW_NORMAL_PRIORITY_CLASS = 0x00004000
+            kernel32 = ctypes.windll.kernel32
+            kernel32.SetPriorityClass(kernel32.GetCurrentProcess(), BELOW_NORMAL_PRIORITY_CLASS)
+    except Exception:
+        pass
+    cv2.setNumThreads(1)
+
+
+def _fit_height(frame, height: int):
+    """Scale a frame down to `height` (never up), keeping even dimensions"""
+    src_h, src_w = frame.shape[:2]
+    if src_h > height:
+        width = round(src_w * height / src_h)
+    else:
+        height, width = src_h, src_w
+    width, height = width - width % 2, height - height % 2
+    if (width, height) == (src_w, src_h):
+        return frame
+    return cv2.resize(frame, (width, height), interpolation=cv2.INTER_AREA)
+
+
+def _video_info(source: Path) -> Tuple[float, int]:
+    """Frame rate and frame count stored in a video's header"""
+    capture = cv2.VideoCapture(str(source))
+    try:
+        return capture.get(cv2.CAP_PROP_FPS) or 1.0, int(capture.get(cv2.CAP_PROP_FRAME_COUNT))
+    finally:
+        capture.release()
+
+
+def _sample_video(source: Path, wanted: List[int]) -> Iterator[Tuple[int, object]]:
+    """Decode only the wanted frames, yielding (index, frame)"""
+    capture = cv2.VideoCapture(str(source))
+    if not capture.isOpened():
+        raise RuntimeError(f"Could not open {source}")
+
+    wanted = set(wanted)
+    last = max(wanted, default=-1)
+    index = 0
+    try:
+        # grab() skips the decode to BGR for frames that are dropped
+        while index <= last and capture.grab():
+            if index in wanted:
+                ok, frame = capture.retrieve()
+                if ok:
+                    yield index, frame
+            index += 1
+    finally:
+        capture.release()
+
+
+def _frames_per_slot(offsets: List[float], fps: float) -> List[int]:
+    """Indices of the first frame in each 1/fps slot of the chunk
+
+    Works from the capture offsets, so chunks recorded at an adaptive rate
+    or with unchanged frames skipped are thinned by time, not by count.
+    """
+    keep, last_slot = [], -1
+    for index, offset in enumerate(offsets):
+        slot = int(offset * fps)
+        if slot > last_slot:
+            keep.append(index)
+            last_slot = slot
+    return keep
+
+
+def reencode_chunk(source: str, tier: str, height: int, fps: float,
+                   keyframes: List[Tuple[float, str]], settings: Dict,
+                   frame_times: Optional[List[float]] = None,
+                   timelapse_frames: int = 5) -> Tuple[str, int, List[float]]:
+    """Re-encode one chunk into a lower tier next to the original
+
+    `frame_times` are the chunk's per-frame capture offsets and `keyframes`
+    its sidecar (offset, path) pairs. Frames are streamed from decoder to
+    encoder, so memory stays at a frame or two. Returns the new file path,
+    its size and the capture offsets of the frames it kept. The original is
+    left in place for the caller to delete once the database points at the
+    new file.
+    """
+    source = Path(source)
+    source_fps, count = _video_info(source)
+    # Chunks recorded before frame_times existed fall back to the header fps
+    offsets = list(frame_times) if frame_times else [i / source_fps for i in range(count)]
+
+    if tier == TIER_TIMELAPSE:
+        out_fps = 1.0
+        loaded = [(offset, cv2.imread(path)) for offset, path in keyframes]
+        loaded = [(offset, frame) for offset, frame in loaded if frame is not None]
+        if loaded:
+            frames = iter(loaded)
+        else:
+            wanted = sorted({int(i * len(offsets) / timelapse_frames)
+                             for i in range(min(timelapse_frames, len(offsets)))})
+            frames = ((offsets[i], frame) for i, frame in _sample_video(source, wanted))
+    else:
+        out_fps = fps
+        wanted = _frames_per_slot(offsets, fps)
+        frames = ((offsets[i], frame) for i, frame in _sample_video(source, wanted))
+
+    encoder = create_encoder(settings, settings['video_encoder'])
+    target = source.with_name(f"{source.stem}_{tier}{encoder.extension}")
+    size = None
+    kept: List[float] = []
+    try:
+        for offset, frame in frames:
+            frame = _fit_height(frame, height)
+            if size is None:
+                size = (frame.shape[1], frame.shape[0])
+                encoder.open(target, size[0], size[1], out_fps)
+            elif (frame.shape[1], frame.shape[0]) != size:
+                frame = cv2.resize(frame, size)
+            encoder.write(frame)
+            kept.append(round(offset, 3))
+    finally:
+        encoder.close()
+
+    if size is None:
+        raise RuntimeError(f"No frames decoded from {source}")
+    return str(target), target.stat().st_size, kept
@@ -0,0 +1,62 @@
+"""
+Time-spent rollups for timeline cards
+
+Card durations are pre-aggregated per local day × category and per local
+hour × category, so stats views read a handful of rows instead of scanning
+every card. Rows are updated in the same transaction as the card insert;
+rebuild() recomputes both tables from timeline_cards.
+"""
+
+from datetime import datetime, timedelta
+from typing import Iterator, Optional, Tuple
+
+
+def split_by_hour(start_time: float, end_time: float) -> Iterator[Tuple[datetime, float]]:
+    """Split a time range into (local hour start, seconds) pieces"""
+    start = datetime.fromtimestamp(start_time)
+    end = datetime.fromtimestamp(end_time)
+    hour = start.replace(minute=0, second=0, microsecond=0)
+    while hour < end:
+        next_hour = hour + timedelta(hours=1)
+        seconds = (min(end, next_hour) - max(start, hour)).total_seconds()
+        if seconds > 0:
+            yield hour, seconds
+        hour = next_hour
+
+
+def add_card(cursor, start_time: float, end_time: float, category: Optional[str]):
+    """Add one card's duration to the rollup tables"""
+    category = category or 'Other'
+    daily = {}
+    for hour, seconds in split_by_hour(start_time, end_time):
+        day = hour.strftime('%Y-%m-%d')
+        daily[day] = daily.get(day, 0.0) + seconds
+        cursor.execute("""
+            INSERT INTO category_hourly_rollup (day, hour, category, seconds)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT(day, hour, category) DO UPDATE SET
+                seconds = seconds + excluded.seconds
+        """, (day, hour.hour, category, seconds))
+
+    # A card counts once, on the day it started
+    start_day = datetime.fromtimestamp(start_time).strftime('%Y-%m-%d')
+    daily.setdefault(start_day, 0.0)
+    for day, seconds in daily.items():
+        cursor.execute("""
+            INSERT INTO category_daily_rollup (day, category, seconds, card_count)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT(day, category) DO UPDATE SET
+                seconds = seconds + excluded.seconds,
+                card_count = card_count + excluded.card_count
+        """, (day, category, seconds, 1 if day == start_day else 0))
+
+
+def rebuild(cursor) -> int:
+    """Recompute both rollup tables from timeline_cards, returning the card count"""
+    cursor.execute("DELETE FROM category_daily_rollup")
+    cursor.execute("DELETE FROM category_hourly_rollup")
+    cursor.execute("SELECT start_time, end_time, category FROM timeline_cards")
+    cards = cursor.fetchall()
+    for start_time, end_time, category in cards:
+        add_card(cursor, start_time, end_time, category)
+    return len(cards)
@@ -0,0 +1,245 @@
+"""
+Single scheduler for all background work
+
+Timed jobs live in one heap serviced by one thread, which sleeps until the
+next job is due instead of every service polling on its own. Services can
+also subscribe to named events (e.g. 'chunk_completed', 'card_generated')
+that other components emit. Callbacks run on a small worker pool, so a
+long job (analysis, cleanup) never delays the others, and a job is never
+run twice concurrently.
+
+Due times are wall-clock, so runs missed while the machine slept are
+caught up once on wake-up rather than replayed one by one. Because some
+platforms pause monotonic timers during sleep, the scheduler never sleeps
+longer than MAX_SLEEP, which bounds how late a catch-up can be.
+"""
+
+import heapq
+import itertools
+import random
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from threading import Condition, Thread
+from typing import Callable, Dict, List, Optional, Set
+
+
+MAX_SLEEP = 300  # seconds
+
+
+class Job:
+    """A timed job: every `interval` seconds, or daily at `hour` o'clock"""
+
+    def __init__(self, name: str, callback: Callable, interval: Optional[float] = None,
+                 hour: Optional[int] = None, jitter: float = 0.0):
+        self.name = name
+        self.callback = callback
+        self.interval = interval
+        self.hour = hour
+        self.jitter = jitter
+        # Unjittered schedule slot, so jitter never accumulates into drift
+        self.slot = 0.0
+        # Heap entries carry the sequence number current when pushed;
+        # rescheduling bumps it so stale entries are skipped
+        self.seq = 0
+
+    def next_slot(self, after: float) -> float:
+        """First schedule slot strictly after `after`"""
+        if self.hour is not None:
+            slot = datetime.fromtimestamp(after).replace(hour=self.hour, minute=0,
+                                                         second=0, microsecond=0)
+            if slot.timestamp() <= after:
+                slot += timedelta(days=1)
+            return slot.timestamp()
+        return after + self.interval
+
+
+class Scheduler:
+    """Heap of timed jobs plus event triggers, driven by one thread"""
+
+    def __init__(self, workers: int = 4):
+        self._jobs: Dict[str, Job] = {}
+        # Names of jobs currently running; keyed by name rather than Job, so
+        # a job re-registered with every() does not overlap its old run
+        self._running: Set[str] = set()
+        # Jobs asked for with run_now() that have not started yet; one still
+        # running when the request comes in runs again once it finishes
+        self._requested: Set[str] = set()
+        self._heap: List = []
+        self._handlers: Dict[str, List[Callable]] = {}
+        self._events = deque()
+        self._seq = itertools.count()
+        self._cond = Condition()
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='scheduler')
+        self._thread: Optional[Thread] = None
+        self._stopped = False
+        self.wakeups = 0
+
+    def start(self):
+        """Start the scheduler thread"""
+        if self._thread:
+            return
+        self._stopped = False
+        self._thread = Thread(target=self._loop, daemon=True)
+        self._thread.start()
+        print("⏰ Scheduler started")
+
+    def stop(self):
+        """Stop the scheduler; running jobs are allowed to finish"""
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+        self._pool.shutdown(wait=False)
+        print("⏹️  Scheduler stopped")
+
+    # Timed jobs
+    def every(self, name: str, interval: float, callback: Callable,
+              jitter: float = 0.0, last_run: Optional[float] = None):
+        """Run callback every `interval` seconds
+
+        With last_run (a timestamp from a previous session), the first run
+        is one interval after it, which may mean right away.
+        """
+        self._add(Job(name, callback, interval=interval, jitter=jitter), last_run)
+
+    def daily(self, name: str, hour: int, callback: Callable,
+              jitter: float = 0.0, last_run: Optional[float] = None):
+        """Run callback once a day at `hour` o'clock (local time)
+
+        A run missed since last_run (e.g. asleep at that hour) happens right
+        away.
+        """
+        self._add(Job(name, callback, hour=hour, jitter=jitter), last_run)
+
+    def cancel(self, name: str):
+        """Remove a timed job"""
+        with self._cond:
+            self._jobs.pop(name, None)
+            self._requested.discard(name)
+
+    def run_now(self, name: str) -> bool:
+        """Run a timed job immediately; its schedule continues from now
+
+        If the job is running already, it runs once more right after.
+        """
+        with self._cond:
+            job = self._jobs.get(name)
+            if job is None:
+                return False
+            self._requested.add(name)
+            self._push(job, time.time(), jitter=False)
+            self._cond.notify()
+        return True
+
+    # Events
+    def on(self, event: str, callback: Callable):
+        """Call callback(*args) whenever `event` is emitted"""
+        with self._cond:
+            self._handlers.setdefault(event, []).append(callback)
+
+    def off(self, event: str, callback: Callable):
+        """Unsubscribe a callback"""
+        with self._cond:
+            handlers = self._handlers.get(event, [])
+            if callback in handlers:
+                handlers.remove(callback)
+
+    def emit(self, event: str, *args):
+        """Queue an event; handlers run on the scheduler's workers"""
+        with self._cond:
+            for callback in self._handlers.get(event, []):
+                self._events.append((event, callback, args))
+            if self._events:
+                self._cond.notify()
+
+    # Internals
+    def _add(self, job: Job, last_run: Optional[float]):
+        now = time.time()
+        with self._cond:
+            self._jobs[job.name] = job
+            self._push(job, job.next_slot(last_run) if last_run else now, jitter=False)
+            self._cond.notify()
+
+    def _push(self, job: Job, slot: float, jitter: bool = True):
+        job.slot = slot
+        job.seq = next(self._seq)
+        due = slot + (random.uniform(0, job.jitter) if jitter else 0.0)
+        heapq.heappush(self._heap, (due, job.seq, job))
+
+    def _loop(self):
+        while True:
+            with self._cond:
+                while not self._stopped and not self._events and not self._has_due_job():
+                    self._cond.wait(self._sleep_time())
+                    self.wakeups += 1
+                if self._stopped:
+                    return
+
+                events = list(self._events)
+                self._events.clear()
+                jobs = self._pop_due_jobs()
+
+            for event, callback, args in events:
+                self._pool.submit(self._run_event, event, callback, args)
+            for job in jobs:
+                self._pool.submit(self._run_job, job)
+
+    def _has_due_job(self) -> bool:
+        self._drop_stale()
+        return bool(self._heap) and self._heap[0][0] <= time.time()
+
+    def _sleep_time(self) -> float:
+        if not self._heap:
+            return MAX_SLEEP
+        return min(MAX_SLEEP, max(0.0, self._heap[0][0] - time.time()))
+
+    def _drop_stale(self):
+        """Discard heap entries for cancelled or rescheduled jobs"""
+        while self._heap:
+            _, seq, job = self._heap[0]
+            if self._jobs.get(job.name) is job and job.seq == seq:
+                return
+            heapq.heappop(self._heap)
+
+    def _pop_due_jobs(self) -> List[Job]:
+        """Pop due jobs and schedule their next run"""
+        now = time.time()
+        jobs = []
+        while self._has_due_job():
+            _, _, job = heapq.heappop(self._heap)
+            jobs.append(job)
+            # Missed runs (sleep, long job) collapse into this one
+            slot = job.next_slot(job.slot)
+            if slot <= now:
+                slot = job.next_slot(now)
+            self._push(job, slot)
+        return jobs
+
+    def _run_job(self, job: Job):
+        with self._cond:
+            if job.name in self._running:
+                return
+            self._running.add(job.name)
+            self._requested.discard(job.name)
+        try:
+            job.callback()
+        except Exception as e:
+            print(f"❌ Scheduled job '{job.name}' failed: {e}")
+        finally:
+            with self._cond:
+                self._running.discard(job.name)
+                # run_now() was called while this run was in progress
+                rerun = self._jobs.get(job.name) if job.name in self._requested else None
+                if rerun is not None and not self._stopped:
+                    self._pool.submit(self._run_job, rerun)
+
+    @staticmethod
+    def _run_event(event: str, callback: Callable, args):
+        try:
+            callback(*args)
+        except Exception as e:
+            print(f"❌ Handler for '{event}' failed: {e}")
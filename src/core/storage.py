@@ -2,107 +2,107 @@
 Database storage for chunks, batches, and timeline cards
 """
 
-import sqlite3
 import json
-from datetime import datetime
+from datetime import date, datetime
 from pathlib import Path
-from typing import List, Dict, Optional, Any
-from contextlib import contextmanager
+from typing import List, Dict, Optional, Any, Tuple
+
+from .database import ConnectionManager, WriteBehindQueue
+from .migrations import apply_migrations
+from . import rollups
 
 
 class Storage:
-    """SQLite database manager for Dayflow"""
+    """SQLite database manager for Dayflow
+
+    With `write_behind` enabled, chunk and timeline card inserts are queued
+    and committed in grouped transactions. Callers that need to read their
+    own writes call flush() first.
+    """
 
-    def __init__(self, db_path: Path):
+    def __init__(self, db_path: Path, write_behind: bool = False,
+                 write_behind_batch_size: int = 100, write_behind_interval: float = 2.0):
         self.db_path = db_path
+        self._connections = ConnectionManager(db_path)
+        self._fts_available: Optional[bool] = None
         self._init_database()
 
-    @contextmanager
+        self._write_behind: Optional[WriteBehindQueue] = None
+        if write_behind:
+            self._write_behind = WriteBehindQueue(
+                self._get_connection, write_behind_batch_size, write_behind_interval)
+
     def _get_connection(self):
-        """Context manager for database connections"""
-        conn = sqlite3.connect(str(self.db_path))
-        conn.row_factory = sqlite3.Row  # Return rows as dictionaries
-        try:
-            yield conn
-            conn.commit()
-        except Exception as e:
-            conn.rollback()
-            raise e
-        finally:
-            conn.close()
+        """Context manager for this thread's persistent database connection"""
+        return self._connections.connection()
 
-    def _init_database(self):
-        """Initialize database schema"""
-        with self._get_connection() as conn:
-            cursor = conn.cursor()
+    def _write(self, write):
+        """Run a write (a callable taking a cursor) now, or queue it in write-behind mode"""
+        if self._write_behind:
+            self._write_behind.put(write)
+            return
 
-            # Chunks table - individual 15-second recordings
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS chunks (
-                    id TEXT PRIMARY KEY,
-                    start_time REAL NOT NULL,
-                    end_time REAL NOT NULL,
-                    file_path TEXT NOT NULL,
-                    status TEXT NOT NULL,
-                    created_at REAL NOT NULL,
-                    batch_id TEXT
-                )
-            """)
+        with self._get_connection() as conn:
+            write(conn.cursor())
 
-            # Batches table - groups of chunks for analysis
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS batches (
-                    id TEXT PRIMARY KEY,
-                    start_time REAL NOT NULL,
-                    end_time REAL NOT NULL,
-                    status TEXT NOT NULL,
-                    created_at REAL NOT NULL,
-                    analyzed_at REAL
-                )
-            """)
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Commit all queued writes (no-op unless in write-behind mode)"""
+        if self._write_behind:
+            return self._write_behind.flush(timeout)
+        return True
 
-            # Timeline cards table - generated timeline entries
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS timeline_cards (
-                    id TEXT PRIMARY KEY,
-                    batch_id TEXT NOT NULL,
-                    start_time REAL NOT NULL,
-                    end_time REAL NOT NULL,
-                    title TEXT NOT NULL,
-                    summary TEXT,
-                    category TEXT,
-                    color TEXT,
-                    created_at REAL NOT NULL,
-                    FOREIGN KEY (batch_id) REFERENCES batches(id)
-                )
-            """)
+    def close(self):
+        """Flush queued writes and close all database connections"""
+        if self._write_behind:
+            self._write_behind.close()
+            self._write_behind = None
+        self._connections.close_all()
 
-            # Create indexes
-            cursor.execute("""
-                CREATE INDEX IF NOT EXISTS idx_chunks_start_time
-                ON chunks(start_time)
-            """)
-            cursor.execute("""
-                CREATE INDEX IF NOT EXISTS idx_chunks_batch_id
-                ON chunks(batch_id)
-            """)
-            cursor.execute("""
-                CREATE INDEX IF NOT EXISTS idx_timeline_cards_start_time
-                ON timeline_cards(start_time)
-            """)
+    def _init_database(self):
+        """Initialize database schema, applying any pending migrations"""
+        apply_migrations(self._get_connection)
 
-            conn.commit()
+    def explain_query_plan(self, sql: str, params: Tuple = ()) -> List[str]:
+        """Get the EXPLAIN QUERY PLAN detail lines for a query"""
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+            return [row['detail'] for row in cursor.fetchall()]
 
     # Chunk operations
     def insert_chunk(self, chunk_id: str, start_time: float, end_time: float,
-                     file_path: str, status: str = 'pending') -> str:
-        """Insert a new chunk record"""
-        with self._get_connection() as conn:
-            cursor = conn.cursor()
+                     file_path: str, status: str = 'pending',
+                     frame_times: Optional[List[float]] = None,
+                     monitor_id: int = 1,
+                     keyframes: Optional[List[Tuple[float, str]]] = None,
+                     file_size: int = 0) -> str:
+        """Insert a new chunk record
+
+        frame_times holds each frame's capture time as an offset in seconds
+        from start_time. monitor_id is the mss monitor index (0 for a
+        composite of all monitors). keyframes is a list of (timestamp, path)
+        for the chunk's JPEG sidecar. file_size is the bytes on disk for the
+        video and its keyframes, used for quota eviction.
+        """
+        frame_times_json = json.dumps(frame_times) if frame_times is not None else None
+        created_at = datetime.now().timestamp()
+
+        def write(cursor):
             cursor.execute("""
-                INSERT INTO chunks (id, start_time, end_time, file_path, status, created_at)
-                VALUES (?, ?, ?, ?, ?, ?)
-            """, (chunk_id, start_time, end_time, file_path, status, datetime.now().timestamp()))
+                INSERT INTO chunks
+                (id, start_time, end_time, file_path, status, created_at, frame_times,
+                 monitor_id, file_size)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (chunk_id, start_time, end_time, file_path, status,
+                  created_at, frame_times_json, monitor_id, file_size))
+
+            if keyframes:
+                cursor.executemany("""
+                    INSERT INTO chunk_keyframes (chunk_id, frame_index, timestamp, file_path)
+                    VALUES (?, ?, ?, ?)
+                """, [(chunk_id, i, ts, path) for i, (ts, path) in enumerate(keyframes)])
+
+        self._write(write)
         return chunk_id
 
     def update_chunk_status(self, chunk_id: str, status: str):
@@ -124,15 +124,186 @@ class Storage:
             """, (start_time, end_time))
             return [dict(row) for row in cursor.fetchall()]
 
+    def get_frame_timestamps(self, chunk_id: str) -> List[float]:
+        """Get the wall-clock capture time of every frame in a chunk"""
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT start_time, frame_times FROM chunks WHERE id = ?
+            """, (chunk_id,))
+            row = cursor.fetchone()
+
+        if not row or not row['frame_times']:
+            return []
+        return [row['start_time'] + offset for offset in json.loads(row['frame_times'])]
+
+    def get_keyframes_for_chunks(self, chunk_ids: List[str]) -> Dict[str, List[Dict]]:
+        """Get sidecar keyframes for several chunks, keyed by chunk id"""
+        keyframes: Dict[str, List[Dict]] = {chunk_id: [] for chunk_id in chunk_ids}
+        if not chunk_ids:
+            return keyframes
+
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            # Stay well under SQLite's bound-parameter limit
+            for i in range(0, len(chunk_ids), 500):
+                batch = chunk_ids[i:i + 500]
+                placeholders = ','.join('?' * len(batch))
+                cursor.execute(f"""
+                    SELECT * FROM chunk_keyframes
+                    WHERE chunk_id IN ({placeholders})
+                    ORDER BY chunk_id, frame_index
+                """, batch)
+                for row in cursor.fetchall():
+                    keyframes[row['chunk_id']].append(dict(row))
+        return keyframes
+
     def delete_old_chunks(self, before_timestamp: float) -> int:
         """Delete chunks older than specified timestamp"""
         with self._get_connection() as conn:
             cursor = conn.cursor()
+            cursor.execute("""
+                DELETE FROM chunk_keyframes WHERE chunk_id IN
+                (SELECT id FROM chunks WHERE start_time < ?)
+            """, (before_timestamp,))
             cursor.execute("""
                 DELETE FROM chunks WHERE start_time < ?
             """, (before_timestamp,))
             return cursor.rowcount
 
+    def assign_chunks_to_batch(self, batch_id: str, chunk_ids: List[str]):
+        """Mark chunks as analyzed by a batch (evicted first under quota)"""
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.executemany("""
+                UPDATE chunks SET batch_id = ? WHERE id = ?
+            """, [(batch_id, chunk_id) for chunk_id in chunk_ids])
+
+    def get_recordings_size(self) -> int:
+        """Get the total bytes on disk recorded for all chunks"""
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT COALESCE(SUM(file_size), 0) FROM chunks WHERE file_size > 0
+            """)
+            return cursor.fetchone()[0]
+
+    def get_eviction_candidates(self, limit: int = 200) -> List[Dict]:
+        """Get chunks holding disk space, analyzed ones first, oldest first"""
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT id, file_path, file_size, batch_id, start_time FROM chunks
+                WHERE file_size > 0
+                ORDER BY (batch_id IS NULL), start_time, file_size
+                LIMIT ?
+            """, (limit,))
+            return [dict(row) for row in cursor.fetchall()]
+
+    def get_chunks_for_downsampling(self, before_timestamp: float) -> List[Dict]:
+        """Get full-quality recorded chunks that started before a timestamp
+
+        frame_times is decoded to the list of per-frame offsets (or None).
+        """
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT id, file_path, file_size, start_time, frame_times FROM chunks
+                WHERE tier = 'full' AND start_time < ?
+                  AND status = 'completed' AND file_size > 0
+                ORDER BY start_time
+            """, (before_timestamp,))
+            chunks = [dict(row) for row in cursor.fetchall()]
+
+        for chunk in chunks:
+            chunk['frame_times'] = json.loads(chunk['frame_times']) if chunk['frame_times'] else None
+        return chunks
+
+    def update_chunk_tier(self, chunk_id: str, tier: str, file_path: str,
+                          file_size: int, frame_times: List[float],
+                          drop_keyframes: bool = False):
+        """Point a chunk at its re-encoded file
+
+        frame_times replaces the per-frame offsets with those of the frames
+        the new file kept. drop_keyframes removes the keyframe rows when the
+        sidecar was folded into the new file.
+        """
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                UPDATE chunks SET tier = ?, file_path = ?, file_size = ?, frame_times = ?
+                WHERE id = ?
+            """, (tier, file_path, file_size, json.dumps(frame_times), chunk_id))
+            if drop_keyframes:
+                cursor.execute("""
+                    DELETE FROM chunk_keyframes WHERE chunk_id = ?
+                """, (chunk_id,))
+
+    def find_known_files(self, file_paths: List[str]) -> set:
+        """Get which of the given paths belong to a chunk or keyframe row"""
+        known = set()
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            for i in range(0, len(file_paths), 500):
+                batch = file_paths[i:i + 500]
+                placeholders = ','.join('?' * len(batch))
+                cursor.execute(f"""
+                    SELECT file_path FROM chunks WHERE file_path IN ({placeholders})
+                    UNION ALL
+                    SELECT file_path FROM chunk_keyframes WHERE file_path IN ({placeholders})
+                """, batch + batch)
+                known.update(row['file_path'] for row in cursor.fetchall())
+        return known
+
+    def get_chunk_files_page(self, after: str, limit: int = 1000) -> List[Dict]:
+        """Get chunks with a file, in file_path order, after a keyset cursor"""
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT id, file_path FROM chunks
+                WHERE file_path > ?
+                ORDER BY file_path
+                LIMIT ?
+            """, (after, limit))
+            return [dict(row) for row in cursor.fetchall()]
+
+    def delete_missing_chunks(self, chunks: List[Tuple[str, str]]) -> int:
+        """Delete (id, file_path) chunks whose file is gone
+
+        A row is only deleted if it still points at that path, so chunks
+        re-encoded in the meantime are kept.
+        """
+        deleted = 0
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            for chunk_id, file_path in chunks:
+                cursor.execute("""
+                    DELETE FROM chunks WHERE id = ? AND file_path = ?
+                """, (chunk_id, file_path))
+                if cursor.rowcount:
+                    deleted += 1
+                    cursor.execute("""
+                        DELETE FROM chunk_keyframes WHERE chunk_id = ?
+                    """, (chunk_id,))
+        return deleted
+
+    def delete_chunks(self, chunk_ids: List[str]) -> int:
+        """Delete chunks (and their keyframe rows) by id"""
+        deleted = 0
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            for i in range(0, len(chunk_ids), 500):
+                batch = chunk_ids[i:i + 500]
+                placeholders = ','.join('?' * len(batch))
+                cursor.execute(f"""
+                    DELETE FROM chunk_keyframes WHERE chunk_id IN ({placeholders})
+                """, batch)
+                cursor.execute(f"""
+                    DELETE FROM chunks WHERE id IN ({placeholders})
+                """, batch)
+                deleted += cursor.rowcount
+        return deleted
+
     # Batch operations
     def insert_batch(self, batch_id: str, start_time: float, end_time: float) -> str:
         """Insert a new batch record"""
@@ -157,15 +328,19 @@ class Storage:
     def insert_timeline_card(self, card_id: str, batch_id: str, start_time: float,
                             end_time: float, title: str, summary: str = '',
                             category: str = 'Other', color: str = '#808080') -> str:
-        """Insert a new timeline card"""
-        with self._get_connection() as conn:
-            cursor = conn.cursor()
+        """Insert a new timeline card and add its duration to the rollups"""
+        created_at = datetime.now().timestamp()
+
+        def write(cursor):
             cursor.execute("""
                 INSERT INTO timeline_cards
                 (id, batch_id, start_time, end_time, title, summary, category, color, created_at)
                 VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
             """, (card_id, batch_id, start_time, end_time, title, summary,
-                  category, color, datetime.now().timestamp()))
+                  category, color, created_at))
+            rollups.add_card(cursor, start_time, end_time, category)
+
+        self._write(write)
         return card_id
 
     def get_timeline_cards(self, start_date: Optional[datetime] = None,
@@ -187,6 +362,160 @@ class Storage:
                 """)
             return [dict(row) for row in cursor.fetchall()]
 
+    def get_timeline_change_cursor(self) -> int:
+        """Get the current timeline change cursor (0 if there are no cards)"""
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT MAX(change_seq) FROM timeline_cards")
+            return cursor.fetchone()[0] or 0
+
+    def has_timeline_changes(self, since: int) -> bool:
+        """Check whether any card was created or modified after a cursor"""
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT 1 FROM timeline_cards WHERE change_seq > ? LIMIT 1
+            """, (since,))
+            return cursor.fetchone() is not None
+
+    def get_timeline_cards_since(self, since: int) -> Tuple[List[Dict], int]:
+        """Get cards created or modified after a cursor
+
+        Returns the changed cards (oldest change first) and the cursor to
+        pass on the next call.
+        """
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT * FROM timeline_cards
+                WHERE change_seq > ?
+                ORDER BY change_seq
+            """, (since,))
+            cards = [dict(row) for row in cursor.fetchall()]
+
+        if cards:
+            since = cards[-1]['change_seq']
+        return cards, since
+
+    def search_cards(self, query: str, start: Optional[datetime] = None,
+                     end: Optional[datetime] = None, limit: int = 50) -> List[Dict]:
+        """Full-text search over card titles, summaries and categories
+
+        Every whitespace-separated term must match (as a prefix), so
+        "billing migr" finds "Billing migration". Results are ranked by
+        relevance, with title matches weighted highest.
+        """
+        terms = query.split()
+        if not terms:
+            return []
+
+        start_ts = start.timestamp() if start else float('-inf')
+        end_ts = end.timestamp() if end else float('inf')
+
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            if self._has_fts(cursor):
+                # Quote each term so FTS5 syntax (AND, NEAR, "-", ...) in user
+                # input is matched literally
+                match = ' '.join('"' + term.replace('"', '""') + '"*' for term in terms)
+                cursor.execute("""
+                    SELECT timeline_cards.* FROM timeline_cards_fts
+                    JOIN timeline_cards ON timeline_cards.rowid = timeline_cards_fts.rowid
+                    WHERE timeline_cards_fts MATCH ?
+                      AND timeline_cards.start_time >= ? AND timeline_cards.start_time <= ?
+                    ORDER BY bm25(timeline_cards_fts, 10.0, 1.0, 2.0)
+                    LIMIT ?
+                """, (match, start_ts, end_ts, limit))
+            else:
+                escaped = [term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+                           for term in terms]
+                where = ' AND '.join(
+                    "(title LIKE ? ESCAPE '\\' OR summary LIKE ? ESCAPE '\\' "
+                    "OR category LIKE ? ESCAPE '\\')" for _ in terms)
+                params = [f"%{term}%" for term in escaped for _ in range(3)]
+                cursor.execute(f"""
+                    SELECT * FROM timeline_cards
+                    WHERE {where} AND start_time >= ? AND start_time <= ?
+                    ORDER BY start_time DESC
+                    LIMIT ?
+                """, (*params, start_ts, end_ts, limit))
+            return [dict(row) for row in cursor.fetchall()]
+
+    def _has_fts(self, cursor) -> bool:
+        """Check (once) whether the full-text index exists"""
+        if self._fts_available is None:
+            cursor.execute("""
+                SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'timeline_cards_fts'
+            """)
+            self._fts_available = cursor.fetchone() is not None
+        return self._fts_available
+
+    # Runtime state
+    def get_state(self, key: str, default: Any = None) -> Any:
+        """Get a runtime state value (JSON-decoded)"""
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT value FROM runtime_state WHERE key = ?", (key,))
+            row = cursor.fetchone()
+        return json.loads(row['value']) if row else default
+
+    def set_state(self, key: str, value: Any):
+        """Set a runtime state value (any JSON-serializable value)"""
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                INSERT INTO runtime_state (key, value, updated_at) VALUES (?, ?, ?)
+                ON CONFLICT(key) DO UPDATE SET
+                    value = excluded.value, updated_at = excluded.updated_at
+            """, (key, json.dumps(value), datetime.now().timestamp()))
+
+    # Rollup operations
+    def rebuild_rollups(self) -> int:
+        """Recompute the time-spent rollups from all timeline cards
+
+        Returns the number of cards aggregated.
+        """
+        self.flush()
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+            return rollups.rebuild(cursor)
+
+    def get_daily_rollup(self, start_day: date, end_day: date) -> List[Dict]:
+        """Get seconds and card counts per day and category (inclusive range)"""
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT day, category, seconds, card_count FROM category_daily_rollup
+                WHERE day >= ? AND day <= ?
+                ORDER BY day, seconds DESC
+            """, (start_day.isoformat(), end_day.isoformat()))
+            return [dict(row) for row in cursor.fetchall()]
+
+    def get_category_totals(self, start_day: date, end_day: date) -> List[Dict]:
+        """Get total seconds and card counts per category over a day range"""
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT category, SUM(seconds) AS seconds, SUM(card_count) AS card_count
+                FROM category_daily_rollup
+                WHERE day >= ? AND day <= ?
+                GROUP BY category
+                ORDER BY seconds DESC
+            """, (start_day.isoformat(), end_day.isoformat()))
+            return [dict(row) for row in cursor.fetchall()]
+
+    def get_hourly_rollup(self, day: date) -> List[Dict]:
+        """Get seconds per hour and category for one day"""
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT hour, category, seconds FROM category_hourly_rollup
+                WHERE day = ?
+                ORDER BY hour, seconds DESC
+            """, (day.isoformat(),))
+            return [dict(row) for row in cursor.fetchall()]
+
     def get_timeline_cards_for_today(self) -> List[Dict]:
         """Get timeline cards for today"""
         today_start = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
@@ -3,7 +3,7 @@ Main application window using customtkinter
 """
 
 import customtkinter as ctk
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import Optional
 import threading
 
@@ -27,12 +27,23 @@ class MainWindow(ctk.CTk):
         ctk.set_appearance_mode("dark")
         ctk.set_default_color_theme("blue")
 
+        # Timeline state for incremental refreshes
+        self._timeline_cursor = 0
+        self._timeline_day = None
+        self._card_widgets = {}
+        self._empty_label = None
+        self._search_query = ''
+
         # Create UI
         self._create_ui()
 
-        # Update timeline periodically
-        self._update_timeline()
-        self._schedule_update()
+        # Refresh the timeline when new cards arrive and when the day changes,
+        # instead of polling. Scheduler callbacks run on worker threads, so
+        # they only post a virtual event for the Tk main loop to handle.
+        self.bind('<<TimelineChanged>>', lambda event: self._refresh_timeline())
+        self.app.scheduler.on('card_generated', self._post_timeline_changed)
+        self.app.scheduler.daily('timeline_day_rollover', 0, self._post_timeline_changed)
+        self._refresh_timeline()
 
     def _create_ui(self):
         """Create the main UI layout"""
@@ -89,6 +100,17 @@ class MainWindow(ctk.CTk):
         )
         self.settings_button.pack(side="right", padx=10)
 
+        # Stats button
+        self.stats_button = ctk.CTkButton(
+            self.top_bar,
+            text="📊 统计",
+            command=self._show_stats,
+            width=110,
+            height=35,
+            fg_color="gray"
+        )
+        self.stats_button.pack(side="right", padx=10)
+
         # Main content area
         self.content = ctk.CTkFrame(self)
         self.content.pack(fill="both", expand=True, padx=20, pady=10)
@@ -100,7 +122,38 @@ class MainWindow(ctk.CTk):
             text=f"今日时间线 - {today_str}",
             font=ctk.CTkFont(size=20, weight="bold")
         )
-        self.timeline_header.pack(pady=(10, 20))
+        self.timeline_header.pack(pady=(10, 10))
+
+        # Search bar
+        self.search_bar = ctk.CTkFrame(self.content, fg_color="transparent")
+        self.search_bar.pack(fill="x", padx=10)
+
+        self.search_entry = ctk.CTkEntry(
+            self.search_bar,
+            placeholder_text="搜索所有时间线（标题、摘要、类别）",
+            height=35
+        )
+        self.search_entry.pack(side="left", fill="x", expand=True)
+        self.search_entry.bind("<Return>", lambda event: self._search())
+
+        self.clear_search_button = ctk.CTkButton(
+            self.search_bar,
+            text="✖ 清除",
+            command=self._clear_search,
+            width=80,
+            height=35,
+            fg_color="gray"
+        )
+        self.clear_search_button.pack(side="right", padx=(10, 0))
+
+        self.search_button = ctk.CTkButton(
+            self.search_bar,
+            text="🔍 搜索",
+            command=self._search,
+            width=100,
+            height=35
+        )
+        self.search_button.pack(side="right", padx=(10, 0))
 
         # Scrollable timeline
         self.timeline_scroll = ctk.CTkScrollableFrame(
@@ -129,7 +182,7 @@ class MainWindow(ctk.CTk):
             self.after(0, lambda: self.analyze_button.configure(
                 state="normal", text="⚡ 立即分析"
             ))
-            self.after(0, self._update_timeline)
+            self.after(0, self._refresh_timeline)
 
         threading.Thread(target=analyze_thread, daemon=True).start()
 
@@ -137,6 +190,10 @@ class MainWindow(ctk.CTk):
         """Show settings dialog"""
         SettingsDialog(self, self.config, self.app)
 
+    def _show_stats(self):
+        """Show time-spent stats dialog"""
+        StatsDialog(self, self.app.storage)
+
     def _update_status(self):
         """Update recording status display"""
         if self.app.is_recording:
@@ -153,31 +210,121 @@ class MainWindow(ctk.CTk):
             )
 
     def _update_timeline(self):
-        """Update timeline cards from database"""
+        """Reload all of today's timeline cards from database"""
         # Clear existing cards
         for widget in self.timeline_scroll.winfo_children():
             widget.destroy()
+        self._card_widgets = {}
+        self._empty_label = None
+
+        # Read the cursor first so changes made while loading are picked up
+        # by the next incremental refresh
+        self._timeline_cursor = self.app.storage.get_timeline_change_cursor()
+        self._timeline_day = datetime.now().date()
+        self.timeline_header.configure(
+            text=f"今日时间线 - {datetime.now().strftime('%Y年%m月%d日')}"
+        )
 
         # Get timeline cards for today
         cards = self.app.storage.get_timeline_cards_for_today()
 
         if not cards:
-            # Show empty state
-            empty_label = ctk.CTkLabel(
+            self._show_empty_state()
+            return
+
+        # Display cards
+        for card in cards:
+            self._card_widgets[card['id']] = (card, self._create_timeline_card(card))
+
+    def _search(self):
+        """Show cards matching the search box, across all history"""
+        query = self.search_entry.get().strip()
+        if not query:
+            self._clear_search()
+            return
+
+        self._search_query = query
+        for widget in self.timeline_scroll.winfo_children():
+            widget.destroy()
+        self._card_widgets = {}
+        self._empty_label = None
+
+        cards = self.app.storage.search_cards(query, limit=100)
+        self.timeline_header.configure(text=f"搜索结果 - “{query}”（{len(cards)} 条）")
+
+        if not cards:
+            self._empty_label = ctk.CTkLabel(
                 self.timeline_scroll,
-                text="尚无时间线卡片。\n开始录制以构建您的时间线！",
+                text="没有匹配的时间线卡片。",
                 font=ctk.CTkFont(size=16),
                 text_color="gray"
             )
-            empty_label.pack(pady=50)
+            self._empty_label.pack(pady=50)
             return
 
-        # Display cards
         for card in cards:
-            self._create_timeline_card(card)
+            self._create_timeline_card(card, show_date=True)
+
+    def _clear_search(self):
+        """Leave search results and go back to today's timeline"""
+        self._search_query = ''
+        self.search_entry.delete(0, "end")
+        self._update_timeline()
+
+    def _refresh_timeline(self):
+        """Apply only the cards created or modified since the last refresh"""
+        if self._search_query:
+            # Keep search results on screen until the search is cleared
+            return
+
+        if self._timeline_day != datetime.now().date():
+            # New day: today's view starts from scratch
+            self._update_timeline()
+            return
+
+        storage = self.app.storage
+        if not storage.has_timeline_changes(self._timeline_cursor):
+            return
+
+        cards, self._timeline_cursor = storage.get_timeline_cards_since(self._timeline_cursor)
+        day_start = datetime.combine(self._timeline_day, datetime.min.time()).timestamp()
+
+        for card in cards:
+            existing = self._card_widgets.pop(card['id'], None)
+            if existing:
+                existing[1].destroy()
+            if card['start_time'] < day_start:
+                continue
+
+            if self._empty_label is not None:
+                self._empty_label.destroy()
+                self._empty_label = None
+
+            # Cards are shown newest first; insert before the first older card
+            before = None
+            for other, widget in self._card_widgets.values():
+                if other['start_time'] < card['start_time'] and (
+                        before is None or other['start_time'] > before[0]['start_time']):
+                    before = (other, widget)
+
+            widget = self._create_timeline_card(card, before=before[1] if before else None)
+            self._card_widgets[card['id']] = (card, widget)
+
+        if not self._card_widgets and self._empty_label is None:
+            self._show_empty_state()
+
+    def _show_empty_state(self):
+        """Show the empty timeline placeholder"""
+        self._empty_label = ctk.CTkLabel(
+            self.timeline_scroll,
+            text="尚无时间线卡片。\n开始录制以构建您的时间线！",
+            font=ctk.CTkFont(size=16),
+            text_color="gray"
+        )
+        self._empty_label.pack(pady=50)
 
-    def _create_timeline_card(self, card):
-        """Create a timeline card widget"""
+    def _create_timeline_card(self, card, before=None, show_date=False):
+        """Create a timeline card widget and return its frame"""
         # Card frame
         card_frame = ctk.CTkFrame(
             self.timeline_scroll,
@@ -185,12 +332,17 @@ class MainWindow(ctk.CTk):
             border_width=2,
             border_color=card.get('color', '#757575')
         )
-        card_frame.pack(fill="x", pady=8, padx=5)
+        if before is not None:
+            card_frame.pack(fill="x", pady=8, padx=5, before=before)
+        else:
+            card_frame.pack(fill="x", pady=8, padx=5)
 
         # Time range
         start_dt = datetime.fromtimestamp(card['start_time'])
         end_dt = datetime.fromtimestamp(card['end_time'])
         time_str = f"{start_dt.strftime('%H:%M')} - {end_dt.strftime('%H:%M')}"
+        if show_date:
+            time_str = f"{start_dt.strftime('%Y年%m月%d日')} {time_str}"
 
         time_label = ctk.CTkLabel(
             card_frame,
@@ -228,10 +380,143 @@ class MainWindow(ctk.CTk):
             )
             summary_label.pack(anchor="w", padx=15, pady=(5, 15))
 
-    def _schedule_update(self):
-        """Schedule periodic timeline updates"""
-        self._update_timeline()
-        self.after(30000, self._schedule_update)  # Update every 30 seconds
+        return card_frame
+
+    def _post_timeline_changed(self, *args):
+        """Ask the UI thread to refresh the timeline (safe from any thread)"""
+        try:
+            self.event_generate('<<TimelineChanged>>', when='tail')
+        except Exception:
+            # Window already destroyed
+            pass
+
+
+class StatsDialog(ctk.CTkToplevel):
+    """Time spent per category, read from the rollup tables"""
+
+    PERIODS = {
+        '今天': 0,
+        '最近 7 天': 6,
+        '最近 30 天': 29,
+    }
+
+    def __init__(self, parent, storage):
+        super().__init__(parent)
+
+        self.storage = storage
+
+        self.title("Dayflow 统计")
+        self.geometry("600x650")
+
+        self._create_ui()
+        self._show_period('今天')
+
+    def _create_ui(self):
+        """Create stats UI"""
+        title = ctk.CTkLabel(
+            self,
+            text="📊 时间统计",
+            font=ctk.CTkFont(size=24, weight="bold")
+        )
+        title.pack(pady=20)
+
+        self.period_selector = ctk.CTkSegmentedButton(
+            self,
+            values=list(self.PERIODS),
+            command=self._show_period
+        )
+        self.period_selector.pack(pady=(0, 10))
+
+        self.stats_frame = ctk.CTkScrollableFrame(self)
+        self.stats_frame.pack(fill="both", expand=True, padx=20, pady=10)
+
+        rebuild_button = ctk.CTkButton(
+            self,
+            text="🔄 重建统计",
+            command=self._rebuild,
+            width=160,
+            height=35,
+            fg_color="gray"
+        )
+        rebuild_button.pack(pady=15)
+
+    def _show_period(self, period):
+        """Render category totals (and today's hours) for a period"""
+        from analysis.timeline_generator import CATEGORY_COLORS
+
+        self.period_selector.set(period)
+        for widget in self.stats_frame.winfo_children():
+            widget.destroy()
+
+        today = datetime.now().date()
+        totals = self.storage.get_category_totals(today - timedelta(days=self.PERIODS[period]), today)
+
+        if not totals:
+            ctk.CTkLabel(
+                self.stats_frame,
+                text="这段时间还没有时间线数据。",
+                font=ctk.CTkFont(size=16),
+                text_color="gray"
+            ).pack(pady=50)
+            return
+
+        total_seconds = sum(row['seconds'] for row in totals)
+        ctk.CTkLabel(
+            self.stats_frame,
+            text=f"共计 {self._format_duration(total_seconds)}",
+            font=ctk.CTkFont(size=18, weight="bold")
+        ).pack(anchor="w", padx=15, pady=(10, 5))
+
+        for row in totals:
+            color = CATEGORY_COLORS.get(row['category'], '#757575')
+            self._add_bar(
+                f"📁 {row['category']}  {self._format_duration(row['seconds'])}"
+                f"（{row['card_count']} 张卡片）",
+                row['seconds'] / total_seconds,
+                color
+            )
+
+        if self.PERIODS[period] == 0:
+            hours = {}
+            for row in self.storage.get_hourly_rollup(today):
+                hours[row['hour']] = hours.get(row['hour'], 0.0) + row['seconds']
+
+            ctk.CTkLabel(
+                self.stats_frame,
+                text="按小时",
+                font=ctk.CTkFont(size=18, weight="bold")
+            ).pack(anchor="w", padx=15, pady=(20, 5))
+            for hour, seconds in sorted(hours.items()):
+                self._add_bar(
+                    f"{hour:02d}:00  {self._format_duration(seconds)}",
+                    min(seconds / 3600, 1.0),
+                    "#3B8ED0"
+                )
+
+    def _add_bar(self, text, fraction, color):
+        """Add a labelled progress bar row"""
+        ctk.CTkLabel(
+            self.stats_frame,
+            text=text,
+            font=ctk.CTkFont(size=14)
+        ).pack(anchor="w", padx=15, pady=(8, 2))
+
+        bar = ctk.CTkProgressBar(self.stats_frame, progress_color=color)
+        bar.pack(fill="x", padx=15, pady=(0, 4))
+        bar.set(fraction)
+
+    def _rebuild(self):
+        """Recompute the rollups from all timeline cards"""
+        self.storage.rebuild_rollups()
+        self._show_period(self.period_selector.get())
+
+    @staticmethod
+    def _format_duration(seconds):
+        """Format seconds as e.g. 2 小时 5 分钟"""
+        minutes = int(seconds // 60)
+        if minutes < 60:
+            return f"{minutes} 分钟"
+        return f"{minutes // 60} 小时 {minutes % 60} 分钟"
 
 
 class SettingsDialog(ctk.CTkToplevel):